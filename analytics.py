@@ -0,0 +1,219 @@
+"""
+Recruiting analytics maintained as interviews happen
+Counts of interviews by stage reached and by stage in progress, the
+technologies candidates report per tech stack category, the experience
+they state and where they leave the interview. InterviewService applies
+the difference each turn makes (its stage transition and any change to
+the extracted details) and each ending, so reading the aggregates costs
+the same however many interviews have run; nothing is recomputed from
+stored sessions. A turn whose model call failed is reverted before the
+service sees it, so it counts as nothing.
+
+Set TALENTSCOUT_ANALYTICS_FILE to write a snapshot there every
+TALENTSCOUT_ANALYTICS_INTERVAL seconds (default 60) and to resume from it
+after a restart. Interviews still running when the snapshot was taken
+are ended as abandoned once the service expires them, or straight away
+with abandon_active() if the sessions were only in the old process's
+memory.
+
+Aggregates are per process. With replicas sharing sessions, each turn is
+counted by whichever replica serves it, including moving an interview out
+of a stage another replica counted it into, so one replica's counts can
+be negative or exceed its starts. Only the sum of every replica's
+snapshot is meaningful then: python analytics.py a.json b.json > all.json
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from prompt_builder import STAGES
+from question_templates import experience_years
+
+# Lower bound in whole years, label; stated experience falls in the last range it reaches
+EXPERIENCE_RANGES = ((0, "0-1 years"), (2, "2-3 years"), (4, "4-5 years"), (6, "6-9 years"), (10, "10+ years"))
+
+# How an interview ended: the candidate finished it, said goodbye early, or it was discarded while still running
+OUTCOMES = ("completed", "ended_early", "abandoned")
+
+
+def experience_range(experience: Optional[str]) -> Optional[str]:
+    """The EXPERIENCE_RANGES label for stated experience such as "5 years", None if nothing is stated"""
+    if not experience:
+        return None
+    years = experience_years(experience)
+    label = EXPERIENCE_RANGES[0][1]
+    for lower, name in EXPERIENCE_RANGES:
+        if years >= lower:
+            label = name
+    return label
+
+
+class RecruitingAnalytics:
+    """Interview aggregates updated by deltas; snapshot() is bounded by the number of stages and technologies"""
+
+    def __init__(self, snapshot_path: Optional[str] = None, snapshot_interval: float = 60.0):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._reached: Counter = Counter()
+        self._active: Counter = Counter()
+        self._drop_offs: Counter = Counter()
+        self._outcomes: Counter = Counter()
+        # (category, technology) -> interviews currently reporting it
+        self._technologies: Counter = Counter()
+        self._experience: Counter = Counter()
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        if snapshot_path:
+            if os.path.exists(snapshot_path):
+                with open(snapshot_path, encoding="utf-8") as file:
+                    self.restore(json.load(file))
+            self._writer = threading.Thread(target=self._write_periodically, name="analytics-snapshot",
+                                            daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def record_start(self) -> None:
+        """A new interview, at the greeting"""
+        with self._lock:
+            self._reached["greeting"] += 1
+            self._active["greeting"] += 1
+
+    def record_turn(self, stage: str, candidate_info: Dict, next_stage: str, next_candidate_info: Dict) -> None:
+        """Apply what one turn changed: the stage it moved to and the details it extracted"""
+        old_stack = candidate_info.get("tech_stack") or {}
+        new_stack = next_candidate_info.get("tech_stack") or {}
+        old_experience = experience_range(candidate_info.get("experience"))
+        new_experience = experience_range(next_candidate_info.get("experience"))
+        with self._lock:
+            if next_stage != stage:
+                self._reached[next_stage] += 1
+                self._active[stage] -= 1
+                self._active[next_stage] += 1
+            if new_stack != old_stack:
+                self._technologies.subtract(_stack_pairs(old_stack))
+                self._technologies.update(_stack_pairs(new_stack))
+            if new_experience != old_experience:
+                if old_experience is not None:
+                    self._experience[old_experience] -= 1
+                if new_experience is not None:
+                    self._experience[new_experience] += 1
+
+    def record_end(self, stage: str, outcome: str) -> None:
+        """An interview left at `stage` (where it stood before the ending turn) with one of OUTCOMES"""
+        with self._lock:
+            self._active[stage] -= 1
+            self._outcomes[outcome] += 1
+            if outcome != "completed":
+                self._drop_offs[stage] += 1
+
+    def abandon_active(self) -> int:
+        """End every interview counted as active as abandoned at its stage; returns how many"""
+        with self._lock:
+            active = +self._active
+            self._drop_offs.update(active)
+            self._outcomes["abandoned"] += sum(active.values())
+            self._active.clear()
+            return sum(active.values())
+
+    def snapshot(self) -> Dict:
+        """Every aggregate as plain data"""
+        with self._lock:
+            stages = {stage: {"reached": self._reached[stage], "active": self._active[stage],
+                              "drop_offs": self._drop_offs[stage]} for stage in STAGES}
+            technologies: Dict[str, Dict[str, int]] = {}
+            for (category, tech), count in self._technologies.items():
+                # Kept when negative too, so that snapshots from several replicas add up
+                if count:
+                    technologies.setdefault(category, {})[tech] = count
+            return {
+                "taken": time.time(),
+                "started": self._reached["greeting"],
+                "outcomes": {outcome: self._outcomes[outcome] for outcome in OUTCOMES},
+                "stages": stages,
+                "technologies": technologies,
+                "experience": {label: self._experience[label] for _, label in EXPERIENCE_RANGES}
+            }
+
+    def restore(self, snapshot: Dict) -> None:
+        """Continue from a snapshot() taken earlier, e.g. by a previous run of the process"""
+        with self._lock:
+            self._reached = Counter({stage: counts["reached"] for stage, counts in snapshot["stages"].items()})
+            self._active = Counter({stage: counts["active"] for stage, counts in snapshot["stages"].items()})
+            self._drop_offs = Counter({stage: counts["drop_offs"] for stage, counts in snapshot["stages"].items()})
+            self._outcomes = Counter(snapshot["outcomes"])
+            self._technologies = Counter({(category, tech): count
+                                          for category, techs in snapshot["technologies"].items()
+                                          for tech, count in techs.items()})
+            self._experience = Counter(snapshot["experience"])
+
+    def write_snapshot(self, path: str) -> None:
+        """Atomically replace `path` with the current aggregates"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temp_path, path)
+
+    def _write_periodically(self) -> None:
+        while not self._stop.wait(self.snapshot_interval):
+            try:
+                self.write_snapshot(self.snapshot_path)
+            except OSError:
+                pass  # e.g. the directory went away; try again next interval
+
+    def close(self) -> None:
+        """Stop the snapshot writer and write a final snapshot"""
+        self._stop.set()
+        if self._writer is not None and self._writer.is_alive() and self._writer is not threading.current_thread():
+            self._writer.join()
+        if self.snapshot_path:
+            self.write_snapshot(self.snapshot_path)
+
+
+def merge_snapshots(snapshots: Iterable[Dict]) -> Dict:
+    """Add up snapshot()s taken by several replicas into the aggregates for all of them"""
+    merged: Dict = {"taken": 0.0}
+    for snapshot in snapshots:
+        merged["taken"] = max(merged["taken"], snapshot["taken"])
+        _add(merged, {key: value for key, value in snapshot.items() if key != "taken"})
+    return merged
+
+
+def _add(total: Dict, part: Dict) -> None:
+    for key, value in part.items():
+        if isinstance(value, dict):
+            _add(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+def _stack_pairs(tech_stack: Dict) -> Counter:
+    return Counter((category, tech) for category, techs in tech_stack.items() for tech in techs)
+
+
+# Shared by every session in the process
+ANALYTICS = RecruitingAnalytics(os.getenv("TALENTSCOUT_ANALYTICS_FILE"),
+                                float(os.getenv("TALENTSCOUT_ANALYTICS_INTERVAL", "60")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add up analytics snapshots written by several replicas")
+    parser.add_argument("snapshots", nargs="+", help="snapshot files (TALENTSCOUT_ANALYTICS_FILE of each replica)")
+    args = parser.parse_args()
+    snapshots = []
+    for path in args.snapshots:
+        with open(path, encoding="utf-8") as file:
+            snapshots.append(json.load(file))
+    json.dump(merge_snapshots(snapshots), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Offline re-screening of archived interview transcripts
+Replays the candidate's side of past interviews through the turn planner,
+which runs the same candidate-detail and tech-stack extraction the live
+interview does at each stage, so re-running after a taxonomy or pattern
+change yields the profile today's code would have built. Transcripts are
+JSON lines, either saved session states or {"id": ..., "messages": [...]},
+or the sessions of a SQLiteSessionStore file.
+
+Work is sharded across a process pool in chunks. Only a few chunks per
+worker are in flight at any time and profiles are written, in input order,
+as soon as their chunk is done, so memory stays flat however large the
+archive is. The model is only called with --questions model.
+
+Usage: python batch_screening.py transcripts.jsonl [more.jsonl | -] --output profiles.jsonl \\
+           [--session-db sessions.db] [--workers 8] [--questions none|templates|model] [--fake-llm]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from prompt_builder import PROMPT_BUILDER, parse_questions
+from question_bank import QUESTION_BANK
+from question_templates import QUESTION_TEMPLATES
+from turn_pipeline import plan_turn
+
+QUESTION_MODES = ("none", "templates", "model")
+
+# A transcript as read: its position in the input and either a JSON line or a compressed session state
+Item = Tuple[int, Union[str, bytes]]
+
+
+def read_transcripts(paths: Sequence[str] = (), session_db: Optional[str] = None) -> Iterator[Item]:
+    """Transcripts from JSON lines files ("-" is stdin) and a SQLiteSessionStore file, one at a time"""
+    position = 0
+    for path in paths:
+        file = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        with file:
+            for line in file:
+                if line.strip():
+                    yield position, line
+                    position += 1
+    if session_db:
+        with sqlite3.connect(session_db) as db:
+            for (blob,) in db.execute("SELECT state FROM sessions"):
+                yield position, blob
+                position += 1
+
+
+def replay(messages: Iterable[Dict]) -> Dict:
+    """Run every candidate message through the turn planner, from a fresh interview"""
+    stage, info, asked = "greeting", {}, 0
+    for message in messages:
+        if message.get("role") != "user":
+            continue
+        plan = plan_turn(stage, info, asked, message.get("content", ""))
+        stage, info, asked = plan.next_stage, plan.next_candidate_info, plan.next_questions_asked
+    return {"stage": stage, "candidate_info": info, "questions_asked": asked}
+
+
+def screen(item: Item) -> Dict:
+    """The re-extracted profile of one transcript, or the reason it could not be read"""
+    position, raw = item
+    try:
+        state = json.loads(zlib.decompress(raw) if isinstance(raw, bytes) else raw)
+        profile = {"id": state.get("id", position), **replay(state["messages"])}
+    except (ValueError, KeyError, TypeError, AttributeError, zlib.error) as e:
+        return {"id": position, "error": f"{type(e).__name__}: {e}"}
+    # Saved sessions carry the profile the live interview built; name what re-screening changed
+    previous = (state.get("assistant") or {}).get("info")
+    if previous is not None:
+        current = profile["candidate_info"]
+        profile["changed"] = sorted(field for field in set(previous) | set(current)
+                                    if previous.get(field) != current.get(field))
+    return profile
+
+
+# Set in each worker process by _init_worker
+_questions = "none"
+_fake_llm = False
+
+
+def _init_worker(questions: str, fake_llm: bool) -> None:
+    global _questions, _fake_llm
+    _questions, _fake_llm = questions, fake_llm
+
+
+async def _model_questions(profiles: List[Dict]) -> None:
+    """Fill in model-written questions for a chunk's profiles concurrently, as the live interview would"""
+    from gemini_client import DEFAULT_MODEL, MODEL_REGISTRY
+    from llm_backend import GEMINI_BACKEND, FakeBackend
+
+    if _fake_llm:
+        backend, model = FakeBackend(mean_latency=0), None
+    else:
+        backend, model = GEMINI_BACKEND, MODEL_REGISTRY.get_model(os.getenv("GEMINI_API_KEY"), DEFAULT_MODEL)
+
+    async def generate(profile: Dict) -> None:
+        info = profile["candidate_info"]
+        questions = QUESTION_BANK.lookup(info["tech_stack"], info.get("experience"))
+        if questions is None:
+            try:
+                response = await backend.generate(model, PROMPT_BUILDER.questions_prompt(info))
+                questions = parse_questions(response.text)
+            except Exception as e:
+                profile["questions_error"] = str(e)
+                questions = QUESTION_TEMPLATES.questions(info["tech_stack"], info.get("experience"))
+        profile["tech_questions"] = questions
+
+    await asyncio.gather(*(generate(profile) for profile in profiles))
+
+
+def screen_chunk(chunk: List[Item]) -> List[Dict]:
+    """Screen a chunk of transcripts; runs in a worker process"""
+    profiles = [screen(item) for item in chunk]
+    if _questions == "none":
+        return profiles
+    with_stack = [profile for profile in profiles if profile.get("candidate_info", {}).get("tech_stack")]
+    if _questions == "templates":
+        for profile in with_stack:
+            info = profile["candidate_info"]
+            profile["tech_questions"] = QUESTION_TEMPLATES.questions(info["tech_stack"], info.get("experience"))
+    elif with_stack:
+        asyncio.run(_model_questions(with_stack))
+    return profiles
+
+
+def _chunks(items: Iterable[Item], size: int) -> Iterator[List[Item]]:
+    chunk: List[Item] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Progress:
+    """Throughput and error counts, reported at most every `interval` seconds"""
+
+    def __init__(self, interval: float = 5.0, stream: TextIO = sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.reported = self.started
+        self.done = 0
+        self.errors = 0
+
+    def add(self, profiles: List[Dict]) -> None:
+        self.done += len(profiles)
+        self.errors += sum("error" in profile for profile in profiles)
+        now = time.perf_counter()
+        if now - self.reported >= self.interval:
+            self.reported = now
+            self.report()
+
+    def report(self, final: bool = False) -> None:
+        elapsed = time.perf_counter() - self.started
+        print(f"{'done: ' if final else ''}{self.done} transcripts, {self.errors} unreadable, "
+              f"{elapsed:.1f}s, {self.done / max(elapsed, 1e-9):.0f}/s", file=self.stream, flush=True)
+
+
+def run_batch(items: Iterable[Item], output: TextIO, workers: int = 1, chunk_size: int = 200,
+              questions: str = "none", fake_llm: bool = False, progress: Optional[Progress] = None) -> Progress:
+    """Screen every transcript on a process pool and write one profile per line to `output`, in input order"""
+    progress = progress or Progress()
+    in_flight: Deque["Future[List[Dict]]"] = deque()
+
+    def write(profiles: List[Dict]) -> None:
+        output.writelines(json.dumps(profile, ensure_ascii=False) + "\n" for profile in profiles)
+        progress.add(profiles)
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(questions, fake_llm)) as pool:
+        for chunk in _chunks(items, chunk_size):
+            # Two chunks per worker keep every process busy without reading ahead of the writer
+            if len(in_flight) >= 2 * workers:
+                write(in_flight.popleft().result())
+            in_flight.append(pool.submit(screen_chunk, chunk))
+        while in_flight:
+            write(in_flight.popleft().result())
+    output.flush()
+    progress.report(final=True)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run candidate extraction over archived interview transcripts")
+    parser.add_argument("transcripts", nargs="*", help="JSON lines files of transcripts, - for stdin")
+    parser.add_argument("--session-db", help="SQLiteSessionStore file to read sessions from")
+    parser.add_argument("--output", default="-", help="JSON lines file to write profiles to (default stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=200, help="transcripts per task sent to a worker")
+    parser.add_argument("--questions", choices=QUESTION_MODES, default="none",
+                        help="also write technical questions: from templates, or from the question bank and model")
+    parser.add_argument("--fake-llm", action="store_true", help="generate questions with the offline fake backend")
+    parser.add_argument("--progress", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
+    if not args.transcripts and not args.session_db:
+        parser.error("give transcript files or --session-db")
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    items = read_transcripts(args.transcripts, args.session_db)
+    if args.output == "-":
+        run_batch(items, sys.stdout, args.workers, args.chunk_size, args.questions, args.fake_llm,
+                  Progress(args.progress))
+        return
+    with open(args.output, "w", encoding="utf-8") as output:
+        run_batch(items, output, args.workers, args.chunk_size, args.questions, args.fake_llm,
+                  Progress(args.progress))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: incremental analytics vs recomputing from stored interviews
+Feeds synthetic interviews through RecruitingAnalytics one turn at a time,
+then compares the cost of reading the aggregates (snapshot()) with
+recomputing the same counts by scanning every stored session state, as
+the number of interviews grows. Also reports the cost of recording a turn.
+
+Usage: python benchmarks/bench_analytics.py [--sizes 1000,10000,100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import RecruitingAnalytics, experience_range
+from prompt_builder import STAGES
+from tech_taxonomy import TECHNOLOGIES
+from turn_pipeline import QUESTIONS_PER_INTERVIEW
+
+
+def run_interview(analytics: RecruitingAnalytics, rng: random.Random):
+    """Walk one interview through the stages, leaving at a random point; returns its final state"""
+    analytics.record_start()
+    stage, info = "greeting", {}
+    leave_at = rng.choice(STAGES[1:] + ["conclusion"] * 3)
+    for next_stage in STAGES[1:]:
+        next_info = dict(info)
+        if next_stage == "tech_stack":
+            next_info["experience"] = f"{rng.randint(0, 15)} years"
+        if next_stage == "tech_questions":
+            next_info["tech_stack"] = {category: [rng.choice(techs)]
+                                       for category, techs in rng.sample(list(TECHNOLOGIES.items()), 3)}
+        turns = QUESTIONS_PER_INTERVIEW if next_stage == "conclusion" else 1
+        for _ in range(turns - 1):
+            analytics.record_turn(stage, info, stage, info)
+        analytics.record_turn(stage, info, next_stage, next_info)
+        stage, info = next_stage, next_info
+        if stage == leave_at:
+            break
+    analytics.record_end(stage, "completed" if stage == "conclusion" else "ended_early")
+    return {"stage": stage, "info": info}
+
+
+def recompute(states):
+    """The aggregates from scratch: one pass over every stored interview"""
+    reached, technologies, experience = Counter(), Counter(), Counter()
+    for state in states:
+        reached.update(STAGES[:STAGES.index(state["stage"]) + 1])
+        for category, techs in state["info"].get("tech_stack", {}).items():
+            technologies.update((category, tech) for tech in techs)
+        label = experience_range(state["info"].get("experience"))
+        if label:
+            experience[label] += 1
+    return reached, technologies, experience
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    analytics = RecruitingAnalytics()
+    states = []
+    for size in map(int, args.sizes.split(",")):
+        while len(states) < size:
+            states.append(run_interview(analytics, rng))
+        started = time.perf_counter()
+        for _ in range(100):
+            analytics.snapshot()
+        snapshot_ms = (time.perf_counter() - started) * 10
+        started = time.perf_counter()
+        recompute(states)
+        recompute_ms = (time.perf_counter() - started) * 1000
+        print(f"{size:>7} interviews: snapshot {snapshot_ms:6.3f} ms, recompute {recompute_ms:8.1f} ms")
+
+    # The most expensive turn to record: a stage change that also brings a tech stack and experience
+    info = {"experience": "5 years", "tech_stack": {"programming_languages": ["python", "go"],
+                                                    "databases": ["postgresql"], "cloud_platforms": ["aws"]}}
+    turns = 100000
+    started = time.perf_counter()
+    for _ in range(turns):
+        analytics.record_turn("tech_stack", {}, "tech_questions", info)
+    print(f"record_turn with a new tech stack: {(time.perf_counter() - started) / turns * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: batch re-screening throughput and memory
+Writes synthetic interview transcripts to a JSON lines file, then screens
+them with batch_screening at one worker and at every CPU, reporting
+transcripts per second and the parent process's peak memory (which should
+not grow with the number of transcripts). No model is involved.
+
+Usage: python benchmarks/bench_batch_screening.py [--transcripts N] [--chunk-size N]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_screening import Progress, read_transcripts, run_batch
+from interview_service import GREETING_MESSAGE
+from tech_taxonomy import TECHNOLOGIES
+
+NAMES = ["Jane Smith", "Ravi Kumar", "Ana Lopez", "Tom Baker", "Mei Chen"]
+ANSWER = "I would start by measuring where the time goes, then fix the biggest cost first. "
+
+
+def make_transcript(index: int, rng: random.Random):
+    name = rng.choice(NAMES)
+    techs = [rng.choice(techs) for techs in rng.sample(list(TECHNOLOGIES.values()), 3)]
+    answers = ["Hello!",
+               f"I'm {name}, {name.split()[0].lower()}@example.com, {rng.randint(0, 15)} years of experience",
+               "I'm based in Berlin and applying as a backend developer. Happy to talk tech.",
+               f"Mostly {', '.join(techs)}."]
+    answers += [ANSWER * rng.randint(1, 6) for _ in range(4)]
+    messages = [{"role": "assistant", "content": GREETING_MESSAGE}]
+    for answer in answers:
+        messages.append({"role": "user", "content": answer})
+        messages.append({"role": "assistant", "content": "Thank you! " + ANSWER})
+    return {"id": f"session-{index}", "messages": messages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--transcripts", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    path = os.path.join(tempfile.mkdtemp(), "transcripts.jsonl")
+    with open(path, "w", encoding="utf-8") as file:
+        for index in range(args.transcripts):
+            file.write(json.dumps(make_transcript(index, rng)) + "\n")
+    print(f"{args.transcripts} transcripts, {os.path.getsize(path) / 2 ** 20:.0f} MiB")
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        output = open(os.devnull, "w")
+        started = time.perf_counter()
+        run_batch(read_transcripts([path]), output, workers, args.chunk_size, progress=Progress(stream=io.StringIO()))
+        elapsed = time.perf_counter() - started
+        output.close()
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{workers:>2} workers: {elapsed:.2f}s, {args.transcripts / elapsed:,.0f} transcripts/s, "
+              f"parent peak RSS {peak:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: Streamlit render time per answer against transcript length
+Runs the app's message and sidebar rendering through Streamlit's AppTest
+for the work one answer costs in each mode:
+- full: the whole transcript and one markdown call per tech badge, twice
+  (the answer's run plus the forced rerun)
+- incremental: the chat fragment's rerun, which draws only the messages
+  since the last full run, averaged with the full run (sidebar badges as
+  one batched block) that folds them into the transcript every few answers.
+  Answers that change the sidebar also take a full run; this measures the
+  ones that don't, such as answers to technical questions
+
+Usage: python benchmarks/bench_chat_render.py [--counts 10,50,100,200] [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest
+
+FRAGMENT_MESSAGE_LIMIT = 10  # app.FRAGMENT_MESSAGE_LIMIT; app.py only imports inside a script run
+
+
+def render_script(message_count: int, start: int, sidebar: str, runs: int):
+    """Draw messages[start:] of a synthetic transcript and the candidate sidebar ("batched", "per_badge"
+    or "none"), `runs` times"""
+    import streamlit as st
+    from app import display_candidate_info, display_message
+
+    tech_stack = {
+        "programming_languages": ["python", "go", "typescript", "rust", "java", "sql"],
+        "web_frameworks": ["django", "fastapi", "react", "next.js", "flask"],
+        "databases": ["postgresql", "redis", "mongodb", "elasticsearch"],
+        "cloud_platforms": ["aws", "gcp", "kubernetes", "docker", "terraform"]
+    }
+    info = {"name": "Jane Smith", "email": "jane@example.com", "experience": "5 years", "tech_stack": tech_stack}
+    messages = []
+    for index in range(message_count):
+        role = "assistant" if index % 2 == 0 else "user"
+        content = f"**Message {index}.** " + "Tell me about a system you designed and the trade-offs you made. " * 3
+        messages.append({"role": role, "content": content,
+                         "timing": {"time_to_first_token": 0.4, "total": 1.2} if role == "assistant" else None})
+
+    for _ in range(runs):
+        with st.sidebar:
+            if sidebar == "batched":
+                display_candidate_info(info)
+            elif sidebar == "per_badge":
+                # The original sidebar: one markdown call per field, category and badge
+                for key, value in info.items():
+                    if key == "tech_stack":
+                        st.markdown("**🛠️ Tech Stack:**")
+                        for category, techs in value.items():
+                            st.markdown(f"*{category.replace('_', ' ').title()}:*")
+                            for tech in techs:
+                                st.markdown(f'<span class="tech-badge">{tech}</span>', unsafe_allow_html=True)
+                    else:
+                        st.markdown(f"**{key.title()}:** {value}")
+        for message in messages[start:]:
+            display_message(message)
+
+
+def time_run(message_count: int, start: int, sidebar: str, runs: int, repeat: int) -> float:
+    """Median seconds of one script run drawing messages[start:] and the sidebar `runs` times"""
+    app_test = AppTest.from_function(render_script, args=(message_count, start, sidebar, runs),
+                                     default_timeout=60)
+    app_test.run()  # warm up imports and the page config
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        app_test.run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def time_incremental(message_count: int, repeat: int) -> float:
+    """Per-answer cost averaged over a cycle: fragment runs with a growing tail, then one full run"""
+    tails = range(2, FRAGMENT_MESSAGE_LIMIT + 1, 2)
+    total = sum(time_run(message_count, max(0, message_count - tail), "none", 1, repeat) for tail in tails)
+    total += time_run(message_count, 0, "batched", 1, repeat)
+    return total / len(tails)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--counts", default="10,50,100,200")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'messages':>8}  {'full':>10}  {'incremental':>12}")
+    for count in [int(value) for value in args.counts.split(",")]:
+        full = time_run(count, 0, "per_badge", 2, args.repeat)
+        incremental = time_incremental(count, args.repeat)
+        print(f"{count:>8}  {full * 1000:>8.1f}ms  {incremental * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
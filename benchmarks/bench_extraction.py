@@ -0,0 +1,117 @@
+"""
+Benchmark: single-pass extraction engine vs the legacy per-pattern extraction
+Reports per-message cost for both and batch throughput for the engine.
+
+Usage: python benchmarks/bench_extraction.py [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candidate_extraction import EXTRACTION_ENGINE
+
+MESSAGES = [
+    "Hi, my name is Jane Smith and I'm based in Berlin, Germany",
+    "Sure, my email is jane.smith@example.com and my phone is +49 151-234-5678",
+    "I have 7 years of experience, mostly as a Senior Backend Developer",
+    "I'm looking for a lead engineer or architect role",
+    "I live in Austin, Texas and have been coding for 4+ yrs",
+    "Mostly Python and Django, some Go. Happy to talk tech!",
+]
+
+
+def legacy_extract(candidate_info, user_input):
+    """The original extract_candidate_info: ten re.search calls plus keyword loops"""
+    
+    # Extract email with improved pattern
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b'
+    email_match = re.search(email_pattern, user_input)
+    if email_match:
+        candidate_info["email"] = email_match.group()
+        
+    # Extract phone number with international support
+    phone_patterns = [
+        r'(\+\d{1,3}[-.\s]?)?(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})',  # US format
+        r'(\+\d{1,3}[-.\s]?)?\d{8,15}',  # International format
+    ]
+    for pattern in phone_patterns:
+        phone_match = re.search(pattern, user_input)
+        if phone_match:
+            candidate_info["phone"] = phone_match.group()
+            break
+            
+    # Extract years of experience with multiple patterns
+    exp_patterns = [
+        r'(\d+)\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp)',
+        r'(\d+)\+?\s*(?:years?|yrs?)',
+        r'experienced?\s*(?:for\s*)?(\d+)\s*(?:years?|yrs?)'
+    ]
+    for pattern in exp_patterns:
+        exp_match = re.search(pattern, user_input.lower())
+        if exp_match:
+            years = exp_match.group(1)
+            candidate_info["experience"] = f"{years} years"
+            break
+            
+    # Extract name with better logic
+    if "name" not in candidate_info:
+        # Look for "I'm" or "My name is" patterns
+        name_patterns = [
+            r"(?:i'm|i am|name is|call me)\s+([A-Z][a-z]+\s+[A-Z][a-z]+)",
+            r"([A-Z][a-z]+\s+[A-Z][a-z]+)(?:\s|$)"
+        ]
+        for pattern in name_patterns:
+            name_match = re.search(pattern, user_input)
+            if name_match:
+                candidate_info["name"] = name_match.group(1)
+                break
+            
+    # Extract position/role with expanded keywords
+    position_keywords = [
+        "developer", "engineer", "programmer", "architect", "analyst", "manager", 
+        "lead", "senior", "junior", "full stack", "backend", "frontend", "devops",
+        "data scientist", "ml engineer", "software engineer", "web developer"
+    ]
+    for keyword in position_keywords:
+        if keyword in user_input.lower():
+            candidate_info["position"] = user_input.strip()
+            break
+            
+    # Extract location
+    if any(word in user_input.lower() for word in ["from", "live", "based", "located"]):
+        # Simple location extraction
+        words = user_input.split()
+        for i, word in enumerate(words):
+            if word.lower() in ["from", "in", "at"] and i + 1 < len(words):
+                location = " ".join(words[i+1:i+3])  # Take next 1-2 words
+                if location and not any(char.isdigit() for char in location):
+                    candidate_info["location"] = location.strip(".,!")
+                    break
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    legacy = timeit.timeit(lambda: [legacy_extract({}, m) for m in MESSAGES], number=args.repeat)
+    engine = timeit.timeit(lambda: [EXTRACTION_ENGINE.scan(m) for m in MESSAGES], number=args.repeat)
+    per_message = args.repeat * len(MESSAGES)
+    print(f"legacy  {legacy / per_message * 1e6:8.2f} us/message")
+    print(f"engine  {engine / per_message * 1e6:8.2f} us/message  ({legacy / engine:.1f}x)")
+
+    batch = MESSAGES * 20000
+    started = time.perf_counter()
+    EXTRACTION_ENGINE.scan_batch(batch)
+    elapsed = time.perf_counter() - started
+    print(f"batch   {len(batch) / elapsed:8.0f} messages/s over {len(batch)} messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: conversation history size per turn
+Compares the old history, the last 6 messages joined verbatim, with
+ConversationMemory's token-budgeted summary plus recent window over a long
+synthetic interview whose answers vary from a few words to long paragraphs.
+
+Usage: python benchmarks/bench_history.py [--turns N] [--budget TOKENS]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_memory import ConversationMemory
+from interview_service import GREETING_MESSAGE
+from token_counting import estimate_tokens
+
+SENTENCE = "I worked on a service that handled payments and had to keep latency low under heavy load. "
+
+
+def legacy_history(messages):
+    return "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages[-6:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=600)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    messages = [{"role": "assistant", "content": GREETING_MESSAGE}]
+    memory = ConversationMemory(args.budget)
+    memory.add("assistant", GREETING_MESSAGE)
+    sizes = {"last 6 messages": [], "memory": []}
+    for _ in range(args.turns):
+        answer = SENTENCE * rng.choice([0, 1, 1, 2, 4, 12, 30]) + "Thanks."
+        messages.append({"role": "user", "content": answer})
+
+        sizes["last 6 messages"].append(estimate_tokens(legacy_history(messages)))
+        memory.add("user", answer)
+        sizes["memory"].append(estimate_tokens(memory.render()))
+
+        reply = "Thanks for sharing that. " + SENTENCE * rng.choice([1, 2, 3])
+        messages.append({"role": "assistant", "content": reply})
+        memory.add("assistant", reply)
+
+    for label, values in sizes.items():
+        print(f"{label:<16} mean {sum(values) / len(values):7.0f} tokens  max {max(values):6d} tokens")
+
+
+if __name__ == "__main__":
+    main()
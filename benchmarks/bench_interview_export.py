@@ -0,0 +1,84 @@
+"""
+Benchmark: cost of exporting a finished interview on the farewell turn
+Compares appending and fsyncing each interview inline, as a synchronous
+completion hook would, with InterviewExporter's queued hook plus
+background batches. Reports the hook's latency as seen by the turn and
+the writer's throughput for a burst of completions.
+
+Usage: python benchmarks/bench_interview_export.py [--interviews N] [--format jsonl|parquet]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interview_export import EXPORT_FORMATS, InterviewExporter, read_exports
+
+ANSWER = "I would start by measuring where the time goes, then fix the biggest cost first. "
+
+
+def make_record(index: int):
+    messages = []
+    for turn in range(12):
+        messages.append({"role": "user", "content": ANSWER * (1 + turn % 4)})
+        messages.append({"role": "assistant", "content": "Thank you! " + ANSWER * 2})
+    return {"id": f"session-{index}", "created": time.time(), "completed": time.time(), "stage": "conclusion",
+            "questions_asked": 4,
+            "candidate_info": {"name": "Jane Smith", "email": "jane@example.com", "experience": "6 years",
+                               "tech_stack": {"programming_languages": ["python"], "databases": ["postgresql"]}},
+            "tech_questions": [f"Q{n}: {ANSWER}" for n in range(1, 5)], "messages": messages}
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--interviews", type=int, default=2000)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    args = parser.parse_args()
+    records = [make_record(index) for index in range(args.interviews)]
+
+    samples = []
+    with open(os.path.join(tempfile.mkdtemp(), "inline.jsonl"), "ab") as file:
+        started = time.perf_counter()
+        for record in records:
+            begun = time.perf_counter()
+            file.write(json.dumps(record).encode("utf-8") + b"\n")
+            file.flush()
+            os.fsync(file.fileno())
+            samples.append(time.perf_counter() - begun)
+        inline_seconds = time.perf_counter() - started
+    p50, p99 = percentiles(samples)
+    print(f"inline write+fsync   hook p50 {p50:8.1f} µs  p99 {p99:8.1f} µs  "
+          f"{args.interviews / inline_seconds:8,.0f} interviews/s")
+
+    directory = tempfile.mkdtemp()
+    exporter = InterviewExporter(directory, args.format, flush_interval=0.05)
+    samples = []
+    started = time.perf_counter()
+    for record in records:
+        begun = time.perf_counter()
+        exporter.submit(record)
+        samples.append(time.perf_counter() - begun)
+    exporter.close()
+    queued_seconds = time.perf_counter() - started
+    p50, p99 = percentiles(samples)
+    print(f"queued, batched      hook p50 {p50:8.1f} µs  p99 {p99:8.1f} µs  "
+          f"{args.interviews / queued_seconds:8,.0f} interviews/s")
+
+    started = time.perf_counter()
+    count = sum(1 for _ in read_exports(directory))
+    print(f"read back {count} interviews in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
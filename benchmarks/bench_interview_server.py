@@ -0,0 +1,99 @@
+"""
+Benchmark: headless interview API throughput under concurrent sessions
+Starts interview_server on a local port with the offline fake backend and
+drives N concurrent candidates through a short scripted interview over
+keep-alive HTTP connections, reporting turns per second and turn latency.
+
+Usage: python benchmarks/bench_interview_server.py [--sessions N] [--latency S]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hiring_assistant import HiringAssistant
+from interview_server import serve
+from interview_service import InterviewService
+from llm_backend import FakeBackend
+from llm_cache import LLM_CACHE
+
+SCRIPT = [
+    "Hi, I'm ready",
+    "My name is Alex Morgan",
+    "alex.morgan@example.com, +1 555 010 2030",
+    "5 years of experience, looking for a Backend Developer role in Berlin",
+    "Python, Django, PostgreSQL, Docker and AWS",
+]
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = (await reader.readline()).strip()
+        if not line:
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} -> {status}: {data!r}")
+    return json.loads(data) if data else None
+
+
+async def candidate(port, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        session = await request(reader, writer, "POST", "/sessions")
+        for message in SCRIPT:
+            started = time.perf_counter()
+            await request(reader, writer, "POST", f"/sessions/{session['session_id']}/answers", {"message": message})
+            latencies.append(time.perf_counter() - started)
+        await request(reader, writer, "DELETE", f"/sessions/{session['session_id']}")
+    finally:
+        writer.close()
+
+
+async def run(sessions, latency):
+    backend = FakeBackend(mean_latency=latency, latency_jitter=latency / 2, seed=1,
+                          max_concurrency=sessions, timeout=30)
+    service = InterviewService(assistant_factory=lambda: HiringAssistant("benchmark-key", backend=backend))
+    server = await serve(service, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    latencies = []
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(candidate(port, latencies) for _ in range(sessions)))
+    finally:
+        server.close()
+        await server.wait_closed()
+    return time.perf_counter() - started, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.5, help="mean fake model latency in seconds")
+    args = parser.parse_args()
+
+    # Every candidate sends the same script, so keep the response cache from standing in for the model
+    LLM_CACHE.max_entries = 0
+    elapsed, latencies = asyncio.run(run(args.sessions, args.latency))
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{args.sessions} concurrent sessions, {len(latencies)} turns in {elapsed:.2f}s")
+    print(f"throughput {len(latencies) / elapsed:8.1f} turns/s")
+    print(f"turn latency p50 {statistics.median(latencies):.3f}s p95 {p95:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
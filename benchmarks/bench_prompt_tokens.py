@@ -0,0 +1,147 @@
+"""
+Benchmark: prompt tokens per turn, before and after stage-specific assembly
+Replays the load-test personas through HiringAssistant on the fake backend
+and, at every model turn, estimates the input tokens of the original prompt
+(full system prompt, indented f-string, indent=2 JSON) and of the
+PromptBuilder prompt, both given the same conversation history, with a
+per-section breakdown of the new one.
+
+Usage: python benchmarks/bench_prompt_tokens.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_memory import ConversationMemory
+from hiring_assistant import HiringAssistant
+from interview_service import GREETING_MESSAGE
+from llm_backend import FakeBackend
+from load_test import PERSONAS
+from token_counting import estimate_tokens
+
+LEGACY_SYSTEM_PROMPT = """You are an AI Hiring Assistant for TalentScout, a prestigious technology recruitment agency. 
+        Your role is to conduct professional, thorough, and engaging initial candidate screening interviews.
+
+        CORE OBJECTIVES:
+        1. Create a welcoming, professional interview experience
+        2. Systematically collect all required candidate information
+        3. Assess technical competency through targeted questions
+        4. Maintain conversation flow and handle edge cases gracefully
+        5. Provide clear next steps and professional closure
+
+        CONVERSATION STAGES:
+        1. GREETING: Professional welcome, explain purpose and process (2-3 minutes)
+        2. INFO_GATHERING: Systematic collection of candidate details (5-7 minutes)
+        3. TECH_STACK: Deep dive into technical skills and experience (3-4 minutes)
+        4. TECH_QUESTIONS: 4-5 targeted technical assessment questions (8-10 minutes)
+        5. CONCLUSION: Professional wrap-up with clear next steps (2 minutes)
+
+        REQUIRED INFORMATION TO COLLECT:
+        ✓ Full Name (First and Last)
+        ✓ Professional Email Address
+        ✓ Phone Number (with country code if international)
+        ✓ Years of Professional Experience
+        ✓ Desired Position/Role (specific titles)
+        ✓ Current Location (City, Country)
+        ✓ Comprehensive Tech Stack:
+          - Programming Languages (proficiency levels)
+          - Frameworks and Libraries
+          - Databases and Data Technologies
+          - Cloud Platforms and DevOps Tools
+          - Development Tools and IDEs
+          - Methodologies (Agile, DevOps, etc.)
+
+        INTERACTION GUIDELINES:
+        - Maintain professional yet approachable tone throughout
+        - Ask ONE focused question at a time for better user experience
+        - Acknowledge and confirm information as it's provided
+        - Use natural conversation flow, avoid robotic responses
+        - Handle incomplete or unclear responses with gentle clarification
+        - Adapt question difficulty based on stated experience level
+        - Generate technical questions that are:
+          * Relevant to their specific tech stack
+          * Appropriate for their experience level
+          * Mix of conceptual and practical scenarios
+          * Professional interview-standard quality
+
+        CONVERSATION ENDING:
+        - Detect keywords: "bye", "goodbye", "exit", "quit", "done", "finish"
+        - Provide professional summary and next steps
+        - Thank candidate for their time
+
+        STAY FOCUSED:
+        - Only discuss hiring, recruitment, and technical assessment topics
+        - Politely redirect off-topic conversations back to the interview
+        - Handle unexpected inputs gracefully with professional responses
+
+        Respond conversationally, never as lists or bullet points unless specifically formatting technical questions."""
+
+
+def legacy_turn_prompt(assistant, user_input, conversation_history):
+    """The per-turn prompt as build_prompt assembled it before PromptBuilder"""
+    return f"""
+        CURRENT CONTEXT:
+        - Conversation Stage: {assistant.conversation_stage.upper()}
+        - Questions Asked: {assistant.questions_asked}/4
+        - Conversation Active: {assistant.conversation_active}
+        
+        COLLECTED CANDIDATE INFORMATION:
+        {json.dumps(assistant.candidate_info, indent=2) if assistant.candidate_info else "None yet"}
+        
+        RECENT CONVERSATION HISTORY:
+        {conversation_history}
+        
+        CANDIDATE'S LATEST RESPONSE: "{user_input}"
+        
+        INSTRUCTIONS FOR THIS RESPONSE:
+        1. Process the candidate's input and extract any relevant information
+        2. Update conversation stage if appropriate
+        3. Provide a natural, professional response
+        4. Ask the next logical question or provide technical questions if ready
+        5. If generating technical questions, make them specific to their tech stack
+        
+        Generate your response now:
+        """
+
+
+async def replay(script, totals, sections):
+    assistant = HiringAssistant("benchmark-key", backend=FakeBackend(mean_latency=0))
+    memory = ConversationMemory()
+    memory.add("assistant", GREETING_MESSAGE)
+    for message in script:
+        memory.add("user", message)
+        history = memory.render()
+        if not assistant.is_ending_message(message):
+            legacy = LEGACY_SYSTEM_PROMPT + legacy_turn_prompt(assistant, message, history)
+            current = assistant.get_system_prompt() + assistant.build_prompt(message, history)
+            totals["before"].append(estimate_tokens(legacy))
+            totals["after"].append(estimate_tokens(current))
+            for section, tokens in assistant.last_prompt_tokens.items():
+                sections[section].append(tokens)
+        reply = await assistant.agenerate_response(message, history)
+        memory.add("assistant", reply)
+
+
+def main():
+    totals = {"before": [], "after": []}
+    sections = defaultdict(list)
+    for script in PERSONAS.values():
+        asyncio.run(replay(script, totals, sections))
+
+    before = sum(totals["before"]) / len(totals["before"])
+    after = sum(totals["after"]) / len(totals["after"])
+    print(f"{len(totals['before'])} model turns across {len(PERSONAS)} scripted interviews")
+    print(f"before {before:7.0f} tokens/turn")
+    print(f"after  {after:7.0f} tokens/turn ({(1 - after / before) * 100:.0f}% fewer)")
+    print("mean tokens per section (after):")
+    for section, values in sections.items():
+        print(f"  {section:<20} {sum(values) / len(values):6.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: question bank size, load time and lookup latency
+Banks synthetic questions for the most frequent (stack, experience) pairs
+among generated candidate profiles (a few popular stacks, often with one
+extra technology), writes and reloads the file, then looks up a fresh
+sample of profiles and reports hit rate and lookup latency. The model is
+not involved; question text is placeholder of realistic length.
+
+Usage: python benchmarks/bench_question_bank.py [--profiles N] [--top N] [--lookups N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import QuestionBank, most_common_profiles, stack_terms
+from question_templates import experience_bucket
+from tech_taxonomy import TECHNOLOGIES
+
+POPULAR_STACKS = [
+    {"programming_languages": ["python"], "web_frameworks": ["django"], "databases": ["postgresql"]},
+    {"programming_languages": ["javascript", "typescript"], "web_frameworks": ["react", "nextjs"]},
+    {"programming_languages": ["java"], "web_frameworks": ["spring"], "databases": ["mysql"], "cloud_platforms": ["aws"]},
+    {"programming_languages": ["go"], "devops_tools": ["docker", "kubernetes"], "cloud_platforms": ["gcp"]},
+    {"programming_languages": ["python"], "web_frameworks": ["fastapi"], "databases": ["redis", "postgresql"]},
+    {"programming_languages": ["dart"], "mobile_frameworks": ["flutter"], "databases": ["firebase"]},
+]
+
+
+def make_profiles(count: int, rng: random.Random):
+    for _ in range(count):
+        stack = {category: list(techs) for category, techs in rng.choice(POPULAR_STACKS).items()}
+        for _ in range(rng.choice((0, 0, 1, 1, 2))):
+            category = rng.choice(list(TECHNOLOGIES))
+            stack.setdefault(category, []).append(rng.choice(TECHNOLOGIES[category]))
+        yield {"tech_stack": stack, "experience": f"{rng.randint(0, 15)} years"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=50000)
+    parser.add_argument("--top", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    bank = QuestionBank()
+    for index, profile in enumerate(most_common_profiles(make_profiles(args.profiles, rng), args.top)):
+        terms = sorted(stack_terms(profile["tech_stack"]))
+        bank.add(terms, experience_bucket(profile["experience"]),
+                 [f"Q{n}: Entry {index}: describe a production problem you solved with {terms[n % len(terms)]} "
+                  f"and the trade-offs you weighed." for n in range(1, 5)])
+
+    path = os.path.join(tempfile.mkdtemp(), "question_bank.bin")
+    bank.save(path)
+    started = time.perf_counter()
+    bank = QuestionBank.load(path)
+    load_ms = (time.perf_counter() - started) * 1000
+    print(f"{len(bank)} entries, {os.path.getsize(path) / 1024:.0f} KiB on disk, loaded in {load_ms:.1f} ms")
+
+    samples, hits = [], 0
+    for profile in make_profiles(args.lookups, rng):
+        started = time.perf_counter()
+        questions = bank.lookup(profile["tech_stack"], profile["experience"])
+        samples.append(time.perf_counter() - started)
+        hits += questions is not None
+    samples.sort()
+    print(f"{args.lookups} lookups: {hits / args.lookups:.0%} served from the bank, "
+          f"p50 {statistics.median(samples) * 1e6:.1f} µs, p99 {samples[int(len(samples) * 0.99)] * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
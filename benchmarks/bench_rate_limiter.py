@@ -0,0 +1,92 @@
+"""
+Benchmark: waits for model quota at peak, with fair scheduling and without
+Simulates a process already at its requests-per-minute quota: ordinary
+sessions answer a question every --think seconds and each turn also starts
+a background question-generation call, while one bursty session keeps
+--burst calls queued at all times. Every call waits for an
+AdmissionController and then a simulated 50 ms model call, scheduled either
+- fair: turns before background work, sessions served in turn, or
+- fifo: one first-come, first-served queue (the same buckets, one flow)
+and the report is the time ordinary turns and background calls spent
+waiting for quota.
+
+Usage: python benchmarks/bench_rate_limiter.py [--rpm N] [--sessions N] [--seconds S]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import BACKGROUND, INTERACTIVE, AdmissionController
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+async def simulate(fair: bool, rpm: float, sessions: int, seconds: float, think: float, burst: int):
+    limiter = AdmissionController(requests_per_minute=rpm)
+    limiter.requests.level = 0  # already at quota
+    waits = {"turn": [], "background": [], "burst": []}
+    stop = time.perf_counter() + seconds
+
+    async def call(kind: str, flow, priority: int) -> None:
+        started = time.perf_counter()
+        if not fair:
+            flow, priority = "all", INTERACTIVE
+        await limiter.acquire(100, flow, priority)
+        waits[kind].append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+    async def ordinary(session: int) -> None:
+        await asyncio.sleep(think * session / sessions)
+        background = []
+        while time.perf_counter() < stop:
+            background.append(asyncio.ensure_future(call("background", session, BACKGROUND)))
+            await call("turn", session, INTERACTIVE)
+            await asyncio.sleep(think)
+        for task in background:
+            task.cancel()
+
+    async def bursty() -> None:
+        async def worker():
+            while time.perf_counter() < stop:
+                await call("burst", "bursty", INTERACTIVE)
+        await asyncio.gather(*(worker() for _ in range(burst)))
+
+    tasks = [asyncio.ensure_future(ordinary(session)) for session in range(sessions)]
+    tasks.append(asyncio.ensure_future(bursty()))
+    await asyncio.wait(tasks, timeout=seconds + 5)
+    for task in tasks:
+        task.cancel()
+    return waits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rpm", type=float, default=600)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--think", type=float, default=4.0)
+    parser.add_argument("--burst", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.rpm:.0f} requests/min, {args.sessions} sessions answering every {args.think:.1f}s, "
+          f"one session with {args.burst} calls queued\n")
+    print(f"{'mode':<6} {'turns':>6} {'turn wait p50':>14} {'p95':>8} {'background':>11} {'bg wait p50':>12}")
+    for label, fair in (("fifo", False), ("fair", True)):
+        waits = asyncio.run(simulate(fair, args.rpm, args.sessions, args.seconds, args.think, args.burst))
+        turns, background = waits["turn"], waits["background"]
+        print(f"{label:<6} {len(turns):>6} {statistics.median(turns or [0]):>13.2f}s "
+              f"{percentile(turns, 0.95):>7.2f}s {len(background):>11} "
+              f"{statistics.median(background or [0]):>11.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: candidate-to-role matching at 100k candidates x 10k roles
+Generates candidates with realistic tech stacks (a core language and
+framework plus a few random technologies) and roles with three to six
+required and up to four preferred technologies, then times:
+- compiling the bitsets and inverted indexes
+- single lookups: top roles for one candidate, top candidates for one role
+- full rankings: top-k roles for every candidate, top-k candidates for every role
+
+Usage: python benchmarks/bench_role_matching.py [--candidates N] [--roles N] [--k N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from role_matching import MatchingEngine, Role
+from tech_taxonomy import TECHNOLOGIES
+
+CATEGORIES = list(TECHNOLOGIES)
+
+
+def random_techs(rng: random.Random, count: int):
+    techs = set()
+    while len(techs) < count:
+        category = rng.choice(CATEGORIES)
+        techs.add((category, rng.choice(TECHNOLOGIES[category])))
+    return techs
+
+
+def make_engine(candidates: int, roles: int, seed: int = 5) -> MatchingEngine:
+    rng = random.Random(seed)
+    engine = MatchingEngine()
+    for index in range(roles):
+        required = [tech for _, tech in random_techs(rng, rng.randint(3, 6))]
+        preferred = [tech for _, tech in random_techs(rng, rng.randint(0, 4)) if tech not in required]
+        engine.add_role(Role(f"role-{index}", f"Role {index}", tuple(required), tuple(preferred), rng.randint(0, 8)))
+    for index in range(candidates):
+        stack = {}
+        for category, tech in random_techs(rng, rng.randint(3, 10)):
+            stack.setdefault(category, []).append(tech)
+        engine.add_candidate(f"candidate-{index}", stack, f"{rng.randint(0, 15)} years")
+    return engine
+
+
+def time_lookups(lookup, ids, rng: random.Random, k: int, samples: int = 200) -> float:
+    timings = []
+    for identifier in rng.sample(ids, min(samples, len(ids))):
+        started = time.perf_counter()
+        lookup(identifier, k)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--roles", type=int, default=10_000)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    engine = make_engine(args.candidates, args.roles)
+    print(f"{args.candidates} candidates, {args.roles} roles, {len(engine.vocabulary)} technologies "
+          f"(generated in {time.perf_counter() - started:.1f}s)")
+    started = time.perf_counter()
+    compiled = engine.compile()
+    print(f"compile: {(time.perf_counter() - started) * 1000:.0f} ms, "
+          f"candidate bitsets {compiled.candidate_bits.nbytes / 1e6:.1f} MB")
+
+    rng = random.Random(1)
+    print(f"top {args.k} roles for one candidate:   p50 {time_lookups(engine.top_roles, engine.candidate_ids, rng, args.k) * 1000:.2f} ms")
+    print(f"top {args.k} candidates for one role:   p50 {time_lookups(engine.top_candidates, engine.role_ids, rng, args.k) * 1000:.2f} ms")
+    for label, rank in (("roles for every candidate", engine.top_roles_batch),
+                        ("candidates for every role", engine.top_candidates_batch)):
+        started = time.perf_counter()
+        rank(args.k)
+        print(f"top {args.k} {label}: {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: per-session construction time and retained memory
+Compares the old constructor, which configured genai and built a fresh
+GenerativeModel for every session, with sessions borrowing the shared
+model from gemini_client.MODEL_REGISTRY. No network calls are made: the
+Gemini client connects lazily on the first request.
+
+Usage: python benchmarks/bench_session_init.py [--sessions N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import google.generativeai as genai
+
+from hiring_assistant import HiringAssistant
+from gemini_client import DEFAULT_MODEL, MODEL_REGISTRY
+
+API_KEY = os.getenv("GEMINI_API_KEY") or "benchmark-key"
+
+
+class LegacyHiringAssistant(HiringAssistant):
+    """HiringAssistant with the original per-session client construction"""
+
+    def __init__(self):
+        genai.configure(api_key=API_KEY)
+        self.model = genai.GenerativeModel(DEFAULT_MODEL)
+        self.conversation_stage = "greeting"
+        self.candidate_info = {}
+        self.tech_questions = []
+        self.questions_asked = 0
+        self.conversation_active = True
+        self.last_turn_timing = {}
+
+
+def measure(factory, sessions):
+    """Return (microseconds per construction, retained bytes per session)"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    alive = [factory() for _ in range(sessions)]
+    elapsed = time.perf_counter() - started
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del alive
+    return elapsed / sessions * 1e6, retained / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=500)
+    args = parser.parse_args()
+
+    MODEL_REGISTRY.get_model(API_KEY)  # the shared model is built once per process
+    for label, factory in (("per-session model", LegacyHiringAssistant),
+                           ("shared registry", lambda: HiringAssistant(API_KEY))):
+        micros, retained = measure(factory, args.sessions)
+        print(f"{label:<18} {micros:9.1f} us/session {retained / 1024:8.2f} KiB/session")
+
+
+if __name__ == "__main__":
+    main()
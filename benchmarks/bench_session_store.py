@@ -0,0 +1,108 @@
+"""
+Benchmark: cost of persisting sessions on the turn path, and resuming them
+Saves realistic mid-interview sessions through each store and reports the
+latency save() adds to a turn:
+- memory: InMemorySessionStore
+- sqlite write-behind: SQLiteSessionStore (encode and queue; a thread commits)
+- sqlite per save: encode and commit in the turn, the naive alternative
+Then reopens the file and times resuming every session from disk.
+
+Usage: python benchmarks/bench_session_store.py [--sessions N] [--turns N]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_memory import ConversationMemory
+from hiring_assistant import HiringAssistant
+from interview_service import GREETING_MESSAGE
+from session_store import InMemorySessionStore, InterviewSession, SQLiteSessionStore, encode_session
+
+ANSWER = "I built a payments service in Python and Django, and moved it to Kubernetes last year. "
+REPLY = "Thanks for sharing that. How did you handle retries and idempotency across those services?"
+
+
+def make_session(index: int, turns: int) -> InterviewSession:
+    assistant = HiringAssistant("benchmark")
+    assistant.conversation_stage = "tech_questions"
+    assistant.candidate_info = {"name": "Jane Smith", "email": f"jane{index}@example.com", "experience": "5 years",
+                                "tech_stack": {"programming_languages": ["python"], "web_frameworks": ["django"]}}
+    assistant.tech_questions = [f"Q{n}: Explain a trade-off you made in a {n}-service system." for n in range(1, 5)]
+    session = InterviewSession(f"session-{index}", assistant, memory=ConversationMemory())
+    for role, content in [("assistant", GREETING_MESSAGE)] + [("user", ANSWER * 2), ("assistant", REPLY)] * turns:
+        session.messages.append({"role": role, "content": content})
+        session.memory.add(role, content)
+    return session
+
+
+class CommitEverySave(SQLiteSessionStore):
+    """The naive alternative: write and commit inside save(), on the turn's path"""
+
+    async def save(self, session: InterviewSession) -> None:
+        await super().save(session)
+        self.flush()
+
+
+def time_saves(store, sessions):
+    samples = []
+
+    async def run():
+        for session in sessions:
+            started = time.perf_counter()
+            await store.save(session)
+            samples.append(time.perf_counter() - started)
+    asyncio.run(run())
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=8)
+    args = parser.parse_args()
+
+    with patch("google.generativeai.configure"), patch("google.generativeai.GenerativeModel"):
+        sessions = [make_session(index, args.turns) for index in range(args.sessions)]
+        size = statistics.mean(len(encode_session(session)) for session in sessions[:100])
+        print(f"{args.sessions} sessions, {args.turns} turns each, {size:.0f} bytes encoded\n")
+
+        directory = tempfile.mkdtemp()
+        stores = [
+            ("memory", InMemorySessionStore()),
+            ("sqlite write-behind", SQLiteSessionStore(os.path.join(directory, "behind.db"))),
+            ("sqlite per save", CommitEverySave(os.path.join(directory, "per_save.db"), flush_interval=3600))
+        ]
+        for label, store in stores:
+            samples = sorted(time_saves(store, sessions))
+            p50 = samples[len(samples) // 2] * 1e6
+            p99 = samples[int(len(samples) * 0.99)] * 1e6
+            print(f"{label:<20} save p50 {p50:8.1f} µs  p99 {p99:8.1f} µs")
+            if isinstance(store, SQLiteSessionStore):
+                store.close()
+
+        path = os.path.join(directory, "behind.db")
+        with sqlite3.connect(path) as db:
+            stored = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        store = SQLiteSessionStore(path)
+        started = time.perf_counter()
+
+        async def resume_all():
+            for session in sessions:
+                await store.load(session.session_id)
+        asyncio.run(resume_all())
+        elapsed = time.perf_counter() - started
+        store.close()
+        print(f"\nresumed {stored} sessions from disk in {elapsed:.2f}s ({elapsed / stored * 1e6:.0f} µs each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Microbenchmark: compiled tech matcher vs the legacy per-term substring scan
+Grows the taxonomy from the real ~80 terms to several thousand synthetic ones
+and times both approaches on the same candidate message.
+
+Usage: python benchmarks/bench_tech_matcher.py [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tech_taxonomy import TECH_ALIASES, TECHNOLOGIES, TechMatcher
+
+MESSAGE = (
+    "I've spent 6 years on backend work, mostly Python with Django and FastAPI, "
+    "some Go for services, PostgreSQL and Redis for storage, and I deploy with "
+    "Docker, k8s and Terraform on AWS. Day to day I use Git, Jira and VS Code."
+)
+
+
+def legacy_extract(taxonomy, user_input):
+    """The original extract_tech_stack scan: one substring test per term"""
+    found_tech = {}
+    user_lower = user_input.lower()
+    for category, tech_set in taxonomy.items():
+        found_items = [tech for tech in tech_set if tech in user_lower]
+        if found_items:
+            found_tech[category] = found_items
+    return found_tech
+
+
+def grow_taxonomy(size):
+    """Pad the real taxonomy with synthetic terms until it holds `size` terms"""
+    taxonomy = {category: list(terms) for category, terms in TECHNOLOGIES.items()}
+    categories = list(taxonomy)
+    existing = sum(len(terms) for terms in taxonomy.values())
+    for i in range(max(0, size - existing)):
+        taxonomy[categories[i % len(categories)]].append(f"synthtech{i} framework")
+    return taxonomy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'terms':>7} {'legacy us/msg':>14} {'compiled us/msg':>16} {'speedup':>8}")
+    for size in (80, 500, 1000, 2500, 5000, 10000):
+        taxonomy = grow_taxonomy(size)
+        matcher = TechMatcher(taxonomy, TECH_ALIASES)
+        legacy = timeit.timeit(lambda: legacy_extract(taxonomy, MESSAGE), number=args.repeat)
+        compiled = timeit.timeit(lambda: matcher.extract(MESSAGE), number=args.repeat)
+        legacy_us = legacy / args.repeat * 1e6
+        compiled_us = compiled / args.repeat * 1e6
+        print(f"{matcher.term_count:>7} {legacy_us:>14.1f} {compiled_us:>16.1f} {legacy_us / compiled_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
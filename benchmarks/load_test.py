@@ -0,0 +1,264 @@
+"""
+Load test: how many simultaneous interviews one process can carry
+Scripted candidate personas walk through every stage of the interview
+(greeting, info_gathering, tech_stack, tech_questions, then an ending
+keyword) against the headless API server, which answers from the offline
+fake backend with configurable latency. Each concurrency level runs in a
+fresh process so its peak RSS is its own. The report is JSON.
+
+Usage: python benchmarks/load_test.py [--levels 10,50,100] [--rounds N]
+           [--latency S] [--jitter S] [--tail-rate P] [--output report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STAGES = ["greeting", "info_gathering", "tech_stack", "tech_questions", "conclusion"]
+
+# Each persona reaches the conclusion; only the last message may contain an ending keyword
+PERSONAS: Dict[str, List[str]] = {
+    "backend_senior": [
+        "Hi, thanks for having me",
+        "My name is Priya Raman",
+        "You can reach me at priya.raman@example.com or +44 20 7946 0958",
+        "I have 8 years of experience and I'm looking for a Senior Software Engineer role in London",
+        "Happy to talk about my tech skills now",
+        "Python, Django, PostgreSQL, Redis, Docker and Kubernetes on AWS",
+        "I would profile the slow queries first and add the missing indexes",
+        "Signals are convenient but I keep business logic in services for clarity",
+        "Containers share the host kernel, which makes them lighter than virtual machines",
+        "I use read replicas and connection pooling once the primary is saturated",
+        "Thanks, bye",
+    ],
+    "frontend_junior": [
+        "Hello!",
+        "I'm Tom Becker",
+        "tom.becker@example.org",
+        "2 years of experience, interested in a React Developer position in Berlin",
+        "Sure, let's cover the tech questions",
+        "JavaScript, TypeScript, React, Next.js, HTML and CSS",
+        "Hooks let function components hold state and side effects",
+        "I would memoize the expensive child components",
+        "Server-side HTML shows content sooner and helps SEO",
+        "Types catch a lot of mistakes before the code ever runs",
+        "That's all from me, goodbye",
+    ],
+    "data_engineer": [
+        "Good morning",
+        "Name: Ana Lima, email ana.lima@example.com, phone +55 11 91234 5678",
+        "5 years of experience, looking for a Data Engineer job, currently in Lisbon, Portugal",
+        "Yes, my tech background is mostly data",
+        "Python, Pandas, Spark, Airflow, Kafka, Snowflake and GCP",
+        "Partitioning by date keeps the daily jobs cheap",
+        "Idempotent tasks make retries safe",
+        "Exactly-once needs transactional producers and careful offsets",
+        "Columnar formats like Parquet compress well and skip unneeded columns",
+        "Thank you, I'm finished, bye",
+    ],
+    "mobile_dev": [
+        "Hey there",
+        "My full name is Kenji Watanabe",
+        "kenji.w@example.jp and my number is +81 3 1234 5678",
+        "I have 4 years of experience as a Mobile Developer in Tokyo, Japan and know my tech well",
+        "Swift, Kotlin, Flutter, Firebase and Git",
+        "I keep view models free of UI code so they are easy to test",
+        "Coroutines make async code read sequentially",
+        "I cache images on disk and cancel requests for cells that scroll away",
+        "Feature flags let us ship safely to a fraction of users",
+        "Bye!",
+    ],
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(values))))
+    return values[min(rank, len(values)) - 1]
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(values[-1], 4) if values else 0.0
+    }
+
+
+async def request(reader, writer, method: str, path: str, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: load\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = (await reader.readline()).strip()
+        if not line:
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} -> {status}")
+    return json.loads(data) if data else None
+
+
+async def virtual_candidate(port: int, rounds: int, think_time: float, rng: random.Random, results: Dict) -> None:
+    """Interview `rounds` times back to back, each time as a random persona, over one connection"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for _ in range(rounds):
+            persona = rng.choice(list(PERSONAS))
+            session = await request(reader, writer, "POST", "/sessions")
+            path = f"/sessions/{session['session_id']}"
+            stage = session["stage"]
+            for message in PERSONAS[persona]:
+                if think_time:
+                    await asyncio.sleep(rng.uniform(0, 2 * think_time))
+                started = time.perf_counter()
+                try:
+                    reply = await request(reader, writer, "POST", path + "/answers", {"message": message})
+                except RuntimeError:
+                    results["errors"] += 1
+                    break
+                results["latencies"].setdefault(stage, []).append(time.perf_counter() - started)
+                stage = reply["stage"]
+                if not reply["active"]:
+                    results["completed"] += 1
+                    break
+            results["stages_reached"][stage] = results["stages_reached"].get(stage, 0) + 1
+            await request(reader, writer, "DELETE", path)
+    finally:
+        writer.close()
+
+
+async def drive(concurrency: int, rounds: int, latency: float, jitter: float, tail_rate: float,
+                think_time: float, seed: int) -> Dict:
+    from hiring_assistant import HiringAssistant
+    from interview_server import serve
+    from interview_service import InterviewService
+    from llm_backend import FakeBackend
+
+    backend = FakeBackend(mean_latency=latency, latency_jitter=jitter, tail_rate=tail_rate,
+                          tail_latency=latency * 8, seed=seed, max_concurrency=concurrency * 2)
+    service = InterviewService(assistant_factory=lambda: HiringAssistant("load-test-key", backend=backend))
+    server = await serve(service, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    results = {"latencies": {}, "completed": 0, "errors": 0, "stages_reached": {}}
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            virtual_candidate(port, rounds, think_time, random.Random(rng.random()), results)
+            for _ in range(concurrency)
+        ))
+    finally:
+        server.close()
+        await server.wait_closed()
+    results["elapsed"] = time.perf_counter() - started
+    results["model_calls"] = backend.calls
+    return results
+
+
+def run_level(concurrency: int, args: Dict) -> Dict:
+    """One concurrency level, meant to run in its own process"""
+    from llm_cache import LLM_CACHE
+    if not args["llm_cache"]:
+        # Personas repeat the same lines, so the response cache would answer in place of the model
+        LLM_CACHE.max_entries = 0
+    results = asyncio.run(drive(concurrency, args["rounds"], args["latency"], args["jitter"],
+                                args["tail_rate"], args["think_time"], args["seed"]))
+
+    all_latencies = [value for values in results["latencies"].values() for value in values]
+    turns = len(all_latencies)
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mib = peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "concurrency": concurrency,
+        "interviews": concurrency * args["rounds"],
+        "completed": results["completed"],
+        "errors": results["errors"],
+        "turns": turns,
+        "model_calls": results["model_calls"],
+        "elapsed_s": round(results["elapsed"], 3),
+        "throughput_turns_per_s": round(turns / results["elapsed"], 1),
+        "throughput_interviews_per_s": round(results["completed"] / results["elapsed"], 2),
+        "turn_latency_s": latency_summary(all_latencies),
+        "turn_latency_by_stage_s": {
+            stage: latency_summary(results["latencies"][stage]) for stage in STAGES if stage in results["latencies"]
+        },
+        "final_stages": results["stages_reached"],
+        "peak_rss_mib": round(peak_rss_mib, 1)
+    }
+
+
+def check_personas() -> None:
+    """Fail early if a script would end the interview before its last line"""
+    from hiring_assistant import HiringAssistant
+    assistant = HiringAssistant("load-test-key")
+    for name, script in PERSONAS.items():
+        for message in script[:-1]:
+            if assistant.is_ending_message(message):
+                raise SystemExit(f"Persona {name!r} ends the interview early at: {message!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", default="10,50,100,250", help="comma-separated concurrency levels")
+    parser.add_argument("--rounds", type=int, default=2, help="interviews per virtual candidate")
+    parser.add_argument("--latency", type=float, default=0.5, help="mean fake model latency in seconds")
+    parser.add_argument("--jitter", type=float, help="uniform jitter around the mean latency (default 40%% of it)")
+    parser.add_argument("--tail-rate", type=float, default=0.01, help="share of calls that take 8x the mean")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean candidate pause between turns")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--llm-cache", action="store_true", help="let the LLM response cache answer repeats")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    if args.jitter is None:
+        args.jitter = args.latency * 0.4
+    check_personas()
+
+    settings = {key: value for key, value in vars(args).items() if key not in ("levels", "output")}
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    report = {
+        "settings": settings,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "levels": []
+    }
+    context = multiprocessing.get_context("spawn")
+    for concurrency in levels:
+        with context.Pool(1) as pool:
+            level = pool.apply(run_level, (concurrency, settings))
+        report["levels"].append(level)
+        latency = level["turn_latency_s"]
+        print(f"concurrency {concurrency:>5}: {level['throughput_turns_per_s']:8.1f} turns/s "
+              f"p50 {latency['p50']:.3f}s p95 {latency['p95']:.3f}s p99 {latency['p99']:.3f}s "
+              f"rss {level['peak_rss_mib']:.0f} MiB errors {level['errors']}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
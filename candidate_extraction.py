@@ -0,0 +1,133 @@
+"""
+Single-pass candidate information extraction for TalentScout
+All field patterns are folded into one regular expression compiled at
+import, so each message is scanned once and every email, phone, experience,
+name, position and location candidate comes back as a span with offsets.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Field order matches the order the sidebar has always displayed them in
+FIELDS = ("email", "phone", "experience", "name", "position", "location")
+
+POSITION_KEYWORDS = (
+    "developer", "engineer", "programmer", "architect", "analyst", "manager",
+    "lead", "senior", "junior", "full stack", "backend", "frontend", "devops",
+    "data scientist", "ml engineer", "software engineer", "web developer"
+)
+
+# Words that signal the candidate is talking about where they are
+LOCATION_CUES = ("from", "live", "based", "located")
+
+# (group name, field, rank, pattern). Alternatives are tried in this order at
+# each position, and a lower rank wins when one field has several candidates,
+# mirroring the order the individual patterns used to be tried in.
+_ALTERNATIVES = (
+    ("email", "email", 0, r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b"),
+    ("phone_us", "phone", 0, r"(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}"),
+    ("phone_intl", "phone", 1, r"(?:\+\d{1,3}[-.\s]?)?\d{8,15}"),
+    ("exp_full", "experience", 0, r"(?i:(?P<exp_full_years>\d+)\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp))"),
+    ("exp_after", "experience", 2, r"(?i:experienced?\s*(?:for\s*)?(?P<exp_after_years>\d+)\s*(?:years?|yrs?))"),
+    ("exp_short", "experience", 1, r"(?i:(?P<exp_short_years>\d+)\+?\s*(?:years?|yrs?))"),
+    ("name_intro", "name", 0, r"(?:i'm|i am|name is|call me)\s+(?P<name_intro_value>[A-Z][a-z]+\s+[A-Z][a-z]+)"),
+    # Only the preposition is consumed; the place itself is read by lookahead
+    # so that an email or phone number right after it is still scanned
+    ("location", "location", 0, r"(?<!\S)(?i:from|in|at)(?=\s+(?P<location_value>\S+(?:\s+\S+)?))"),
+    ("position", "position", 0, "(?i:" + "|".join(re.escape(k) for k in POSITION_KEYWORDS) + ")"),
+    ("location_cue", None, 0, "(?i:" + "|".join(LOCATION_CUES) + ")"),
+    # Likewise only the first word of a bare name is consumed
+    ("name_bare", "name", 1, r"[A-Z][a-z]+(?=(?P<name_bare_rest>\s+[A-Z][a-z]+)(?:\s|$))"),
+)
+
+# Every field starts at the beginning of a token, so the alternation is only
+# attempted where the previous character is not a letter or digit. Skipping
+# mid-word positions is what makes one combined scan cheaper than ten searches.
+_MASTER_PATTERN = re.compile(
+    r"(?<![^\W_])(?:" + "|".join(f"(?P<{group}>{pattern})" for group, _, _, pattern in _ALTERNATIVES) + ")"
+)
+_GROUP_FIELDS = {group: (field, rank) for group, field, rank, _ in _ALTERNATIVES}
+
+
+class Span(NamedTuple):
+    """An extracted field: its normalized value and where the evidence sits in the message"""
+    field: str
+    value: str
+    start: int
+    end: int
+
+
+class ExtractionEngine:
+    """Scans candidate messages for profile fields with a single precompiled pattern"""
+
+    def __init__(self, pattern: re.Pattern = _MASTER_PATTERN):
+        self.pattern = pattern
+
+    def scan(self, text: str) -> Dict[str, Span]:
+        """Return the best span per field found in one message"""
+        best: Dict[str, tuple] = {}
+        locations = []
+        has_location_cue = False
+
+        for match in self.pattern.finditer(text):
+            group = match.lastgroup
+            field, rank = _GROUP_FIELDS[group]
+            start, end = match.span()
+
+            if group == "location_cue":
+                has_location_cue = True
+                continue
+            if group == "location":
+                if match.group().lower() == "from":
+                    has_location_cue = True
+                place = " ".join(match.group("location_value").split())
+                # A place never contains digits; try the next preposition instead
+                if not any(char.isdigit() for char in place) and place.strip(".,!"):
+                    locations.append(Span("location", place.strip(".,!"), *match.span("location_value")))
+                continue
+
+            if field in best and best[field][0] <= rank:
+                continue
+            if field in ("email", "phone"):
+                value = match.group()
+            elif field == "experience":
+                value = f"{match.group(group + '_years')} years"
+            elif field == "name":
+                if group == "name_intro":
+                    value = match.group("name_intro_value")
+                    start, end = match.span("name_intro_value")
+                else:
+                    value = match.group() + " " + match.group("name_bare_rest").strip()
+                    end = match.end("name_bare_rest")
+            else:
+                value = text.strip()
+            best[field] = (rank, Span(field, value, start, end))
+
+        if has_location_cue and locations:
+            best["location"] = (0, locations[0])
+
+        return {field: best[field][1] for field in FIELDS if field in best}
+
+    def scan_batch(self, messages: Iterable[str]) -> List[Dict[str, Span]]:
+        """Scan many messages, e.g. the user turns of archived transcripts"""
+        scan = self.scan
+        return [scan(message) for message in messages]
+
+    def build_profile(self, messages: Iterable[str], profile: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Fold the fields found across a conversation into one candidate profile"""
+        profile = {} if profile is None else profile
+        for message in messages:
+            apply_spans(profile, self.scan(message))
+        return profile
+
+
+def apply_spans(candidate_info: Dict[str, str], spans: Dict[str, Span]) -> None:
+    """Merge scanned fields into candidate_info; a name, once known, is kept"""
+    for field, span in spans.items():
+        if field == "name" and "name" in candidate_info:
+            continue
+        candidate_info[field] = span.value
+
+
+# Built once at import and shared by every session
+EXTRACTION_ENGINE = ExtractionEngine()
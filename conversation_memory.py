@@ -0,0 +1,119 @@
+"""
+Token-budgeted conversation memory for TalentScout interviews
+The model sees a verbatim window of the most recent messages plus a rolling
+summary of everything older, together held under a fixed token budget.
+Both parts are updated incrementally as messages arrive: a message leaving
+the window is condensed to one summary line, and the oldest summary lines
+are dropped once the summary outgrows its share. Rendering is therefore
+bounded no matter how long the interview runs, and the candidate's
+collected details travel separately in the prompt.
+"""
+
+import os
+import re
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from token_counting import CHARS_PER_TOKEN, estimate_tokens
+
+# Total history budget per turn and the share of it kept verbatim
+DEFAULT_TOKEN_BUDGET = int(os.getenv("TALENTSCOUT_HISTORY_TOKENS", "600"))
+RECENT_SHARE = 0.7
+MAX_RECENT_MESSAGES = 6
+SUMMARY_LINE_CHARS = 160
+
+_SUMMARY_HEADING = "Earlier in the interview:\n"
+_RECENT_HEADING = "\n\nMost recent messages:\n"
+# Reserved out of the summary's share so the rendered text, headings included, stays within budget
+_HEADINGS_TOKENS = estimate_tokens(_SUMMARY_HEADING + _RECENT_HEADING + "(99999 earlier messages omitted)\n")
+
+_MARKUP = re.compile(r"[*_`#>]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def _clip(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+def summarize_message(role: str, content: str, max_chars: int = SUMMARY_LINE_CHARS) -> str:
+    """Condense a message to its first sentence, without markup, on one line"""
+    text = " ".join(_MARKUP.sub("", content).split())
+    first_sentence = _SENTENCE_END.split(text, 1)[0]
+    return f"{role}: {_clip(first_sentence, max_chars)}"
+
+
+class ConversationMemory:
+    """Rolling summary of older messages plus a verbatim recent window, under a token budget"""
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, max_recent_messages: int = MAX_RECENT_MESSAGES):
+        self.token_budget = token_budget
+        self.recent_budget = int(token_budget * RECENT_SHARE)
+        self.summary_budget = max(0, token_budget - self.recent_budget - _HEADINGS_TOKENS)
+        self.max_recent_messages = max_recent_messages
+        self.recent: Deque[Tuple[str, str, int]] = deque()
+        self.summary: Deque[Tuple[str, int]] = deque()
+        self.recent_tokens = 0
+        self.summary_tokens = 0
+        self.omitted = 0
+
+    def add(self, role: str, content: str) -> None:
+        """Append a message, moving older ones into the summary as needed"""
+        # A single message may not take more than the whole recent budget
+        content = _clip(content, self.recent_budget * CHARS_PER_TOKEN - len(role) - 3)
+        tokens = estimate_tokens(f"{role}: {content}\n")
+        self.recent.append((role, content, tokens))
+        self.recent_tokens += tokens
+        while len(self.recent) > 1 and (len(self.recent) > self.max_recent_messages
+                                        or self.recent_tokens > self.recent_budget):
+            old_role, old_content, old_tokens = self.recent.popleft()
+            self.recent_tokens -= old_tokens
+            self._summarize(summarize_message(old_role, old_content))
+
+    def _summarize(self, line: str) -> None:
+        tokens = estimate_tokens(line + "\n")
+        self.summary.append((line, tokens))
+        self.summary_tokens += tokens
+        while self.summary and self.summary_tokens > self.summary_budget:
+            _, old_tokens = self.summary.popleft()
+            self.summary_tokens -= old_tokens
+            self.omitted += 1
+
+    def render(self) -> str:
+        """The history text for the next prompt"""
+        recent = "\n".join(f"{role}: {content}" for role, content, _ in self.recent)
+        if not self.summary and not self.omitted:
+            return recent
+        summary = [line for line, _ in self.summary]
+        if self.omitted:
+            summary.insert(0, f"({self.omitted} earlier messages omitted)")
+        return _SUMMARY_HEADING + "\n".join(summary) + _RECENT_HEADING + recent
+
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens of the rendered history, excluding the headings"""
+        return self.recent_tokens + self.summary_tokens
+
+    def to_state(self) -> Dict:
+        """The memory as plain data, for persisting a session"""
+        return {
+            "budget": self.token_budget,
+            "recent_limit": self.max_recent_messages,
+            "recent": [[role, content] for role, content, _ in self.recent],
+            "summary": [line for line, _ in self.summary],
+            "omitted": self.omitted
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "ConversationMemory":
+        """Rebuild a memory saved with to_state; token estimates are recomputed, not stored"""
+        memory = cls(state["budget"], state["recent_limit"])
+        for role, content in state["recent"]:
+            tokens = estimate_tokens(f"{role}: {content}\n")
+            memory.recent.append((role, content, tokens))
+            memory.recent_tokens += tokens
+        for line in state["summary"]:
+            tokens = estimate_tokens(line + "\n")
+            memory.summary.append((line, tokens))
+            memory.summary_tokens += tokens
+        memory.omitted = state["omitted"]
+        return memory
@@ -0,0 +1,131 @@
+"""
+Deterministic fast path for formulaic interview turns
+While details are being gathered, most answers simply supply the next
+field: a name, an email address, a phone number. When the extraction
+engine finds new fields and the rest of the message carries nothing else,
+the reply is built from templates (acknowledge what was captured, ask for
+the next missing detail) without calling the model. Anything ambiguous,
+such as a question, a correction, a long answer or a stage change, goes to
+the model as before.
+"""
+
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+from candidate_extraction import EXTRACTION_ENGINE, POSITION_KEYWORDS
+from metrics import METRICS
+from prompt_builder import DETAIL_LABELS
+
+FAST_PATH_DECISIONS = METRICS.counter(
+    "talentscout_fast_path_total",
+    "Turns considered for the template fast path: served, or the reason they went to the model",
+    ("stage", "outcome")
+)
+FAST_PATH_SECONDS = METRICS.histogram(
+    "talentscout_fast_path_seconds", "Time to build a fast-path reply", ("stage",)
+)
+
+NEXT_QUESTIONS = {
+    "name": "Could you tell me your full name?",
+    "email": "What's the best email address to reach you at?",
+    "phone": "What's a good phone number for you, including the country code?",
+    "experience": "How many years of professional experience do you have?",
+    "position": "Which position or role are you most interested in?",
+    "location": "Where are you currently located (city and country)?"
+}
+
+# Words that commonly surround a detail without adding anything the model would need to see
+_FILLER = frozenset("""
+    a am an and are as at based be but by can contact currently email experience for from hi hello here i i'm im
+    in interested is it it's its live located looking me mobile my name number of on or phone please professional
+    reach role position sure thanks thank the this to total work working year years yes you your
+""".split())
+_WORD = re.compile(r"[A-Za-z']+")
+# Position and location matches are loose (they may cover most of the message), so those answers go to the model
+_FUZZY_FIELDS = ("position", "location")
+MAX_WORDS = 25
+MAX_EXTRA_WORDS = 2
+
+
+def _join_labels(labels: List[str]) -> str:
+    if len(labels) == 1:
+        return labels[0]
+    return ", ".join(labels[:-1]) + " and " + labels[-1]
+
+
+class FastPathResponder:
+    """Answers deterministic info-gathering turns from templates, or returns None to defer to the model"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def respond(self, stage: str, candidate_info: Dict[str, str], user_input: str) -> Optional[str]:
+        if not self.enabled or stage != "info_gathering":
+            return None
+        started = time.perf_counter()
+        outcome, reply = self._decide(candidate_info, user_input)
+        FAST_PATH_DECISIONS.inc(stage, outcome)
+        if reply is not None:
+            FAST_PATH_SECONDS.observe(time.perf_counter() - started, stage)
+        return reply
+
+    def _decide(self, candidate_info: Dict[str, str], user_input: str):
+        text = user_input.strip()
+        lowered = text.lower()
+        if "?" in text:
+            return "question", None
+        if "tech" in lowered:
+            # The stage moves on to the tech stack; let the model make that transition
+            return "stage_change", None
+        if len(text.split()) > MAX_WORDS:
+            return "long_answer", None
+
+        spans = EXTRACTION_ENGINE.scan(text)
+        if any(field in spans for field in _FUZZY_FIELDS):
+            return "fuzzy_field", None
+        if "name" in spans and any(word in POSITION_KEYWORDS for word in spans["name"].value.lower().split()):
+            return "fuzzy_field", None
+        new_fields = []
+        for field, span in spans.items():
+            known = candidate_info.get(field)
+            if known is None:
+                new_fields.append(field)
+            elif known != span.value and field != "name":
+                return "correction", None
+        if not new_fields:
+            return "no_details", None
+
+        # Whatever the extracted values don't cover must be filler, or the answer says more than we parsed
+        leftover = list(text)
+        for span in spans.values():
+            leftover[span.start:span.end] = " " * (span.end - span.start)
+        leftover = "".join(leftover)
+        if any(char.isdigit() for char in leftover):
+            return "extra_content", None
+        extra = [word for word in _WORD.findall(leftover) if word.lower().strip("'") not in _FILLER]
+        # A capitalized leftover is probably a name or place we failed to parse
+        if len(extra) > MAX_EXTRA_WORDS or any(word[0].isupper() and word != "I" for word in extra):
+            return "extra_content", None
+
+        collected = set(candidate_info) | set(new_fields)
+        missing = [field for field in DETAIL_LABELS if field not in collected]
+        if not missing:
+            return "details_complete", None
+        return "served", self._reply(spans, new_fields, missing[0])
+
+    @staticmethod
+    def _reply(spans, new_fields: List[str], next_field: str) -> str:
+        if "name" in new_fields:
+            opening = f"Thanks, {spans['name'].value.split()[0]}!"
+        else:
+            opening = "Thank you!"
+        noted = [DETAIL_LABELS[field] for field in DETAIL_LABELS if field in new_fields and field != "name"]
+        if noted:
+            opening += f" I've noted your {_join_labels(noted)}."
+        return f"{opening} {NEXT_QUESTIONS[next_field]}"
+
+
+# Shared by every session; TALENTSCOUT_FAST_PATH=0 sends every turn to the model
+FAST_PATH = FastPathResponder(enabled=os.getenv("TALENTSCOUT_FAST_PATH", "1").lower() not in ("0", "false", "no"))
@@ -0,0 +1,180 @@
+"""
+Process-wide Gemini client and model registry for TalentScout
+Every interview session borrows the same configured client and model
+objects, so the underlying HTTP/gRPC connections are created once per
+process and stay pooled and warm across sessions. The static system prompt
+is registered once through Gemini context caching where the API accepts it.
+Creating and refreshing a cache is a network call, so it runs on a
+background thread; turns meanwhile use the model they already have, or
+send the system prompt with each request until the cache exists.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import google.generativeai as genai
+
+from token_counting import estimate_tokens
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# Gemini rejects cached contents below a minimum size, so smaller system
+# prompts go straight to the local fallback instead of failing a round-trip
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "4096"))
+CONTEXT_CACHE_TTL = timedelta(hours=1)
+# Recreate the cache slightly before Gemini expires it
+CONTEXT_CACHE_REFRESH_MARGIN = timedelta(minutes=5)
+# After a failed create, send the prompt uncached for this long before trying again
+CONTEXT_CACHE_RETRY = timedelta(minutes=10)
+
+
+class PromptModel(NamedTuple):
+    """A model bound to a system prompt, and whether that prompt is served from Gemini's cache"""
+    model: genai.GenerativeModel
+    cached: bool
+    # When to create the cache again; the model stays usable until the replacement is ready
+    expires_at: float
+
+
+class TokenUsage:
+    """Thread-safe running totals of cached versus uncached input tokens"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.cached_tokens = 0
+        self.uncached_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, usage: Dict[str, int]) -> None:
+        with self._lock:
+            self.turns += 1
+            self.cached_tokens += usage["cached"]
+            self.uncached_tokens += usage["uncached"]
+            self.output_tokens += usage["output"]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "cached_tokens": self.cached_tokens,
+                "uncached_tokens": self.uncached_tokens,
+                "output_tokens": self.output_tokens
+            }
+
+
+def read_token_usage(response) -> Dict[str, int]:
+    """Split a response's reported input tokens into cached and uncached counts"""
+    usage = getattr(response, "usage_metadata", None)
+
+    def count(name: str) -> int:
+        value = getattr(usage, name, 0)
+        return value if isinstance(value, int) else 0
+
+    prompt_tokens = count("prompt_token_count")
+    cached_tokens = count("cached_content_token_count")
+    return {
+        "cached": cached_tokens,
+        "uncached": max(0, prompt_tokens - cached_tokens),
+        "output": count("candidates_token_count")
+    }
+
+
+class ModelRegistry:
+    """Thread-safe cache of configured GenerativeModel instances keyed by model name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._api_key: Optional[str] = None
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self._prompt_models: Dict[Tuple[str, str], PromptModel] = {}
+        # Context caches being created in the background, by the same key as _prompt_models
+        self._refreshing: Dict[Tuple[str, str], Future] = {}
+        self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-cache")
+        self.token_usage = TokenUsage()
+
+    def _configure(self, api_key: str) -> None:
+        # Caller holds the lock
+        if api_key != self._api_key:
+            genai.configure(api_key=api_key)
+            self._api_key = api_key
+            self._models.clear()
+            self._prompt_models.clear()
+            self._refreshing.clear()
+
+    def get_model(self, api_key: str, model_name: str = DEFAULT_MODEL) -> genai.GenerativeModel:
+        """Return the shared model, configuring the client on first use or when the key changes"""
+        model = self._models.get(model_name)
+        if model is not None and api_key == self._api_key:
+            return model
+
+        with self._lock:
+            self._configure(api_key)
+            model = self._models.get(model_name)
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                self._models[model_name] = model
+            return model
+
+    def get_prompt_model(self, api_key: str, system_prompt: str, model_name: str = DEFAULT_MODEL) -> PromptModel:
+        """Return the shared model for a static system prompt, context-cached when possible; never waits on the
+        network, creating or refreshing the cache in the background instead"""
+        key = (model_name, hashlib.sha256(system_prompt.encode("utf-8")).hexdigest())
+        prompt_model = self._prompt_models.get(key)
+        if prompt_model is not None and api_key == self._api_key and time.time() < prompt_model.expires_at:
+            return prompt_model
+
+        with self._lock:
+            self._configure(api_key)
+            prompt_model = self._prompt_models.get(key)
+            if prompt_model is None:
+                # Gemini rejects caches this small, so there is nothing to refresh
+                small = estimate_tokens(system_prompt) < CONTEXT_CACHE_MIN_TOKENS
+                prompt_model = self._uncached_prompt_model(system_prompt, model_name,
+                                                           float("inf") if small else 0.0)
+                self._prompt_models[key] = prompt_model
+            if time.time() >= prompt_model.expires_at and key not in self._refreshing:
+                self._refreshing[key] = self._refresher.submit(self._create_prompt_model, key, api_key,
+                                                               system_prompt, model_name)
+            return prompt_model
+
+    def _create_prompt_model(self, key: Tuple[str, str], api_key: str, system_prompt: str, model_name: str) -> None:
+        try:
+            cached_content = genai.caching.CachedContent.create(
+                model=f"models/{model_name}",
+                system_instruction=system_prompt,
+                ttl=CONTEXT_CACHE_TTL
+            )
+            expires_at = time.time() + (CONTEXT_CACHE_TTL - CONTEXT_CACHE_REFRESH_MARGIN).total_seconds()
+            prompt_model = PromptModel(genai.GenerativeModel.from_cached_content(cached_content), True, expires_at)
+        except Exception:
+            # Caching unavailable for this model or key right now; fall back to the local equivalent for a while
+            prompt_model = self._uncached_prompt_model(system_prompt, model_name,
+                                                       time.time() + CONTEXT_CACHE_RETRY.total_seconds())
+        with self._lock:
+            self._refreshing.pop(key, None)
+            # Dropped if the client was reconfigured or cleared meanwhile
+            if api_key == self._api_key:
+                self._prompt_models[key] = prompt_model
+
+    @staticmethod
+    def _uncached_prompt_model(system_prompt: str, model_name: str, expires_at: float) -> PromptModel:
+        # Same system instruction, just sent with every request instead of referenced from the cache
+        return PromptModel(genai.GenerativeModel(model_name, system_instruction=system_prompt), False, expires_at)
+
+    def clear(self) -> None:
+        """Drop every cached model so the next session reconfigures the client"""
+        with self._lock:
+            self._api_key = None
+            self._models.clear()
+            self._prompt_models.clear()
+            self._refreshing.clear()
+
+
+# One registry per process, shared by every Streamlit session
+MODEL_REGISTRY = ModelRegistry()
@@ -0,0 +1,509 @@
+"""
+Interview state machine for the TalentScout AI Hiring Assistant
+HiringAssistant holds one candidate's interview and talks to Gemini through
+the shared model registry and LLM backend. It has no UI dependencies, so the
+Streamlit app and the headless API server drive the same class.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import AsyncIterator, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from candidate_extraction import EXTRACTION_ENGINE, apply_spans
+from fast_path import FAST_PATH
+from gemini_client import DEFAULT_MODEL, MODEL_REGISTRY, read_token_usage
+from llm_backend import BACKGROUND_LOOP, GEMINI_BACKEND, LLMBackend, LLMTimeoutError
+from llm_cache import LLM_CACHE
+from metrics import (LATE_QUESTIONS, MODEL_TOKENS, PHASE_SECONDS, PROMPT_CHARS, RESPONSE_CHARS, SLO_FALLBACKS,
+                     TIME_TO_FIRST_TOKEN_SECONDS, TURN_SECONDS, TURNS)
+from prompt_builder import PROMPT_BUILDER, parse_questions
+from question_bank import QUESTION_BANK
+from question_templates import QUESTION_TEMPLATES, fallback_reply
+from rate_limiter import BACKGROUND, INTERACTIVE
+from speculation import SPECULATOR
+from tech_taxonomy import TECH_MATCHER
+from turn_pipeline import TurnPlan, plan_turn
+
+# Seconds a turn may take before it is answered locally instead of by the model; 0 turns the SLO off
+TURN_SLO_SECONDS = float(os.getenv("TALENTSCOUT_TURN_SLO", "10")) or None
+
+def _chunk_text(chunk) -> str:
+    """Return the text of a streamed chunk, or an empty string if it carries none"""
+    try:
+        return chunk.text
+    except (ValueError, AttributeError):
+        # Chunks without text parts (e.g. safety or finish metadata) raise on .text
+        return ""
+
+
+class HiringAssistant:
+    def __init__(self, api_key: Optional[str] = None, model_name: str = DEFAULT_MODEL,
+                 backend: Optional[LLMBackend] = None, turn_slo: Optional[float] = TURN_SLO_SECONDS):
+        """Initialize per-session interview state around the process-wide Gemini model"""
+        self.backend = backend or GEMINI_BACKEND
+        self.turn_slo = turn_slo
+        # The client and model are shared by every session; only the state below is per-session
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.model_name = model_name
+        self.model = MODEL_REGISTRY.get_model(self.api_key, model_name)
+        self.conversation_stage = "greeting"
+        self.candidate_info = {}
+        self.tech_questions = []
+        self.questions_asked = 0
+        self.conversation_active = True
+        self.last_turn_timing = {}
+        self.last_token_usage = {}
+        # Estimated input tokens per prompt section for the latest turn
+        self.last_prompt_tokens = {}
+        # Technical questions generated in the background once the tech stack is known
+        self.question_speculation = None
+        # Question generation that missed a turn's SLO; its result replaces the templates once it arrives
+        self.late_questions = None
+        # This session's queue in the rate limiter; a store that rebuilds the assistant each turn sets it
+        self.flow: Hashable = id(self)
+        
+    def to_state(self) -> Dict:
+        """The per-session interview state as plain data; the model and backend are process-wide"""
+        return {
+            "stage": self.conversation_stage,
+            "info": dict(self.candidate_info),
+            "questions": list(self.tech_questions),
+            "asked": self.questions_asked,
+            "active": self.conversation_active
+        }
+
+    def restore_state(self, state: Dict) -> None:
+        """Resume an interview saved with to_state"""
+        self.conversation_stage = state["stage"]
+        self.candidate_info = state["info"]
+        self.tech_questions = state["questions"]
+        self.questions_asked = state["asked"]
+        self.conversation_active = state["active"]
+
+    def get_system_prompt(self) -> str:
+        """The system prompt for the current conversation stage"""
+        return PROMPT_BUILDER.system_prompt(self.conversation_stage).text
+
+    def get_conversation_status(self) -> Dict[str, str]:
+        """Get current conversation status for UI display"""
+        stages = {
+            "greeting": ("🎯", "Initial Welcome"),
+            "info_gathering": ("📝", "Collecting Information"),
+            "tech_stack": ("💻", "Technical Skills Assessment"),
+            "tech_questions": ("🧠", "Technical Interview"),
+            "conclusion": ("✅", "Interview Complete")
+        }
+        return {
+            "icon": stages.get(self.conversation_stage, ("❓", "Unknown"))[0],
+            "status": stages.get(self.conversation_stage, ("❓", "Unknown"))[1]
+        }
+
+    def is_ending_message(self, user_input: str) -> bool:
+        """Check whether the candidate wants to end the conversation"""
+        ending_keywords = ["bye", "goodbye", "exit", "quit", "end", "stop", "done", "finish"]
+        return any(keyword in user_input.lower().strip() for keyword in ending_keywords)
+
+    def get_turn_model(self):
+        """Return the shared model that carries the system prompt, context-cached where supported"""
+        return MODEL_REGISTRY.get_prompt_model(self.api_key, self.get_system_prompt(), self.model_name).model
+
+    def get_turn_model_id(self) -> str:
+        """Identify the turn model for memoization: its name plus the system prompt it carries"""
+        digest = hashlib.sha256(self.get_system_prompt().encode("utf-8")).hexdigest()[:16]
+        return f"{self.model_name}+{digest}"
+
+    def record_token_usage(self, response) -> None:
+        """Keep this turn's cached/uncached input token counts and add them to the process totals"""
+        self.last_token_usage = read_token_usage(response)
+        MODEL_REGISTRY.token_usage.record(self.last_token_usage)
+        for kind, count in self.last_token_usage.items():
+            MODEL_TOKENS.inc(kind, amount=count)
+
+    def record_turn(self, stage: str, source: str, started: float, reply: str) -> None:
+        """Record turn metrics labelled with the stage the turn started in"""
+        TURNS.inc(stage, source)
+        TURN_SECONDS.observe(time.perf_counter() - started, stage)
+        RESPONSE_CHARS.observe(len(reply), stage)
+
+    def build_prompt(self, user_input: str, conversation_history: str) -> str:
+        """Assemble the dynamic part of the prompt for the current turn; the system prompt travels separately"""
+        system_prompt = PROMPT_BUILDER.system_prompt(self.conversation_stage)
+        prompt = PROMPT_BUILDER.turn_prompt(
+            self.conversation_stage, self.candidate_info, self.questions_asked, self.conversation_active,
+            self.tech_questions, conversation_history, user_input, system_tokens=system_prompt.tokens
+        )
+        self.last_prompt_tokens = {**system_prompt.section_tokens, **prompt.section_tokens}
+        PROMPT_BUILDER.observe(self.conversation_stage, system_prompt, prompt)
+        return prompt.text
+
+    def generate_response(self, user_input: str, conversation_history: str) -> str:
+        """Generate response using Gemini based on conversation stage and history"""
+        return BACKGROUND_LOOP.run(self.agenerate_response(user_input, conversation_history))
+
+    def generate_response_stream(self, user_input: str, conversation_history: str) -> Iterator[str]:
+        """Stream the response chunk by chunk, processing the assembled text once the stream ends"""
+        return BACKGROUND_LOOP.iterate(self.agenerate_response_stream(user_input, conversation_history))
+
+    def slo_remaining(self, started: float) -> Optional[float]:
+        """Seconds left of the turn SLO for a turn that started at `started`, or None without an SLO"""
+        if self.turn_slo is None:
+            return None
+        return max(0.0, self.turn_slo - (time.perf_counter() - started))
+
+    async def begin_turn(self, user_input: str) -> Tuple[TurnPlan, Optional["asyncio.Task[List[str]]"]]:
+        """Apply the turn's plan before the prompt is built and start the model work the new stage needs"""
+        self.adopt_late_questions()
+        with PHASE_SECONDS.time("turn_plan", self.conversation_stage):
+            plan = plan_turn(self.conversation_stage, self.candidate_info, self.questions_asked, user_input)
+            self.apply_turn_plan(plan)
+        if not self.needs_technical_questions():
+            return plan, None
+        job = self.question_speculation
+        preparation = asyncio.ensure_future(self.prepare_technical_questions())
+        if job is not None and job.future.done():
+            # Generated in the background already, so this turn's reply can ask them
+            self.tech_questions = await preparation
+            return plan, None
+        return plan, preparation
+
+    async def finish_turn(self, preparation: Optional["asyncio.Task[List[str]]"], started: float) -> None:
+        """Wait for the stage's model work that ran alongside the reply, for as long as the turn SLO allows"""
+        if preparation is None:
+            return
+        done, _ = await asyncio.wait({preparation}, timeout=self.slo_remaining(started))
+        if done:
+            self.tech_questions = preparation.result()
+            return
+        # Ask template questions for now and keep the model's for the turns after this one
+        SLO_FALLBACKS.inc("generate_technical_questions", self.conversation_stage)
+        self.tech_questions = QUESTION_TEMPLATES.questions(self.candidate_info.get("tech_stack", {}),
+                                                           self.candidate_info.get("experience"))
+        self.late_questions = preparation
+
+    def adopt_late_questions(self) -> None:
+        """Swap in model questions that missed an earlier turn's SLO for the ones not asked yet"""
+        task, self.late_questions = self.late_questions, None
+        if task is None:
+            return
+        if not task.done():
+            if self.conversation_stage == "tech_questions":
+                self.late_questions = task
+            else:
+                task.cancel()
+                LATE_QUESTIONS.inc("discarded")
+            return
+        if task.cancelled() or task.exception() is not None:
+            LATE_QUESTIONS.inc("discarded")
+            return
+        # The candidate is answering question questions_asked + 1, so that one and those before it stay
+        shown = self.questions_asked + 1
+        self.tech_questions = self.tech_questions[:shown] + task.result()[shown:]
+        LATE_QUESTIONS.inc("adopted")
+
+    async def serve_fallback(self, stage: str, preparation: Optional["asyncio.Task[List[str]]"],
+                             started: float) -> str:
+        """Answer a turn whose reply missed its deadline from templates, keeping the turn's plan"""
+        SLO_FALLBACKS.inc("generate_response", stage)
+        await self.finish_turn(preparation, started)
+        return fallback_reply(self.conversation_stage, self.candidate_info, self.tech_questions, self.questions_asked)
+
+    def abort_turn(self, plan: TurnPlan, preparation: Optional["asyncio.Task[List[str]]"]) -> None:
+        """Undo a turn whose model call failed, so the candidate can simply answer again"""
+        if preparation is not None:
+            preparation.cancel()
+        self.revert_turn_plan(plan)
+
+    async def agenerate_response(self, user_input: str, conversation_history: str) -> str:
+        """Async variant of generate_response, driven through the session's LLM backend"""
+        started = time.perf_counter()
+        stage = self.conversation_stage
+        self.last_turn_timing = {}
+        
+        # Check for conversation-ending keywords
+        if self.is_ending_message(user_input):
+            self.conversation_stage = "conclusion"
+            self.conversation_active = False
+            farewell = self.generate_farewell_message()
+            self.record_turn(stage, "farewell", started, farewell)
+            return farewell
+        
+        # Formulaic info-gathering answers are acknowledged from templates
+        fast_reply = FAST_PATH.respond(stage, self.candidate_info, user_input)
+        if fast_reply is not None:
+            elapsed = time.perf_counter() - started
+            self.last_turn_timing = {"time_to_first_token": elapsed, "total": elapsed}
+            self.record_token_usage(None)
+            _, preparation = await self.begin_turn(user_input)
+            await self.finish_turn(preparation, started)
+            self.record_turn(stage, "fast_path", started, fast_reply)
+            return fast_reply
+        
+        # The turn's details and stage transition go into its own prompt
+        plan, preparation = await self.begin_turn(user_input)
+        with PHASE_SECONDS.time("prompt_assembly", stage):
+            full_prompt = self.build_prompt(user_input, conversation_history)
+            turn_model = self.get_turn_model()
+        PROMPT_CHARS.observe(len(full_prompt), stage)
+        
+        try:
+            call_started = time.perf_counter()
+            result = await LLM_CACHE.agenerate(
+                lambda prompt: self.backend.generate(turn_model, prompt, timeout=self.slo_remaining(started),
+                                                     flow=self.flow),
+                self.get_turn_model_id(), full_prompt, "generate_response"
+            )
+        except LLMTimeoutError:
+            reply = await self.serve_fallback(stage, preparation, started)
+            elapsed = time.perf_counter() - started
+            self.last_turn_timing = {"time_to_first_token": elapsed, "total": elapsed}
+            self.record_token_usage(None)
+            self.record_turn(stage, "fallback", started, reply)
+            return reply
+        except Exception as e:
+            self.abort_turn(plan, preparation)
+            return f"I apologize, but I'm experiencing technical difficulties. Could you please repeat your response? (Error: Connection issue)"
+        elapsed = time.perf_counter() - started
+        if not result.cached:
+            PHASE_SECONDS.observe(time.perf_counter() - call_started, "model_call", stage)
+        self.last_turn_timing = {"time_to_first_token": elapsed, "total": elapsed}
+        self.record_token_usage(result.response)
+        await self.finish_turn(preparation, started)
+        self.record_turn(stage, "cache" if result.cached else "model", started, result.text)
+        return result.text
+
+    async def agenerate_response_stream(self, user_input: str, conversation_history: str) -> AsyncIterator[str]:
+        """Async variant of generate_response_stream, driven through the session's LLM backend"""
+        started = time.perf_counter()
+        stage = self.conversation_stage
+        self.last_turn_timing = {}
+        
+        if self.is_ending_message(user_input):
+            self.conversation_stage = "conclusion"
+            self.conversation_active = False
+            farewell = self.generate_farewell_message()
+            elapsed = time.perf_counter() - started
+            self.last_turn_timing = {"time_to_first_token": elapsed, "total": elapsed}
+            self.record_turn(stage, "farewell", started, farewell)
+            yield farewell
+            return
+        
+        fast_reply = FAST_PATH.respond(stage, self.candidate_info, user_input)
+        if fast_reply is not None:
+            elapsed = time.perf_counter() - started
+            self.last_turn_timing = {"time_to_first_token": elapsed, "total": elapsed}
+            self.record_token_usage(None)
+            yield fast_reply
+            _, preparation = await self.begin_turn(user_input)
+            await self.finish_turn(preparation, started)
+            self.record_turn(stage, "fast_path", started, fast_reply)
+            return
+        
+        plan, preparation = await self.begin_turn(user_input)
+        with PHASE_SECONDS.time("prompt_assembly", stage):
+            full_prompt = self.build_prompt(user_input, conversation_history)
+            cache_key = LLM_CACHE.make_key(self.get_turn_model_id(), full_prompt)
+        PROMPT_CHARS.observe(len(full_prompt), stage)
+        cached_text = LLM_CACHE.get(cache_key, "generate_response")
+        if cached_text is not None:
+            elapsed = time.perf_counter() - started
+            self.last_turn_timing = {"time_to_first_token": elapsed, "total": elapsed}
+            TIME_TO_FIRST_TOKEN_SECONDS.observe(elapsed, stage)
+            self.record_token_usage(None)
+            yield cached_text
+            await self.finish_turn(preparation, started)
+            self.record_turn(stage, "cache", started, cached_text)
+            return
+        
+        chunks = []
+        first_token_at = None
+        last_chunk = None
+        call_started = time.perf_counter()
+        
+        try:
+            async for chunk in self.backend.stream(self.get_turn_model(), full_prompt, flow=self.flow,
+                                                   first_chunk_timeout=self.slo_remaining(started)):
+                # Usage metadata arrives with the final chunk of the stream
+                last_chunk = chunk
+                text = _chunk_text(chunk)
+                if not text:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                chunks.append(text)
+                yield text
+        except (GeneratorExit, asyncio.CancelledError):
+            # The caller stopped reading mid-reply; don't leave the question generation running
+            self.abort_turn(plan, preparation)
+            raise
+        except LLMTimeoutError:
+            if not chunks:
+                reply = await self.serve_fallback(stage, preparation, started)
+                elapsed = time.perf_counter() - started
+                self.last_turn_timing = {"time_to_first_token": elapsed, "total": elapsed}
+                self.record_token_usage(None)
+                yield reply
+                self.record_turn(stage, "fallback", started, reply)
+                return
+            self.abort_turn(plan, preparation)
+            yield f"I apologize, but I'm experiencing technical difficulties. Could you please repeat your response? (Error: Connection issue)"
+            return
+        except Exception as e:
+            self.abort_turn(plan, preparation)
+            yield f"I apologize, but I'm experiencing technical difficulties. Could you please repeat your response? (Error: Connection issue)"
+            return
+        
+        finished = time.perf_counter()
+        self.last_turn_timing = {
+            "time_to_first_token": (first_token_at or finished) - started,
+            "total": finished - started
+        }
+        PHASE_SECONDS.observe(finished - call_started, "model_call", stage)
+        TIME_TO_FIRST_TOKEN_SECONDS.observe(self.last_turn_timing["time_to_first_token"], stage)
+        self.record_token_usage(last_chunk)
+        reply = "".join(chunks)
+        LLM_CACHE.put(cache_key, reply, "generate_response")
+        await self.finish_turn(preparation, started)
+        self.record_turn(stage, "model", started, reply)
+
+    def apply_turn_plan(self, plan: TurnPlan) -> None:
+        """Move the interview to the state a turn plan leads to"""
+        self.candidate_info = plan.next_candidate_info
+        self.conversation_stage = plan.next_stage
+        self.questions_asked = plan.next_questions_asked
+        if plan.found_tech_stack:
+            self.speculate_technical_questions()
+
+    def revert_turn_plan(self, plan: TurnPlan) -> None:
+        """Return the interview to the state a turn plan started from"""
+        self.candidate_info = plan.candidate_info
+        self.conversation_stage = plan.stage
+        self.questions_asked = plan.questions_asked
+
+    def extract_candidate_info(self, user_input: str) -> None:
+        """Extract candidate information using advanced parsing techniques"""
+        with PHASE_SECONDS.time("extraction", self.conversation_stage):
+            apply_spans(self.candidate_info, EXTRACTION_ENGINE.scan(user_input))
+
+    def extract_tech_stack(self, user_input: str) -> None:
+        """Extract comprehensive technology stack information"""
+        with PHASE_SECONDS.time("extraction", self.conversation_stage):
+            found_tech = TECH_MATCHER.extract(user_input)
+        
+        if found_tech:
+            self.candidate_info["tech_stack"] = found_tech
+            self.speculate_technical_questions()
+        else:
+            # Store raw input for manual processing
+            self.candidate_info["tech_stack_raw"] = user_input
+
+    def speculate_technical_questions(self) -> None:
+        """Start generating the technical questions in the background, replacing a job for an older profile"""
+        prompt = self.build_questions_prompt()
+        job = self.question_speculation
+        if job is not None and job.key == prompt:
+            return
+        SPECULATOR.cancel(job)
+        self.question_speculation = SPECULATOR.submit(
+            "generate_technical_questions", prompt, lambda: self.agenerate_technical_questions(prompt, priority=BACKGROUND)
+        )
+
+    def needs_technical_questions(self) -> bool:
+        """Whether the current stage asks technical questions that haven't been generated yet"""
+        return (self.conversation_stage == "tech_questions" and not self.tech_questions
+                and "tech_stack" in self.candidate_info)
+
+    async def prepare_technical_questions(self) -> List[str]:
+        """Use the speculated questions if they match the current profile, or generate them now"""
+        with PHASE_SECONDS.time("question_generation", self.conversation_stage):
+            job, self.question_speculation = self.question_speculation, None
+            return (await SPECULATOR.join(job, self.build_questions_prompt())
+                    or await self.agenerate_technical_questions())
+
+    def generate_technical_questions(self) -> List[str]:
+        """Generate sophisticated technical questions based on candidate's profile"""
+        return BACKGROUND_LOOP.run(self.agenerate_technical_questions())
+
+    def build_questions_prompt(self) -> str:
+        """Assemble the question-generation prompt from the candidate's current profile"""
+        return PROMPT_BUILDER.questions_prompt(self.candidate_info)
+
+    async def agenerate_technical_questions(self, questions_prompt: Optional[str] = None,
+                                            priority: int = INTERACTIVE) -> List[str]:
+        """Async variant of generate_technical_questions, driven through the session's LLM backend"""
+        experience = self.candidate_info.get("experience")
+        if "tech_stack" not in self.candidate_info:
+            return QUESTION_TEMPLATES.questions({}, experience)
+            
+        tech_stack = self.candidate_info["tech_stack"]
+        banked = QUESTION_BANK.lookup(tech_stack, experience)
+        if banked is not None:
+            return banked
+        questions_prompt = questions_prompt or self.build_questions_prompt()
+        
+        try:
+            result = await LLM_CACHE.agenerate(
+                lambda prompt: self.backend.generate(self.model, prompt, priority=priority, flow=self.flow),
+                self.model_name, questions_prompt, "generate_technical_questions"
+            )
+            return parse_questions(result.text)
+        except Exception as e:
+            return QUESTION_TEMPLATES.questions(tech_stack, experience)
+
+    def generate_farewell_message(self) -> str:
+        """Generate a comprehensive farewell message with next steps"""
+        summary = self.get_candidate_summary()
+        
+        return f"""🎉 **Thank you for completing the initial screening interview!**
+
+{summary}
+
+**What happens next:**
+
+🔍 **Review Process** (24-48 hours)
+- Our technical team will review your responses
+- We'll assess your fit for available positions
+- Your information will be matched with suitable opportunities
+
+📧 **Next Communication** 
+- You'll receive an email update within 2 business days
+- If selected, we'll schedule a detailed technical interview
+- Additional requirements or portfolio requests may follow
+
+🚀 **Potential Next Steps**
+- Technical deep-dive interview with our client companies
+- Code review or technical assignment
+- Final interview with hiring managers
+
+**Contact Information:**
+- Email: careers@talentscout.com
+- Phone: +1-555-TALENT
+- LinkedIn: TalentScout Recruitment
+
+Thank you for your interest in opportunities through TalentScout. We're excited about the possibility of working together!
+
+---
+*This interview session is now complete. Feel free to close this window.*"""
+
+    def get_candidate_summary(self) -> str:
+        """Generate a brief summary of collected information"""
+        if not self.candidate_info:
+            return "We've had a great conversation about your background and interests."
+            
+        summary_parts = []
+        
+        if "name" in self.candidate_info:
+            summary_parts.append(f"**{self.candidate_info['name']}**")
+            
+        if "experience" in self.candidate_info:
+            summary_parts.append(f"• {self.candidate_info['experience']} of experience")
+            
+        if "position" in self.candidate_info:
+            summary_parts.append(f"• Interested in {self.candidate_info['position']}")
+            
+        if "tech_stack" in self.candidate_info:
+            tech_count = sum(len(v) for v in self.candidate_info['tech_stack'].values())
+            summary_parts.append(f"• Proficient in {tech_count}+ technologies")
+            
+        return "**Interview Summary:**\n" + "\n".join(summary_parts) if summary_parts else "Thank you for sharing your background with us."
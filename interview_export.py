@@ -0,0 +1,258 @@
+"""
+Append-only export of finished interviews
+When an interview ends, the service hands the session to the exporter's
+completion hook, which only snapshots it into a queue; a background thread
+appends whatever is queued to the current shard every `flush_interval`
+seconds and fsyncs once per batch, so the farewell turn never waits on disk.
+Shards rotate once they reach `max_bytes` or `max_age` seconds.
+
+JSON lines shards are appended in place and can be read while being
+written (a torn last line is skipped). Parquet shards (needs pyarrow) get
+one row group per batch and are written as `.part` files, renamed once
+closed, since a Parquet file is only readable after its footer is written.
+
+Read back: python interview_export.py /data/exports > interviews.jsonl
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from metrics import METRICS, SIZE_BUCKETS
+from session_store import InterviewSession
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the Parquet format needs it
+    pa = pq = None
+
+EXPORT_FORMATS = ("jsonl", "parquet")
+_SUFFIXES = {"jsonl": ".jsonl", "parquet": ".parquet"}
+_PART = ".part"
+
+EXPORT_FLUSH_ROWS = METRICS.histogram(
+    "talentscout_export_flush_rows", "Finished interviews written per export batch", (), SIZE_BUCKETS
+)
+EXPORT_FLUSH_SECONDS = METRICS.histogram(
+    "talentscout_export_flush_seconds", "Time to write and fsync one export batch", ()
+)
+EXPORT_ROTATIONS = METRICS.counter(
+    "talentscout_export_rotations_total", "Export shards closed, because they grew too large or too old",
+    ("reason",)
+)
+
+# Parquet columns; the dict-shaped fields are stored as JSON text
+_JSON_COLUMNS = ("candidate_info", "messages")
+
+
+def interview_record(session: InterviewSession) -> Dict:
+    """A finished interview as one export row, unaffected by later changes to the session"""
+    state = session.to_state()
+    assistant = state["assistant"]
+    return {
+        "id": state["id"],
+        "created": state["created"],
+        "completed": time.time(),
+        "stage": assistant["stage"],
+        "questions_asked": assistant["asked"],
+        "candidate_info": assistant["info"],
+        "tech_questions": assistant["questions"],
+        "messages": state["messages"]
+    }
+
+
+class _JsonLinesShard:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab")
+
+    @property
+    def size(self) -> int:
+        return self._file.tell()
+
+    def write(self, records: List[Dict]) -> None:
+        self._file.write(b"".join(
+            json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+            for record in records
+        ))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetShard:
+    schema = None if pa is None else pa.schema([
+        ("id", pa.string()), ("created", pa.float64()), ("completed", pa.float64()), ("stage", pa.string()),
+        ("questions_asked", pa.int32()), ("candidate_info", pa.string()),
+        ("tech_questions", pa.list_(pa.string())), ("messages", pa.string())
+    ])
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path + _PART, "wb")
+        self._writer = pq.ParquetWriter(self._file, self.schema, compression="zstd")
+
+    @property
+    def size(self) -> int:
+        return self._file.tell()
+
+    def write(self, records: List[Dict]) -> None:
+        rows = [{**record, **{column: json.dumps(record[column], ensure_ascii=False) for column in _JSON_COLUMNS}}
+                for record in records]
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._writer.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.path + _PART, self.path)
+
+
+class InterviewExporter:
+    """Appends finished interviews to rotating shards in `directory` from a background thread
+
+    export() is the completion hook: it snapshots the session and returns. The writer takes every
+    queued interview as one batch, so a burst of completions costs one write and one fsync. A crash
+    loses at most `flush_interval` seconds of completions (and, for Parquet, the open shard).
+    """
+
+    def __init__(self, directory: str, format: str = "jsonl", max_bytes: int = 64 * 2 ** 20,
+                 max_age: float = 3600.0, flush_interval: float = 1.0):
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"export format must be one of {', '.join(EXPORT_FORMATS)}")
+        if format == "parquet" and pq is None:
+            raise RuntimeError("Parquet export needs the pyarrow package: pip install pyarrow")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = format
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: List[Dict] = []
+        # Only the writer thread (or close, after it has stopped) touches the shard
+        self._write_lock = threading.Lock()
+        self._shard = None
+        self._shard_opened = 0.0
+        self._sequence = 0
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_behind, name="interview-exporter", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def export(self, session: InterviewSession) -> None:
+        """Queue a finished interview for export; never blocks on disk"""
+        self.submit(interview_record(session))
+
+    def submit(self, record: Dict) -> None:
+        with self._lock:
+            self._pending.append(record)
+
+    def _write_behind(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _open_shard(self):
+        self._sequence += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        name = f"interviews-{stamp}-{os.getpid()}-{self._sequence:04d}{_SUFFIXES[self.format]}"
+        shard_class = _ParquetShard if self.format == "parquet" else _JsonLinesShard
+        self._shard_opened = time.monotonic()
+        return shard_class(os.path.join(self.directory, name))
+
+    def _rotate(self, reason: str) -> None:
+        self._shard.close()
+        self._shard = None
+        EXPORT_ROTATIONS.inc(reason)
+
+    def flush(self) -> None:
+        """Write every queued interview as one batch, then rotate the shard if it is due"""
+        with self._write_lock:
+            if self._shard is not None and time.monotonic() - self._shard_opened >= self.max_age:
+                self._rotate("age")
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            started = time.perf_counter()
+            try:
+                if self._shard is None:
+                    self._shard = self._open_shard()
+                self._shard.write(batch)
+            except OSError:
+                # Keep the batch, ahead of anything queued since, for the next attempt
+                with self._lock:
+                    self._pending[:0] = batch
+                return
+            EXPORT_FLUSH_ROWS.observe(len(batch))
+            EXPORT_FLUSH_SECONDS.observe(time.perf_counter() - started)
+            if self._shard.size >= self.max_bytes:
+                self._rotate("size")
+
+    def close(self) -> None:
+        """Stop the writer, write anything still queued and close the current shard"""
+        self._stop.set()
+        if self._writer.is_alive() and self._writer is not threading.current_thread():
+            self._writer.join()
+        self.flush()
+        with self._write_lock:
+            if self._shard is not None:
+                self._rotate("close")
+
+
+def export_shards(directory: str) -> List[str]:
+    """Paths of the readable shards in `directory`, oldest first"""
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith("interviews-") and name.endswith(tuple(_SUFFIXES.values())))
+    # Shards opened in the same second sort by process, then sequence; order across processes is approximate
+    return [os.path.join(directory, name) for name in names]
+
+
+def read_exports(directory: str, since: Optional[float] = None) -> Iterator[Dict]:
+    """Every exported interview, one shard and one batch at a time, optionally only those completed after `since`"""
+    for path in export_shards(directory):
+        for record in _read_shard(path):
+            if since is None or record["completed"] > since:
+                yield record
+
+
+def _read_shard(path: str) -> Iterator[Dict]:
+    if path.endswith(_SUFFIXES["parquet"]):
+        if pq is None:
+            raise RuntimeError(f"reading {path} needs the pyarrow package: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=1024):
+            for row in batch.to_pylist():
+                for column in _JSON_COLUMNS:
+                    row[column] = json.loads(row[column])
+                yield row
+        return
+    with open(path, "rb") as file:
+        for line in file:
+            # The shard may still be open; a line without its newline is a write in progress
+            if line.endswith(b"\n"):
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print exported interviews as JSON lines")
+    parser.add_argument("directory", help="export directory")
+    parser.add_argument("--since", type=float, help="only interviews completed after this Unix time")
+    args = parser.parse_args()
+    for record in read_exports(args.directory, args.since):
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Headless HTTP API for TalentScout interviews
+A small asyncio HTTP/1.1 server (keep-alive, chunked streaming) in front of
+InterviewService, so interviews can be driven by any UI or load balancer.
+
+Endpoints:
+  POST /sessions                         start an interview, returns the greeting
+  POST /sessions/{id}/answers            {"message": ...} -> full reply
+  POST /sessions/{id}/answers/stream     {"message": ...} -> reply as NDJSON chunks
+  GET  /sessions/{id}/summary            stage and collected candidate information
+  DELETE /sessions/{id}                  end and forget an interview
+  GET  /healthz
+  GET  /metrics                          Prometheus text format (when metrics are enabled)
+  GET  /analytics                        interviews by stage, drop-offs, technologies and experience
+
+Usage: python interview_server.py [--host H] [--port P] [--metrics] [--fake-llm [--fake-latency S]]
+                                  [--session-db PATH | --redis-url URL] [--export-dir DIR [--export-format parquet]]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from analytics import ANALYTICS
+from hiring_assistant import HiringAssistant
+from interview_export import EXPORT_FORMATS, InterviewExporter
+from interview_service import InterviewService, SessionNotFound
+from metrics import METRICS
+from session_store import SQLiteSessionStore
+from shared_session_store import RedisStateBackend, SessionConflict, SharedSessionStore
+
+MAX_BODY_BYTES = 1024 * 1024
+
+_REASONS = {
+    200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"
+}
+
+
+class HTTPError(Exception):
+    """An error reported to the client as a JSON body with the given status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Parse one request off a connection; None when the client has closed it"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_json(writer: asyncio.StreamWriter, status: int, payload: Optional[Dict]) -> None:
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(_head(status, {"Content-Type": "application/json", "Content-Length": str(len(body))}) + body)
+    await writer.drain()
+
+
+async def send_text(writer: asyncio.StreamWriter, status: int, text: str, content_type: str) -> None:
+    body = text.encode("utf-8")
+    writer.write(_head(status, {"Content-Type": content_type, "Content-Length": str(len(body))}) + body)
+    await writer.drain()
+
+
+class InterviewServer:
+    """Routes HTTP requests onto an InterviewService"""
+
+    def __init__(self, service: InterviewService):
+        self.service = service
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                headers: Dict[str, str] = {}
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    await self.dispatch(method, path, body, writer)
+                except HTTPError as e:
+                    await send_json(writer, e.status, {"error": e.message})
+                    if e.status in (400, 413):
+                        break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception:
+                    # The response may already be half-written, so drop the connection after reporting
+                    await send_json(writer, 500, {"error": "Internal server error"})
+                    break
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        parts = [part for part in path.split("/") if part]
+        try:
+            if parts == ["healthz"] and method == "GET":
+                await send_json(writer, 200, {"status": "ok", "sessions": await self.service.store.count()})
+            elif parts == ["metrics"] and method == "GET":
+                if not METRICS.enabled:
+                    raise HTTPError(404, "Metrics are disabled; start with --metrics or TALENTSCOUT_METRICS=1")
+                await send_text(writer, 200, METRICS.render(), "text/plain; version=0.0.4; charset=utf-8")
+            elif parts == ["analytics"] and method == "GET":
+                await send_json(writer, 200, self.service.analytics.snapshot())
+            elif parts == ["sessions"] and method == "POST":
+                session = await self.service.start_session()
+                payload = self.service.describe(session)
+                payload["greeting"] = session.messages[0]["content"]
+                await send_json(writer, 201, payload)
+            elif len(parts) == 2 and parts[0] == "sessions" and method == "DELETE":
+                await self.service.end_session(parts[1])
+                await send_json(writer, 204, None)
+            elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "summary" and method == "GET":
+                await send_json(writer, 200, self.service.describe(await self.service.get_session(parts[1])))
+            elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "answers" and method == "POST":
+                reply = await self.service.post_answer(parts[1], self._message(body))
+                payload = self.service.describe(await self.service.get_session(parts[1]))
+                payload["reply"] = reply
+                await send_json(writer, 200, payload)
+            elif parts[:1] == ["sessions"] and parts[2:] == ["answers", "stream"] and method == "POST":
+                await self.stream_reply(parts[1], self._message(body), writer)
+            else:
+                raise HTTPError(404 if method in ("GET", "POST", "DELETE") else 405, "No such endpoint")
+        except SessionNotFound:
+            raise HTTPError(404, "Unknown session")
+        except SessionConflict:
+            raise HTTPError(409, "The session was updated by another request; fetch it and retry")
+
+    @staticmethod
+    def _message(body: bytes) -> str:
+        try:
+            message = json.loads(body or b"{}").get("message")
+        except (ValueError, AttributeError):
+            raise HTTPError(400, "Body must be a JSON object")
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "Field 'message' is required")
+        return message
+
+    async def stream_reply(self, session_id: str, message: str, writer: asyncio.StreamWriter) -> None:
+        """Send the reply as chunked NDJSON: one {"chunk": ...} per piece, then a final status line"""
+        await self.service.get_session(session_id)  # 404 before committing to a 200
+        writer.write(_head(200, {"Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked"}))
+
+        async def send(payload: Dict) -> None:
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await writer.drain()
+
+        # The 200 head is out, so from here on an error can only travel as the body's last line
+        try:
+            async for chunk in self.service.stream_answer(session_id, message):
+                await send({"chunk": chunk})
+            final = self.service.describe(await self.service.get_session(session_id))
+            final["done"] = True
+        except SessionConflict:
+            final = {"error": "The session was updated by another request; fetch it and retry", "done": True}
+        except SessionNotFound:
+            final = {"error": "Unknown session", "done": True}
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception:
+            final = {"error": "Internal server error", "done": True}
+        await send(final)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+async def serve(service: InterviewService, host: str, port: int) -> asyncio.AbstractServer:
+    """Start listening; the caller owns the returned server"""
+    server = InterviewServer(service)
+    return await asyncio.start_server(server.handle_connection, host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentScout headless interview API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--metrics", action="store_true", help="record metrics and serve them at /metrics")
+    parser.add_argument("--fake-llm", action="store_true", help="answer with the offline fake backend")
+    parser.add_argument("--fake-latency", type=float, default=0.5, help="mean fake model latency in seconds")
+    parser.add_argument("--session-db", default=os.getenv("TALENTSCOUT_SESSION_DB"),
+                        help="SQLite file that keeps sessions across restarts (default: in memory)")
+    parser.add_argument("--redis-url", default=os.getenv("TALENTSCOUT_REDIS_URL"),
+                        help="share sessions between replicas through Redis, e.g. redis://cache:6379/0")
+    parser.add_argument("--export-dir", default=os.getenv("TALENTSCOUT_EXPORT_DIR"),
+                        help="append finished interviews to rotating files in this directory")
+    parser.add_argument("--export-format", choices=EXPORT_FORMATS,
+                        default=os.getenv("TALENTSCOUT_EXPORT_FORMAT", "jsonl"))
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.metrics:
+        METRICS.enabled = True
+    assistant_factory = HiringAssistant
+    if args.fake_llm:
+        from llm_backend import FakeBackend
+        backend = FakeBackend(mean_latency=args.fake_latency, latency_jitter=args.fake_latency / 2)
+        assistant_factory = lambda: HiringAssistant(backend=backend)
+    store = None
+    if args.redis_url:
+        store = SharedSessionStore(RedisStateBackend(args.redis_url), assistant_factory)
+    elif args.session_db:
+        store = SQLiteSessionStore(args.session_db, assistant_factory)
+    else:
+        # The interviews a restored analytics snapshot counts as running were lost with the last process
+        ANALYTICS.abandon_active()
+    hooks = []
+    if args.export_dir:
+        hooks.append(InterviewExporter(args.export_dir, args.export_format).export)
+
+    async def run():
+        service = InterviewService(store, assistant_factory, completion_hooks=hooks)
+        server = await serve(service, args.host, args.port)
+        print(f"TalentScout interview API listening on http://{args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
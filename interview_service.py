@@ -0,0 +1,198 @@
+"""
+Interview service: the UI-independent interview flow for TalentScout
+Starts sessions, runs candidate answers through each session's
+HiringAssistant and keeps the transcript, with sessions held in a pluggable
+SessionStore. The Streamlit app and the HTTP API server are both clients.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+import weakref
+from typing import AsyncIterator, Callable, Dict, Optional, Sequence
+
+from analytics import ANALYTICS, RecruitingAnalytics
+from conversation_memory import DEFAULT_TOKEN_BUDGET, ConversationMemory
+from hiring_assistant import HiringAssistant
+from session_store import InMemorySessionStore, InterviewSession, SessionStore
+from speculation import SPECULATOR
+
+GREETING_MESSAGE = """👋 **Welcome to TalentScout's AI Hiring Assistant!**
+
+I'm here to conduct your initial screening interview for technology positions. This process will take about 10-15 minutes and helps us understand your background and technical expertise.
+
+**Here's what we'll cover:**
+1. 📝 Personal and professional information
+2. 💼 Your experience and career interests
+3. 🛠️ Technical skills and expertise
+4. 🧠 A few relevant technical questions
+5. 🎯 Next steps in the process
+
+I'll guide you through each step, so just respond naturally to my questions. Ready to get started?
+
+**Let's begin - what's your full name?**"""
+
+# Interviews with no turn for this long are ended as abandoned
+SESSION_IDLE_SECONDS = float(os.getenv("TALENTSCOUT_SESSION_IDLE", "3600"))
+
+
+class SessionNotFound(KeyError):
+    """No interview session exists with the requested id"""
+
+
+class InterviewService:
+    """Runs interviews against a session store; safe to share between concurrent requests"""
+
+    def __init__(self, store: Optional[SessionStore] = None,
+                 assistant_factory: Optional[Callable[[], HiringAssistant]] = None,
+                 history_tokens: int = DEFAULT_TOKEN_BUDGET,
+                 completion_hooks: Sequence[Callable[[InterviewSession], None]] = (),
+                 analytics: Optional[RecruitingAnalytics] = None,
+                 session_idle: Optional[float] = SESSION_IDLE_SECONDS, sweep_interval: float = 60.0):
+        self.store = store or InMemorySessionStore()
+        self.analytics = analytics or ANALYTICS
+        self.assistant_factory = assistant_factory or HiringAssistant
+        self.history_tokens = history_tokens
+        # Called with each session whose interview has just ended, after it is saved; hooks must not block
+        self.completion_hooks = list(completion_hooks)
+        self.session_idle = session_idle
+        self.sweep_interval = sweep_interval
+        # Turns within one session must not interleave; different sessions run concurrently. A lock
+        # lives only while a turn holds or awaits it, so sessions that are never ended don't pile up here
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._last_sweep = time.monotonic()
+        self._sweep: Optional["asyncio.Task[int]"] = None
+
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    def _schedule_sweep(self) -> None:
+        """Expire idle interviews in the background at most once per sweep_interval"""
+        if self.session_idle is None or (self._sweep is not None and not self._sweep.done()):
+            return
+        now = time.monotonic()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        self._sweep = asyncio.ensure_future(self.expire_idle_sessions())
+
+    async def expire_idle_sessions(self) -> int:
+        """End every interview with no turn for session_idle seconds as abandoned; returns how many"""
+        cutoff = time.time() - self.session_idle
+        expired = 0
+        for session_id in await self.store.idle_sessions(cutoff):
+            async with self._lock(session_id):
+                # A turn may have run since the store was asked
+                session = await self.store.load(session_id)
+                if session is None or session.updated_at >= cutoff:
+                    continue
+                if await self._discard(session):
+                    expired += 1
+        return expired
+
+    async def start_session(self) -> InterviewSession:
+        """Create a new interview and greet the candidate"""
+        self._schedule_sweep()
+        session = InterviewSession(uuid.uuid4().hex, self.assistant_factory(),
+                                   memory=ConversationMemory(self.history_tokens))
+        session.messages.append({"role": "assistant", "content": GREETING_MESSAGE})
+        session.memory.add("assistant", GREETING_MESSAGE)
+        await self.store.save(session)
+        self.analytics.record_start()
+        return session
+
+    async def get_session(self, session_id: str) -> InterviewSession:
+        session = await self.store.load(session_id)
+        if session is None:
+            raise SessionNotFound(session_id)
+        return session
+
+    async def post_answer(self, session_id: str, message: str) -> str:
+        """Run one candidate answer through the interview and return the full reply"""
+        return "".join([chunk async for chunk in self.stream_answer(session_id, message)])
+
+    async def stream_answer(self, session_id: str, message: str) -> AsyncIterator[str]:
+        """Run one candidate answer through the interview, yielding the reply as it is generated"""
+        self._schedule_sweep()
+        async with self._lock(session_id):
+            session = await self.get_session(session_id)
+            assistant = session.assistant
+            was_active = assistant.conversation_active
+            stage, candidate_info = assistant.conversation_stage, dict(assistant.candidate_info)
+            # Taken before the turn, to put things back if the caller stops reading before the reply ends
+            assistant_state, memory_state = assistant.to_state(), session.memory.to_state()
+            message_count = len(session.messages)
+            saved = False
+            try:
+                session.messages.append({"role": "user", "content": message})
+                session.memory.add("user", message)
+                history = session.memory.render()
+
+                reply = []
+                async for chunk in assistant.agenerate_response_stream(message, history):
+                    reply.append(chunk)
+                    yield chunk
+
+                session.messages.append({
+                    "role": "assistant",
+                    "content": "".join(reply),
+                    "timing": dict(assistant.last_turn_timing)
+                })
+                session.memory.add("assistant", session.messages[-1]["content"])
+                await self.store.save(session)
+                saved = True
+            finally:
+                if not saved:
+                    # The candidate never saw the whole reply, so the turn didn't happen; they answer again
+                    assistant.restore_state(assistant_state)
+                    session.memory = ConversationMemory.from_state(memory_state)
+                    del session.messages[message_count:]
+            if not was_active:
+                return
+            ended = not assistant.conversation_active
+            # An ending turn jumps to the conclusion; the stage it left is what analytics records instead
+            self.analytics.record_turn(stage, candidate_info, stage if ended else assistant.conversation_stage,
+                                       assistant.candidate_info)
+            if ended:
+                self.analytics.record_end(stage, "completed" if stage == "conclusion" else "ended_early")
+                for hook in self.completion_hooks:
+                    hook(session)
+
+    async def end_session(self, session_id: str) -> None:
+        """Forget an interview, e.g. when the candidate starts over"""
+        while True:
+            session = await self.store.load(session_id)
+            # Saved by another replica since it was loaded: end the newer state instead
+            if session is None or await self._discard(session):
+                return
+
+    async def _discard(self, session: InterviewSession) -> bool:
+        """Remove a loaded session and record how it ended; False if it changed since it was loaded"""
+        if not await self.store.discard(session):
+            return False
+        SPECULATOR.cancel(session.assistant.question_speculation)
+        if session.assistant.conversation_stage == "conclusion" and session.assistant.conversation_active:
+            # Every question was answered; the candidate only left without saying goodbye
+            self.analytics.record_end("conclusion", "completed")
+            for hook in self.completion_hooks:
+                hook(session)
+        elif session.assistant.conversation_active:
+            self.analytics.record_end(session.assistant.conversation_stage, "abandoned")
+        return True
+
+    @staticmethod
+    def describe(session: InterviewSession) -> Dict:
+        """Public view of a session's progress and collected information"""
+        assistant = session.assistant
+        return {
+            "session_id": session.session_id,
+            "stage": assistant.conversation_stage,
+            "active": assistant.conversation_active,
+            "questions_asked": assistant.questions_asked,
+            "candidate_info": assistant.candidate_info,
+            "summary": assistant.get_candidate_summary()
+        }
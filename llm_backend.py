@@ -0,0 +1,429 @@
+"""
+Pluggable asyncio LLM backends for TalentScout
+A backend owns how model calls are made: a bounded worker pool, per-call
+deadlines, jittered exponential backoff on retryable errors and optional
+hedged requests, all behind the process-wide rate limiter when one is
+configured. GeminiBackend drives the shared Gemini models; FakeBackend
+simulates latency and failures so all of this runs without network access.
+"""
+
+import asyncio
+import os
+import queue
+import random
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Deque, Hashable, Iterator, List, Optional, Tuple
+
+from rate_limiter import INTERACTIVE, LLM_RATE_LIMITER, OUTPUT_TOKEN_RESERVE, AdmissionController
+from token_counting import estimate_tokens
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    _GOOGLE_RETRYABLE: Tuple[type, ...] = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+except ImportError:
+    _GOOGLE_RETRYABLE = ()
+
+
+class LLMError(Exception):
+    """A model call failed for good"""
+
+
+class RetryableLLMError(LLMError):
+    """A model call failed in a way that is worth retrying (rate limits, 5xx, dropped connections)"""
+
+
+class LLMTimeoutError(LLMError):
+    """A model call did not finish before its deadline"""
+
+
+RETRYABLE_ERRORS: Tuple[type, ...] = (RetryableLLMError, asyncio.TimeoutError, ConnectionError) + _GOOGLE_RETRYABLE
+
+_DONE = object()
+
+
+class RetryPolicy:
+    """Jittered exponential backoff: attempt n waits uniformly up to base * 2**n, capped"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 4.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class LLMBackend:
+    """Async model-call policy shared by every backend; subclasses implement single attempts"""
+
+    def __init__(self, max_concurrency: int = 16, timeout: float = 30.0,
+                 retry: Optional[RetryPolicy] = None, hedge_after: Optional[float] = None,
+                 limiter: Optional[AdmissionController] = None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.hedge_after = hedge_after
+        self.limiter = limiter
+        # asyncio primitives belong to one event loop, so keep a semaphore per loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    async def _complete(self, model, prompt: str):
+        """Make one non-streaming call and return the response (must expose .text)"""
+        raise NotImplementedError
+
+    def _stream(self, model, prompt: str) -> AsyncIterator[object]:
+        """Make one streaming call and yield its chunks (each must expose .text)"""
+        raise NotImplementedError
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _admit(self, prompt: str, priority: int, flow: Optional[Hashable]) -> None:
+        """Wait for rate-limit quota for one attempt, if the backend has a limiter"""
+        if self.limiter is not None:
+            await self.limiter.acquire(estimate_tokens(prompt) + OUTPUT_TOKEN_RESERVE, flow, priority)
+
+    async def _pooled(self, model, prompt: str, priority: int = INTERACTIVE, flow: Optional[Hashable] = None):
+        await self._admit(prompt, priority, flow)
+        async with self._semaphore():
+            return await self._complete(model, prompt)
+
+    async def _hedged(self, call: Callable[[], Awaitable[object]]):
+        """Run the call, launching one backup copy if it has not finished after hedge_after seconds"""
+        tasks = [asyncio.ensure_future(call())]
+        try:
+            if self.hedge_after is None:
+                return await tasks[0]
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done:
+                tasks.append(asyncio.ensure_future(call()))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Whichever copy lost (or both, if we were cancelled) is abandoned
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def generate(self, model, prompt: str, timeout: Optional[float] = None,
+                       priority: int = INTERACTIVE, flow: Optional[Hashable] = None):
+        """Call the model with pooling, an overall deadline, retries and optional hedging;
+        priority and flow (the session) place each attempt in the rate limiter's queue"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.timeout if timeout is None else timeout)
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise LLMTimeoutError(f"Model call exceeded its deadline after {attempt} attempt(s)")
+            try:
+                return await asyncio.wait_for(self._hedged(lambda: self._pooled(model, prompt, priority, flow)), remaining)
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt >= self.retry.max_attempts:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise LLMTimeoutError("Model call exceeded its deadline") from e
+                    raise
+                await asyncio.sleep(min(self.retry.backoff(attempt), max(0.0, deadline - loop.time())))
+
+    async def stream(self, model, prompt: str, timeout: Optional[float] = None,
+                     priority: int = INTERACTIVE, flow: Optional[Hashable] = None,
+                     first_chunk_timeout: Optional[float] = None) -> AsyncIterator[object]:
+        """Stream chunks under the same deadline; retries only happen before the first chunk arrives.
+        With first_chunk_timeout, a stream that hasn't produced anything by then fails without retrying"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.timeout if timeout is None else timeout)
+        first_deadline = deadline if first_chunk_timeout is None else min(deadline, loop.time() + first_chunk_timeout)
+        attempt = 0
+        while True:
+            received = False
+            remaining = first_deadline - loop.time()
+            try:
+                await asyncio.wait_for(self._admit(prompt, priority, flow), max(0.0, remaining))
+            except asyncio.TimeoutError as e:
+                raise LLMTimeoutError("Model stream exceeded its deadline waiting for quota") from e
+            async with self._semaphore():
+                chunks = self._stream(model, prompt).__aiter__()
+                try:
+                    while True:
+                        remaining = (deadline if received else first_deadline) - loop.time()
+                        if remaining <= 0:
+                            raise LLMTimeoutError("Model stream exceeded its deadline")
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                        except StopAsyncIteration:
+                            return
+                        except asyncio.TimeoutError as e:
+                            raise LLMTimeoutError("Model stream exceeded its deadline") from e
+                        received = True
+                        yield chunk
+                except RETRYABLE_ERRORS + (LLMTimeoutError,) as e:
+                    attempt += 1
+                    retryable = not isinstance(e, LLMTimeoutError)
+                    if received or not retryable or attempt >= self.retry.max_attempts:
+                        raise
+                finally:
+                    aclose = getattr(chunks, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
+            await asyncio.sleep(min(self.retry.backoff(attempt), max(0.0, first_deadline - loop.time())))
+
+
+class GeminiBackend(LLMBackend):
+    """Runs the blocking google-generativeai calls on a bounded thread pool"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="gemini")
+        return self._executor
+
+    async def _complete(self, model, prompt: str):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, model.generate_content, prompt)
+
+    async def _stream(self, model, prompt: str) -> AsyncIterator[object]:
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        def deliver(item) -> None:
+            try:
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:
+                pass  # the consumer's loop is gone; nothing left to deliver to
+
+        # Set once the consumer is gone (timeout, lost hedge, disconnect), so the thread stops pulling chunks
+        stop = threading.Event()
+
+        # The response and its iterator, once the producer has them, so the consumer can cancel a blocked read
+        opened: List[object] = []
+
+        def produce() -> None:
+            response = iterator = None
+            try:
+                response = model.generate_content(prompt, stream=True)
+                iterator = iter(response)
+                opened[:] = [response, iterator]
+                for chunk in iterator:
+                    if stop.is_set():
+                        break
+                    deliver((chunk, None))
+            except BaseException as e:
+                deliver((None, e))
+            else:
+                deliver((_DONE, None))
+            finally:
+                if stop.is_set():
+                    _close_stream(response, iterator)
+
+        loop.run_in_executor(self.executor, produce)
+        finished = False
+        try:
+            while True:
+                chunk, error = await chunks.get()
+                if error is not None:
+                    finished = True
+                    raise error
+                if chunk is _DONE:
+                    finished = True
+                    return
+                yield chunk
+        finally:
+            if not finished:
+                stop.set()
+                if opened:
+                    _close_stream(*opened)
+
+
+def _close_stream(response, iterator) -> None:
+    """Abandon a Gemini stream part-way: close the chunk iterator and cancel the underlying RPC"""
+    for stream in (iterator, getattr(response, "_iterator", None)):
+        for method in ("close", "cancel"):
+            close = getattr(stream, method, None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass  # already finished or torn down; nothing left to release
+
+
+class FakeResponse:
+    """Stand-in for a Gemini response or stream chunk"""
+
+    def __init__(self, text: str, prompt_tokens: int = 0, output_tokens: int = 0):
+        self.text = text
+        self.usage_metadata = _FakeUsage(prompt_tokens, output_tokens)
+
+
+class _FakeUsage:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.cached_content_token_count = 0
+        self.candidates_token_count = output_tokens
+
+
+def _default_responder(prompt: str) -> str:
+    if "Generate exactly 4 professional technical interview questions" in prompt:
+        return "\n".join(f"Q{i}: Describe a real project where you applied this skill ({i})." for i in range(1, 5))
+    return "Thanks for sharing that. Could you tell me a little more about your background?"
+
+
+class FakeBackend(LLMBackend):
+    """Offline backend with configurable latency and error distributions, for tests and load runs"""
+
+    def __init__(self, mean_latency: float = 0.05, latency_jitter: float = 0.0,
+                 tail_rate: float = 0.0, tail_latency: float = 1.0,
+                 error_rate: float = 0.0, fatal_error_rate: float = 0.0,
+                 chunk_count: int = 4, seed: Optional[int] = None,
+                 responder: Optional[Callable[[str], str]] = None, **kwargs):
+        kwargs.setdefault("retry", RetryPolicy(base_delay=0.01, max_delay=0.1, rng=random.Random(seed)))
+        super().__init__(**kwargs)
+        self.mean_latency = mean_latency
+        self.latency_jitter = latency_jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.fatal_error_rate = fatal_error_rate
+        self.chunk_count = max(1, chunk_count)
+        self.responder = responder or _default_responder
+        self.rng = random.Random(seed)
+        self.calls = 0
+        # Most recent prompts only, so long load runs don't grow without bound
+        self.prompts: Deque[str] = deque(maxlen=256)
+
+    def sample_latency(self) -> float:
+        """Draw a latency: mean plus uniform jitter, with an occasional slow tail"""
+        if self.tail_rate and self.rng.random() < self.tail_rate:
+            return self.tail_latency
+        return max(0.0, self.mean_latency + self.rng.uniform(-self.latency_jitter, self.latency_jitter))
+
+    def _maybe_fail(self) -> None:
+        roll = self.rng.random()
+        if roll < self.fatal_error_rate:
+            raise LLMError("Simulated non-retryable model error")
+        if roll < self.fatal_error_rate + self.error_rate:
+            raise RetryableLLMError("Simulated retryable model error")
+
+    async def _complete(self, model, prompt: str):
+        self.calls += 1
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        text = self.responder(prompt)
+        return FakeResponse(text, prompt_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+
+    async def _stream(self, model, prompt: str) -> AsyncIterator[object]:
+        self.calls += 1
+        self.prompts.append(prompt)
+        latency = self.sample_latency()
+        # Time to first token is half the latency; the rest is spread across the chunks
+        await asyncio.sleep(latency / 2)
+        self._maybe_fail()
+        text = self.responder(prompt)
+        size = max(1, -(-len(text) // self.chunk_count))
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        for index, piece in enumerate(pieces):
+            if index:
+                await asyncio.sleep(latency / 2 / len(pieces))
+            last = index == len(pieces) - 1
+            yield FakeResponse(piece, prompt_tokens=len(prompt) // 4 if last else 0,
+                               output_tokens=len(text) // 4 if last else 0)
+
+
+class BackgroundLoop:
+    """A daemon thread running an event loop, so synchronous callers can drive async backends"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name="llm-backend-loop", daemon=True)
+                    thread.start()
+                    self._thread = thread
+                    self._loop = loop
+        return self._loop
+
+    def _check_thread(self) -> None:
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("Blocking call made from the backend loop itself; await the async API instead")
+
+    def run(self, coro: Awaitable[object]):
+        """Run a coroutine on the loop and block for its result"""
+        self._check_thread()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def iterate(self, agen: AsyncIterator[object]) -> Iterator[object]:
+        """Consume an async iterator on the loop, yielding its items to the calling thread"""
+        self._check_thread()
+        items: "queue.Queue" = queue.Queue()
+
+        async def pump() -> None:
+            try:
+                async for item in agen:
+                    items.put((item, None))
+            except BaseException as e:
+                items.put((None, e))
+                return
+            items.put((_DONE, None))
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                item, error = items.get()
+                if error is not None:
+                    raise error
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            future.cancel()
+
+
+# Shared by every session: one pool of Gemini workers and one loop for synchronous callers
+GEMINI_BACKEND = GeminiBackend(
+    max_concurrency=int(os.getenv("TALENTSCOUT_LLM_CONCURRENCY", "16")),
+    timeout=float(os.getenv("TALENTSCOUT_LLM_TIMEOUT", "30")),
+    retry=RetryPolicy(max_attempts=int(os.getenv("TALENTSCOUT_LLM_MAX_ATTEMPTS", "3"))),
+    hedge_after=float(os.environ["TALENTSCOUT_LLM_HEDGE_AFTER"]) if os.getenv("TALENTSCOUT_LLM_HEDGE_AFTER") else None,
+    limiter=LLM_RATE_LIMITER
+)
+BACKGROUND_LOOP = BackgroundLoop()
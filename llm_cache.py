@@ -0,0 +1,188 @@
+"""
+Memoizing layer for TalentScout's Gemini calls
+Responses are keyed on the model identity plus a hash of the prompt with
+whitespace normalized, held in a bounded in-memory LRU with a TTL, and
+optionally backed by a SQLite file so they survive restarts. New responses
+reach the file through a background thread, which also deletes expired rows
+periodically, so a turn never waits on a commit.
+"""
+
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+
+class LLMResult(NamedTuple):
+    """Text of a model call, the raw response on a miss, and whether it came from the cache"""
+    text: str
+    response: object
+    cached: bool
+
+
+class LLMCache:
+    """Bounded LRU of model responses with a TTL and an optional SQLite second tier"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600, disk_path: Optional[str] = None,
+                 flush_interval: float = 1.0, prune_interval: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        # key -> (text, created, site that stored it), so an eviction is charged to the entry's own site
+        self._entries: "OrderedDict[str, Tuple[str, float, str]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        # Responses waiting for the disk writer: key -> (text, created)
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._disk_lock = threading.Lock()
+        self._disk = None
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self.prune()
+            self._writer = threading.Thread(target=self._write_behind, name="llm-cache-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    @staticmethod
+    def make_key(model_id: str, prompt: str) -> str:
+        """Hash the model identity and the prompt with runs of whitespace collapsed"""
+        normalized = " ".join(prompt.split())
+        return hashlib.sha256(f"{model_id}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def _count(self, site: str, event: str) -> None:
+        # Caller holds the lock
+        site_stats = self._stats.setdefault(site, {"hits": 0, "misses": 0, "evictions": 0})
+        site_stats[event] += 1
+
+    def get(self, key: str, site: str) -> Optional[str]:
+        """Look a key up in memory, then on disk; expired entries count as misses"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._count(site, "hits")
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            if self._disk is None:
+                self._count(site, "misses")
+                return None
+            row = self._pending.get(key)
+
+        if row is None:
+            with self._disk_lock:
+                if self._disk is not None:
+                    row = self._disk.execute("SELECT text, created FROM llm_cache WHERE key = ?",
+                                             (key,)).fetchone()
+        with self._lock:
+            if row is not None and now - row[1] < self.ttl_seconds:
+                self._store(key, row[0], row[1], site)
+                self._count(site, "hits")
+                return row[0]
+            self._count(site, "misses")
+            return None
+
+    def put(self, key: str, text: str, site: str) -> None:
+        created = time.time()
+        with self._lock:
+            self._store(key, text, created, site)
+            if self._disk is not None:
+                self._pending[key] = (text, created)
+
+    def _store(self, key: str, text: str, created: float, site: str) -> None:
+        # Caller holds the lock
+        self._entries[key] = (text, created, site)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _, (_, _, evicted_site) = self._entries.popitem(last=False)
+            self._count(evicted_site, "evictions")
+
+    def _write_behind(self) -> None:
+        last_prune = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            if time.monotonic() - last_prune >= self.prune_interval:
+                self.prune()
+                last_prune = time.monotonic()
+
+    def flush(self) -> None:
+        """Write every response queued for the disk tier in one transaction"""
+        with self._disk_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch or self._disk is None:
+                return
+            try:
+                with self._disk:
+                    self._disk.executemany(
+                        "INSERT OR REPLACE INTO llm_cache (key, text, created) VALUES (?, ?, ?)",
+                        [(key, text, created) for key, (text, created) in batch.items()]
+                    )
+            except sqlite3.Error:
+                # Keep the batch for the next attempt, unless a newer response has been queued since
+                with self._lock:
+                    for key, row in batch.items():
+                        self._pending.setdefault(key, row)
+
+    def prune(self) -> None:
+        """Delete rows older than the TTL from the disk tier"""
+        with self._disk_lock:
+            if self._disk is None:
+                return
+            try:
+                with self._disk:
+                    self._disk.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl_seconds,))
+            except sqlite3.Error:
+                pass  # e.g. the file is locked by another process; try again next interval
+
+    async def agenerate(self, call: Callable[[str], Awaitable[object]], model_id: str, prompt: str,
+                        site: str) -> LLMResult:
+        """Return a memoized response, awaiting call(prompt) only on a miss"""
+        key = self.make_key(model_id, prompt)
+        text = self.get(key, site)
+        if text is not None:
+            return LLMResult(text, None, True)
+        response = await call(prompt)
+        self.put(key, response.text, site)
+        return LLMResult(response.text, response, False)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit, miss and eviction counts per call site"""
+        with self._lock:
+            return {site: dict(counts) for site, counts in self._stats.items()}
+
+    def clear(self) -> None:
+        """Empty the in-memory tier and reset the counters; the disk tier is left intact"""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def close(self) -> None:
+        """Stop the disk writer, write anything still queued and close the disk tier, if any"""
+        self._stop.set()
+        if self._writer is not None and self._writer.is_alive() and self._writer is not threading.current_thread():
+            self._writer.join()
+        self.flush()
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+
+# Shared by every session; set TALENTSCOUT_LLM_CACHE_PATH to persist responses across restarts
+LLM_CACHE = LLMCache(
+    max_entries=int(os.getenv("TALENTSCOUT_LLM_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.getenv("TALENTSCOUT_LLM_CACHE_TTL", "3600")),
+    disk_path=os.getenv("TALENTSCOUT_LLM_CACHE_PATH")
+)
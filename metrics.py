@@ -0,0 +1,318 @@
+"""
+Lightweight metrics for TalentScout
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format for the API server's /metrics endpoint, or flushed to a
+file periodically. Metric objects are created once at import time by the
+modules that own them; while the registry is disabled every update returns
+after a single attribute check, and timers are a shared no-op object.
+
+Enable with TALENTSCOUT_METRICS=1, or set TALENTSCOUT_METRICS_FILE (and
+optionally TALENTSCOUT_METRICS_INTERVAL, in seconds) to also write the
+metrics to that file in the background.
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; covers in-process phases (microseconds) through slow model calls
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Characters or tokens
+SIZE_BUCKETS = (64, 256, 1024, 2048, 4096, 8192, 16384, 65536)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _NullTimer:
+    """Stands in for a timer while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, label_names: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing total per label set"""
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}"
+                for labels, value in items]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    """A current value per label set, such as a queue depth"""
+    kind = "gauge"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}"
+                for labels, value in items]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Bucketed observations per label set, with their sum and count"""
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, label_names, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(registry, name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels: str):
+        """Context manager observing the duration of its block"""
+        if not self.registry.enabled:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(series[0]), series[1])) for labels, series in self._series.items())
+        lines = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Owns every metric; flip `enabled` to start or stop recording"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset every recorded value; the metrics themselves stay registered"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    def write_file(self, path: str) -> None:
+        """Atomically replace `path` with the current metrics"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+    def start_file_flush(self, path: str, interval: float = 15.0) -> None:
+        """Enable recording and write the metrics to `path` every `interval` seconds from a daemon thread"""
+        self.enabled = True
+        with self._lock:
+            if self._flusher is not None:
+                return
+
+            def flush_forever():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        self.write_file(path)
+                    except OSError:
+                        pass  # e.g. the directory went away; try again next interval
+
+            self._flusher = threading.Thread(target=flush_forever, name="metrics-flush", daemon=True)
+            self._flusher.start()
+
+
+METRICS = MetricsRegistry(enabled=os.getenv("TALENTSCOUT_METRICS", "").lower() in ("1", "true", "yes"))
+
+# Interview turn metrics, recorded by HiringAssistant
+TURNS = METRICS.counter(
+    "talentscout_turns_total", "Interview turns by stage at the start of the turn and how they were answered",
+    ("stage", "source")
+)
+SLO_FALLBACKS = METRICS.counter(
+    "talentscout_slo_fallbacks_total",
+    "Model calls that missed the turn SLO and were answered from local templates, by call site and stage",
+    ("site", "stage")
+)
+LATE_QUESTIONS = METRICS.counter(
+    "talentscout_late_questions_total",
+    "Technical questions that arrived after the turn SLO: adopted on a later turn, or discarded",
+    ("outcome",)
+)
+TURN_SECONDS = METRICS.histogram(
+    "talentscout_turn_seconds", "Wall time of a whole interview turn", ("stage",)
+)
+TIME_TO_FIRST_TOKEN_SECONDS = METRICS.histogram(
+    "talentscout_time_to_first_token_seconds", "Time until the first streamed text of a turn", ("stage",)
+)
+PHASE_SECONDS = METRICS.histogram(
+    "talentscout_turn_phase_seconds",
+    "Time spent in each phase of a turn: turn_plan, extraction (which runs inside turn_plan), "
+    "prompt_assembly, model_call and question_generation (which overlaps model_call)",
+    ("phase", "stage")
+)
+PROMPT_CHARS = METRICS.histogram(
+    "talentscout_prompt_chars", "Size of the per-turn prompt sent to the model", ("stage",), SIZE_BUCKETS
+)
+RESPONSE_CHARS = METRICS.histogram(
+    "talentscout_response_chars", "Size of the model's reply", ("stage",), SIZE_BUCKETS
+)
+MODEL_TOKENS = METRICS.counter(
+    "talentscout_model_tokens_total", "Tokens reported by the model: cached and uncached input, and output",
+    ("kind",)
+)
+
+if os.getenv("TALENTSCOUT_METRICS_FILE"):
+    METRICS.start_file_flush(os.environ["TALENTSCOUT_METRICS_FILE"],
+                             float(os.getenv("TALENTSCOUT_METRICS_INTERVAL", "15")))
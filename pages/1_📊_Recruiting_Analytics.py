@@ -0,0 +1,67 @@
+import streamlit as st
+from datetime import datetime
+import os
+import pandas as pd
+
+from analytics import ANALYTICS
+from prompt_builder import STAGES
+
+# Technologies shown per category
+TOP_TECHNOLOGIES = 10
+
+st.set_page_config(page_title="TalentScout - Recruiting Analytics", page_icon="📊", layout="wide")
+
+
+def main():
+    st.markdown("# 📊 Recruiting Analytics")
+    # The aggregates are kept up to date as interviews run, so this page never scans past sessions
+    snapshot = ANALYTICS.snapshot()
+    st.caption(f"Interviews run by this server · as of {datetime.fromtimestamp(snapshot['taken']):%H:%M:%S}")
+    if os.getenv("TALENTSCOUT_REDIS_URL"):
+        st.warning("Replicas share interviews, so these are the turns this replica served. For totals, add up "
+                   "every replica's snapshot: `python analytics.py a.json b.json`")
+    if st.button("🔄 Refresh"):
+        st.rerun()
+
+    stages = snapshot["stages"]
+    outcomes = snapshot["outcomes"]
+    columns = st.columns(5)
+    columns[0].metric("Started", snapshot["started"])
+    columns[1].metric("In progress", max(0, sum(counts["active"] for counts in stages.values())))
+    columns[2].metric("Completed", outcomes["completed"])
+    columns[3].metric("Ended early", outcomes["ended_early"])
+    columns[4].metric("Abandoned", outcomes["abandoned"])
+
+    funnel, experience = st.columns(2)
+    with funnel:
+        st.markdown("### 🧭 Stages")
+        table = pd.DataFrame(
+            [(stage.replace("_", " ").title(), stages[stage]["reached"], stages[stage]["active"],
+              stages[stage]["drop_offs"]) for stage in STAGES],
+            columns=["Stage", "Reached", "In progress", "Dropped off"]
+        ).set_index("Stage").clip(lower=0)
+        # Each stage's bar stacks to the interviews that reached it: those that moved on (or finished), are still
+        # there, or left there
+        table["Moved on"] = (table["Reached"] - table["In progress"] - table["Dropped off"]).clip(lower=0)
+        st.bar_chart(table[["Moved on", "In progress", "Dropped off"]])
+        st.dataframe(table[["Reached", "In progress", "Dropped off"]], use_container_width=True)
+    with experience:
+        st.markdown("### 💼 Stated Experience")
+        st.bar_chart(pd.Series(snapshot["experience"], name="Candidates").clip(lower=0))
+
+    st.markdown("### 🛠️ Technologies")
+    technologies = {category: {tech: count for tech, count in techs.items() if count > 0}
+                    for category, techs in snapshot["technologies"].items()}
+    technologies = {category: techs for category, techs in technologies.items() if techs}
+    if not technologies:
+        st.info("No tech stacks collected yet.")
+        return
+    categories = sorted(technologies)
+    for column, category in zip(st.columns(min(3, len(categories))) * len(categories), categories):
+        with column:
+            st.markdown(f"**{category.replace('_', ' ').title()}**")
+            top = sorted(technologies[category].items(), key=lambda item: (-item[1], item[0]))[:TOP_TECHNOLOGIES]
+            st.bar_chart(pd.Series(dict(top), name="Candidates"))
+
+
+main()
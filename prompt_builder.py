@@ -0,0 +1,248 @@
+"""
+Stage-specific prompt assembly for TalentScout interviews
+The system prompt is built from sections, and only the ones relevant to the
+current conversation stage are included. It is assembled once per stage, so
+each stage's prompt model is registered (and context-cached) once. The
+per-turn prompt is built the same way, with the collected information
+serialized as compact JSON. Every section's token estimate is reported so
+per-turn input cost can be seen, and capped by trimming the oldest history.
+"""
+
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from metrics import METRICS, SIZE_BUCKETS
+from token_counting import estimate_tokens
+
+STAGES = ["greeting", "info_gathering", "tech_stack", "tech_questions", "conclusion"]
+
+# Required basic details, in the order the interview asks for them
+DETAIL_LABELS = {
+    "name": "full name",
+    "email": "email address",
+    "phone": "phone number",
+    "experience": "years of experience",
+    "position": "desired position",
+    "location": "current location"
+}
+
+PROMPT_SECTION_TOKENS = METRICS.histogram(
+    "talentscout_prompt_section_tokens", "Estimated input tokens per prompt section", ("section", "stage"),
+    SIZE_BUCKETS
+)
+
+_INTRO = (
+    "You are an AI Hiring Assistant for TalentScout, a prestigious technology recruitment agency. "
+    "Your role is to conduct professional, thorough, and engaging initial candidate screening interviews."
+)
+
+_OBJECTIVES = """CORE OBJECTIVES:
+1. Create a welcoming, professional interview experience
+2. Systematically collect all required candidate information
+3. Assess technical competency through targeted questions
+4. Maintain conversation flow and handle edge cases gracefully
+5. Provide clear next steps and professional closure"""
+
+_STAGE_LINES = {
+    "greeting": "GREETING: Professional welcome, explain purpose and process (2-3 minutes)",
+    "info_gathering": "INFO_GATHERING: Systematic collection of candidate details (5-7 minutes)",
+    "tech_stack": "TECH_STACK: Deep dive into technical skills and experience (3-4 minutes)",
+    "tech_questions": "TECH_QUESTIONS: 4-5 targeted technical assessment questions (8-10 minutes)",
+    "conclusion": "CONCLUSION: Professional wrap-up with clear next steps (2 minutes)"
+}
+
+_REQUIRED_INFO = """REQUIRED INFORMATION TO COLLECT:
+✓ Full Name (First and Last)
+✓ Professional Email Address
+✓ Phone Number (with country code if international)
+✓ Years of Professional Experience
+✓ Desired Position/Role (specific titles)
+✓ Current Location (City, Country)"""
+
+_TECH_STACK_INFO = """TECH STACK TO COLLECT:
+- Programming Languages (proficiency levels)
+- Frameworks and Libraries
+- Databases and Data Technologies
+- Cloud Platforms and DevOps Tools
+- Development Tools and IDEs
+- Methodologies (Agile, DevOps, etc.)"""
+
+_GUIDELINES = """INTERACTION GUIDELINES:
+- Maintain professional yet approachable tone throughout
+- Ask ONE focused question at a time for better user experience
+- Acknowledge and confirm information as it's provided
+- Use natural conversation flow, avoid robotic responses
+- Handle incomplete or unclear responses with gentle clarification"""
+
+_QUESTION_GUIDELINES = """TECHNICAL QUESTIONS:
+- Adapt question difficulty based on stated experience level
+- Make questions relevant to their specific tech stack
+- Mix conceptual and practical scenarios
+- Keep them professional interview-standard quality"""
+
+_ENDING = """CONVERSATION ENDING:
+- Detect keywords: "bye", "goodbye", "exit", "quit", "done", "finish"
+- Provide professional summary and next steps
+- Thank candidate for their time"""
+
+_FOCUS = """STAY FOCUSED:
+- Only discuss hiring, recruitment, and technical assessment topics
+- Politely redirect off-topic conversations back to the interview
+- Handle unexpected inputs gracefully with professional responses"""
+
+_STYLE = ("Respond conversationally, never as lists or bullet points unless specifically formatting "
+          "technical questions.")
+
+# Which optional system sections each stage needs; the rest are always included
+_STAGE_SECTIONS = {
+    "greeting": ("required_info",),
+    "info_gathering": ("required_info", "tech_stack_info"),
+    "tech_stack": ("tech_stack_info", "question_guidelines"),
+    "tech_questions": ("question_guidelines",),
+    "conclusion": ()
+}
+_OPTIONAL_SECTIONS = {
+    "required_info": _REQUIRED_INFO,
+    "tech_stack_info": _TECH_STACK_INFO,
+    "question_guidelines": _QUESTION_GUIDELINES
+}
+
+
+class BuiltPrompt(NamedTuple):
+    """Prompt text and the estimated tokens of each section, in order"""
+    text: str
+    section_tokens: Dict[str, int]
+
+    @property
+    def tokens(self) -> int:
+        return sum(self.section_tokens.values())
+
+
+def _join(sections: List[Tuple[str, str]]) -> BuiltPrompt:
+    sections = [(name, text) for name, text in sections if text]
+    return BuiltPrompt("\n\n".join(text for _, text in sections),
+                       {name: estimate_tokens(text) for name, text in sections})
+
+
+class PromptBuilder:
+    """Builds stage-specific system and turn prompts, optionally under a total token cap"""
+
+    def __init__(self, token_cap: Optional[int] = None):
+        self.token_cap = token_cap
+        self._system_prompts: Dict[str, BuiltPrompt] = {}
+
+    def system_prompt(self, stage: str) -> BuiltPrompt:
+        """The system prompt for a stage, assembled on first use"""
+        prompt = self._system_prompts.get(stage)
+        if prompt is None:
+            prompt = self._system_prompts[stage] = self._build_system_prompt(stage)
+        return prompt
+
+    def _build_system_prompt(self, stage: str) -> BuiltPrompt:
+        index = STAGES.index(stage) if stage in STAGES else 0
+        stage_lines = [f"CURRENT STAGE: {_STAGE_LINES[STAGES[index]]}"]
+        if index + 1 < len(STAGES):
+            stage_lines.append(f"NEXT STAGE: {_STAGE_LINES[STAGES[index + 1]]}")
+        sections = [("intro", _INTRO), ("objectives", _OBJECTIVES), ("stage", "\n".join(stage_lines))]
+        sections += [(name, _OPTIONAL_SECTIONS[name]) for name in _STAGE_SECTIONS.get(STAGES[index], ())]
+        sections += [("guidelines", _GUIDELINES), ("ending", _ENDING), ("focus", _FOCUS), ("style", _STYLE)]
+        return _join(sections)
+
+    def turn_prompt(self, stage: str, candidate_info: Dict, questions_asked: int, conversation_active: bool,
+                    tech_questions: List[str], conversation_history: str, user_input: str,
+                    system_tokens: int = 0) -> BuiltPrompt:
+        """The dynamic part of a turn's prompt; the system prompt travels separately"""
+        context = (f"CURRENT CONTEXT:\n- Conversation Stage: {stage.upper()}\n"
+                   f"- Questions Asked: {questions_asked}/4\n- Conversation Active: {conversation_active}")
+        info = json.dumps(candidate_info, separators=(",", ":"), ensure_ascii=False) if candidate_info else "None yet"
+        questions = ""
+        if stage == "tech_questions" and tech_questions:
+            questions = "PREPARED TECHNICAL QUESTIONS:\n" + "\n".join(tech_questions)
+
+        sections = [
+            ("context", context),
+            ("candidate_info", f"COLLECTED CANDIDATE INFORMATION: {info}"),
+            ("prepared_questions", questions),
+            ("history", f"RECENT CONVERSATION HISTORY:\n{conversation_history}"),
+            ("latest_response", f'CANDIDATE\'S LATEST RESPONSE: "{user_input}"'),
+            ("instructions", self._instructions(stage, candidate_info, questions_asked, bool(questions)))
+        ]
+        prompt = _join(sections)
+        if self.token_cap and prompt.tokens + system_tokens > self.token_cap:
+            excess = prompt.tokens + system_tokens - self.token_cap
+            sections[3] = ("history", "RECENT CONVERSATION HISTORY:\n" + _trim_oldest(conversation_history, excess))
+            prompt = _join(sections)
+        return prompt
+
+    @staticmethod
+    def _instructions(stage: str, candidate_info: Dict, questions_asked: int, has_questions: bool) -> str:
+        steps = ["Process the candidate's input and extract any relevant information",
+                 "Update conversation stage if appropriate",
+                 "Provide a natural, professional response"]
+        if stage in ("greeting", "info_gathering"):
+            missing = [label for field, label in DETAIL_LABELS.items() if field not in candidate_info]
+            steps.append(f"Ask for the next missing detail ({', '.join(missing)})" if missing
+                         else "Ask about their tech stack")
+        elif stage == "tech_stack":
+            steps.append("Ask about any part of their tech stack that is still unclear")
+        elif stage == "tech_questions":
+            steps.append(f"Ask prepared question {questions_asked + 1}" if has_questions and questions_asked < 4
+                         else "Ask the next technical question, specific to their tech stack")
+        else:
+            steps.append("Wrap up and explain the next steps")
+        lines = [f"{number}. {step}" for number, step in enumerate(steps, 1)]
+        return "INSTRUCTIONS FOR THIS RESPONSE:\n" + "\n".join(lines) + "\n\nGenerate your response now:"
+
+    @staticmethod
+    def questions_prompt(candidate_info: Dict) -> str:
+        """The prompt asking for four technical questions tailored to the candidate"""
+        tech_stack = json.dumps(candidate_info.get("tech_stack", {}), separators=(",", ":"), ensure_ascii=False)
+        return f"""Generate exactly 4 professional technical interview questions for a candidate with:
+
+Tech Stack: {tech_stack}
+Experience Level: {candidate_info.get("experience", "0 years")}
+Position Interest: {candidate_info.get("position", "Software Developer")}
+
+Requirements for questions:
+1. Mix of conceptual understanding and practical application
+2. Appropriate difficulty for their experience level
+3. Specific to their mentioned technologies
+4. Real-world scenario based
+5. Allow for detailed explanations
+
+Format as:
+Q1: [Question 1]
+Q2: [Question 2]
+Q3: [Question 3]
+Q4: [Question 4]
+
+Make questions professional, clear, and interview-appropriate."""
+
+    @staticmethod
+    def observe(stage: str, *prompts: BuiltPrompt) -> None:
+        """Record each section's token estimate in the metrics"""
+        if not METRICS.enabled:
+            return
+        for prompt in prompts:
+            for section, tokens in prompt.section_tokens.items():
+                PROMPT_SECTION_TOKENS.observe(tokens, section, stage)
+
+
+def parse_questions(text: str) -> List[str]:
+    """The Q1: to Q4: lines of a reply to questions_prompt, or the whole reply if it isn't in that format"""
+    questions = [line.strip() for line in text.split("\n") if line.strip().startswith(("Q1:", "Q2:", "Q3:", "Q4:"))]
+    return questions if len(questions) == 4 else [text]
+
+
+def _trim_oldest(history: str, excess_tokens: int) -> str:
+    """Drop whole lines from the start of the history until about `excess_tokens` are gone"""
+    lines = history.split("\n")
+    removed = 0
+    while len(lines) > 1 and removed < excess_tokens:
+        removed += estimate_tokens(lines.pop(0) + "\n")
+    return "\n".join(lines)
+
+
+_cap = int(os.getenv("TALENTSCOUT_PROMPT_TOKEN_CAP", "0"))
+PROMPT_BUILDER = PromptBuilder(token_cap=_cap or None)
@@ -0,0 +1,243 @@
+"""
+Precomputed technical questions for common tech stacks
+The stacks candidates describe cluster into a fairly small number of
+combinations, so most question-generation calls ask Gemini for questions it
+has effectively written before. The builder below pre-generates questions
+for the most frequent (tech stack, experience bucket) combinations seen in
+past interviews, on a process pool, and writes them to one compact file.
+At runtime the bank finds the entry whose technologies are most similar to
+the candidate's (Jaccard similarity, through an inverted index per
+experience bucket) and serves its questions without a model call; stacks
+with no close enough entry still go to the model.
+
+File layout (little-endian): a header (magic, version, entry count,
+vocabulary size), the vocabulary of technology names, one index record per
+entry (bucket, term ids, question count) and finally every question,
+zlib-compressed as one block.
+
+Build: python question_bank.py --profiles profiles.jsonl --session-db sessions.db \\
+           --top 500 --workers 8 --output question_bank.bin
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from metrics import METRICS
+from prompt_builder import PROMPT_BUILDER, parse_questions
+from question_templates import EXPERIENCE_BUCKETS, experience_bucket
+
+QUESTION_BANK_LOOKUPS = METRICS.counter(
+    "talentscout_question_bank_total", "Question bank lookups: hit, or miss (the model writes the questions)",
+    ("outcome",)
+)
+
+_MAGIC = b"TSQB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHII")
+_RECORD = struct.Struct("<BBB")
+
+# Below this similarity a banked entry is too far from the candidate's stack and the model is asked instead
+MIN_SIMILARITY = 0.6
+
+
+def stack_terms(tech_stack: Dict[str, Sequence[str]]) -> FrozenSet[str]:
+    """The technologies of an extracted tech stack, regardless of category"""
+    return frozenset(tech for techs in tech_stack.values() for tech in techs)
+
+
+class QuestionBank:
+    """Questions per (technology set, experience bucket), with nearest-neighbour lookup by Jaccard similarity"""
+
+    def __init__(self, min_similarity: float = MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self._terms: List[FrozenSet[str]] = []
+        self._buckets: List[str] = []
+        self._questions: List[List[str]] = []
+        # (bucket, technology) -> ids of the entries containing it
+        self._postings: Dict[Tuple[str, str], List[int]] = {}
+        # Exact technology sets answer without scanning postings
+        self._exact: Dict[Tuple[FrozenSet[str], str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+    def add(self, terms: Iterable[str], bucket: str, questions: List[str]) -> None:
+        """Bank questions for a technology set; entries added first win ties, so add the most common first"""
+        entry = len(self._questions)
+        terms = frozenset(terms)
+        self._terms.append(terms)
+        self._buckets.append(bucket)
+        self._questions.append([question.replace("\n", " ") for question in questions])
+        for term in terms:
+            self._postings.setdefault((bucket, term), []).append(entry)
+        self._exact.setdefault((terms, bucket), entry)
+
+    def nearest(self, terms: FrozenSet[str], bucket: str) -> Optional[Tuple[int, float]]:
+        """The entry most similar to `terms` in the bucket, and its similarity; None if none shares a term"""
+        exact = self._exact.get((terms, bucket))
+        if exact is not None:
+            return exact, 1.0
+        overlap = Counter(chain.from_iterable(self._postings.get((bucket, term), ()) for term in terms))
+        best: Optional[Tuple[int, float]] = None
+        size = len(terms)
+        for entry, shared in overlap.items():
+            similarity = shared / (size + len(self._terms[entry]) - shared)
+            if best is None or similarity > best[1] or (similarity == best[1] and entry < best[0]):
+                best = (entry, similarity)
+        return best
+
+    def lookup(self, tech_stack: Dict[str, Sequence[str]], experience: Optional[str] = None) -> Optional[List[str]]:
+        """Banked questions for a close enough stack at the candidate's experience level, or None"""
+        if not self._questions:
+            return None
+        match = self.nearest(stack_terms(tech_stack), experience_bucket(experience))
+        if match is None or match[1] < self.min_similarity:
+            QUESTION_BANK_LOOKUPS.inc("miss")
+            return None
+        QUESTION_BANK_LOOKUPS.inc("hit")
+        return list(self._questions[match[0]])
+
+    def save(self, path: str) -> None:
+        """Write the bank to `path`, replacing any previous file only once the new one is complete"""
+        vocabulary = sorted(set().union(*self._terms)) if self._terms else []
+        term_ids = {term: index for index, term in enumerate(vocabulary)}
+        vocabulary_bytes = "\n".join(vocabulary).encode("utf-8")
+        parts = [_HEADER.pack(_MAGIC, _VERSION, len(self), len(vocabulary_bytes)), vocabulary_bytes]
+        for terms, bucket, questions in zip(self._terms, self._buckets, self._questions):
+            ids = sorted(term_ids[term] for term in terms)
+            parts.append(_RECORD.pack(EXPERIENCE_BUCKETS.index(bucket), len(ids), len(questions)))
+            parts.append(struct.pack(f"<{len(ids)}H", *ids))
+        text = "\n".join(question for questions in self._questions for question in questions)
+        parts.append(zlib.compress(text.encode("utf-8"), 9))
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(b"".join(parts))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str, min_similarity: float = MIN_SIMILARITY) -> "QuestionBank":
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, count, vocabulary_size = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a version {_VERSION} question bank")
+        offset = _HEADER.size
+        vocabulary = data[offset:offset + vocabulary_size].decode("utf-8").split("\n")
+        offset += vocabulary_size
+        records = []
+        for _ in range(count):
+            bucket, term_count, question_count = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            ids = struct.unpack_from(f"<{term_count}H", data, offset)
+            offset += 2 * term_count
+            records.append((EXPERIENCE_BUCKETS[bucket], [vocabulary[i] for i in ids], question_count))
+        questions = zlib.decompress(data[offset:]).decode("utf-8").split("\n") if count else []
+        bank = cls(min_similarity)
+        position = 0
+        for bucket, terms, question_count in records:
+            bank.add(terms, bucket, questions[position:position + question_count])
+            position += question_count
+        return bank
+
+
+def read_profiles(profile_paths: Sequence[str] = (), session_db: Optional[str] = None) -> Iterator[Dict]:
+    """Candidate details from JSON lines files (one candidate_info per line) and a SQLiteSessionStore file"""
+    for path in profile_paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    if session_db:
+        with sqlite3.connect(session_db) as db:
+            for (blob,) in db.execute("SELECT state FROM sessions"):
+                yield json.loads(zlib.decompress(blob))["assistant"]["info"]
+
+
+def most_common_profiles(profiles: Iterable[Dict], top: int, min_count: int = 1) -> List[Dict]:
+    """One example profile for each of the `top` most frequent (technology set, experience bucket) pairs"""
+    counts: Counter = Counter()
+    examples: Dict[Tuple[FrozenSet[str], str], Dict] = {}
+    for info in profiles:
+        terms = stack_terms(info.get("tech_stack") or {})
+        if not terms:
+            continue
+        key = (terms, experience_bucket(info.get("experience")))
+        counts[key] += 1
+        examples.setdefault(key, {"tech_stack": info["tech_stack"], "experience": info.get("experience", "0 years"),
+                                  "position": info.get("position", "Software Developer")})
+    return [examples[key] for key, count in counts.most_common(top) if count >= min_count]
+
+
+def _generate(job: Tuple[Dict, bool]) -> List[str]:
+    """Ask the model for one profile's questions; runs in a builder worker process"""
+    from gemini_client import DEFAULT_MODEL, MODEL_REGISTRY
+    from llm_backend import GEMINI_BACKEND, FakeBackend
+
+    profile, fake = job
+    prompt = PROMPT_BUILDER.questions_prompt(profile)
+    if fake:
+        backend, model = FakeBackend(mean_latency=0), None
+    else:
+        backend, model = GEMINI_BACKEND, MODEL_REGISTRY.get_model(os.getenv("GEMINI_API_KEY"), DEFAULT_MODEL)
+    try:
+        return parse_questions(asyncio.run(backend.generate(model, prompt)).text)
+    except Exception as e:
+        print(f"skipping {sorted(stack_terms(profile['tech_stack']))}: {e}", file=sys.stderr)
+        return []
+
+
+def build_bank(profiles: List[Dict], workers: int, fake: bool = False) -> QuestionBank:
+    """Generate questions for each profile on a process pool, keeping the profiles' order"""
+    bank = QuestionBank()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(_generate, [(profile, fake) for profile in profiles], chunksize=4)
+        for done, (profile, questions) in enumerate(zip(profiles, results), 1):
+            if len(questions) == 4:
+                bank.add(stack_terms(profile["tech_stack"]), experience_bucket(profile["experience"]), questions)
+            if done % 50 == 0 or done == len(profiles):
+                print(f"{done}/{len(profiles)} profiles, {len(bank)} banked, "
+                      f"{time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate technical questions for common tech stacks")
+    parser.add_argument("--profiles", action="append", default=[],
+                        help="JSON lines file of candidate details (repeatable)")
+    parser.add_argument("--session-db", help="SQLiteSessionStore file to read past candidates from")
+    parser.add_argument("--top", type=int, default=500, help="number of most frequent combinations to bank")
+    parser.add_argument("--min-count", type=int, default=2, help="skip combinations seen fewer times")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--fake-llm", action="store_true", help="generate with the offline fake backend")
+    parser.add_argument("--output", default="question_bank.bin")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    profiles = most_common_profiles(read_profiles(args.profiles, args.session_db), args.top, args.min_count)
+    if not profiles:
+        parser.error("no candidate profiles with a tech stack found")
+    bank = build_bank(profiles, args.workers, args.fake_llm)
+    bank.save(args.output)
+    print(f"wrote {len(bank)} entries to {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+# Shared by every session; TALENTSCOUT_QUESTION_BANK names a file written by this module's builder
+_path = os.getenv("TALENTSCOUT_QUESTION_BANK")
+QUESTION_BANK = QuestionBank.load(_path) if _path else QuestionBank()
+
+
+if __name__ == "__main__":
+    main()
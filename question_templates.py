@@ -0,0 +1,162 @@
+"""
+Local technical questions and replies for turns the model can't answer in time
+When a model call misses the turn's latency budget, the interview carries
+on from here instead of keeping the candidate waiting: technical questions
+come from a template library indexed by the tech stack categories the
+matcher produces and by experience bucket, and the reply names the next
+question (or detail) to answer. Everything is deterministic, so a resumed
+or retried turn asks the same question.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fast_path import NEXT_QUESTIONS
+from prompt_builder import DETAIL_LABELS
+from turn_pipeline import QUESTIONS_PER_INTERVIEW
+
+EXPERIENCE_BUCKETS = ("junior", "mid", "senior")
+GENERAL = "general"
+
+# {tech} is the candidate's technology; every (category, bucket) pair has at least one template
+_TEMPLATES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "programming_languages": {
+        "junior": ("How do you handle errors and exceptions in {tech}, and how do you decide where to catch them?",
+                   "Walk me through how you would debug a {tech} program that returns the wrong result."),
+        "mid": ("How do you structure a medium-sized {tech} codebase so that it stays easy to test?",
+                "Describe a performance problem you found in {tech} code and how you measured and fixed it."),
+        "senior": ("How does {tech} manage memory and concurrency, and how has that shaped designs you led?",
+                   "What conventions would you set for a team writing {tech}, and how would you enforce them?")
+    },
+    "web_frameworks": {
+        "junior": ("How does a request travel through a {tech} application, from routing to the response?",
+                   "How would you validate user input in a {tech} form or endpoint?"),
+        "mid": ("How do you handle authentication and authorization in a {tech} application?",
+                "A {tech} page or endpoint has become slow. How do you find out why?"),
+        "senior": ("How would you split a large {tech} application as the team grows, and what would you avoid?",
+                   "How do you roll out a breaking change to a {tech} API that other teams depend on?")
+    },
+    "mobile_frameworks": {
+        "junior": ("How do you manage state across screens in a {tech} app?",
+                   "How would you show data from an API in a {tech} app while it is still loading?"),
+        "mid": ("How do you keep a {tech} app responsive when it does heavy work or has a poor connection?",
+                "How do you test a {tech} app across different devices and OS versions?"),
+        "senior": ("How would you design offline support and data sync for a {tech} app?",
+                   "How do you plan releases and handle old app versions still in use for a {tech} app?")
+    },
+    "databases": {
+        "junior": ("How would you design tables or collections in {tech} for users and their orders?",
+                   "What is an index in {tech}, and when would you add one?"),
+        "mid": ("How do you find and fix a slow query in {tech}?",
+                "How do you change a {tech} schema without downtime for a live application?"),
+        "senior": ("How would you scale {tech} once a single instance is no longer enough?",
+                   "How do you choose consistency and isolation guarantees when using {tech}, and what do they cost?")
+    },
+    "cloud_platforms": {
+        "junior": ("Which {tech} services would you use to deploy a simple web application, and why?",
+                   "How do you keep credentials and secrets safe when deploying to {tech}?"),
+        "mid": ("How do you make a service on {tech} survive the loss of an instance or a zone?",
+                "How do you monitor cost and keep it under control on {tech}?"),
+        "senior": ("How would you design a multi-region architecture on {tech}, and what trade-offs would you accept?",
+                   "How do you structure {tech} accounts, networks and permissions for several teams?")
+    },
+    "devops_tools": {
+        "junior": ("What does {tech} do in a delivery pipeline you have worked with?",
+                   "How would you investigate a build or deployment that fails in {tech}?"),
+        "mid": ("How do you keep {tech} configuration reviewable and reproducible across environments?",
+                "How do you roll back a bad release in a setup that uses {tech}?"),
+        "senior": ("How would you introduce or migrate to {tech} across an organisation without stopping delivery?",
+                   "What guardrails would you build around {tech} to keep deployments safe and fast?")
+    },
+    "development_tools": {
+        "junior": ("How do you use {tech} day to day, and what habits help you most with it?",
+                   "Describe how {tech} fits into the way your team shares and reviews work."),
+        "mid": ("How have you used {tech} to improve your team's workflow?",
+                "What problems have you run into with {tech}, and how did you solve them?"),
+        "senior": ("How would you set up {tech} and the workflow around it for a new team?",
+                   "How do you decide whether {tech} is still the right tool as a team grows?")
+    },
+    GENERAL: {
+        "junior": ("Tell me about a project you built recently. What would you do differently now?",
+                   "How do you approach learning a new technology for a project?",
+                   "How do you test your code before you consider it done?",
+                   "Describe a bug that took you a long time to find, and how you found it."),
+        "mid": ("Describe a technical decision you made that turned out to be wrong. How did you handle it?",
+                "How do you balance delivering quickly with keeping code maintainable?",
+                "Walk me through how you would design a URL shortening service.",
+                "How do you review someone else's code, and what do you look for first?"),
+        "senior": ("Describe a system you designed end to end. Which trade-offs mattered most?",
+                   "How do you handle disagreements about technical direction within a team?",
+                   "How would you approach reducing incidents in a service that fails every week?",
+                   "How do you decide when to pay down technical debt versus ship new features?")
+    }
+}
+
+_YEARS = re.compile(r"\d+")
+
+
+def experience_years(experience: Optional[str]) -> int:
+    """Whole years in stated experience such as "5 years", 0 if none are given"""
+    match = _YEARS.search(experience or "")
+    return int(match.group()) if match else 0
+
+
+def experience_bucket(experience: Optional[str]) -> str:
+    """Bucket stated experience such as "5 years": junior up to 2 years, mid up to 5, senior beyond"""
+    years = experience_years(experience)
+    if years <= 2:
+        return "junior"
+    return "mid" if years <= 5 else "senior"
+
+
+class QuestionTemplates:
+    """Template questions indexed by (tech category, experience bucket)"""
+
+    def __init__(self, templates: Dict[str, Dict[str, Tuple[str, ...]]] = _TEMPLATES):
+        self._index: Dict[Tuple[str, str], Tuple[str, ...]] = {
+            (category, bucket): questions
+            for category, by_bucket in templates.items() for bucket, questions in by_bucket.items()
+        }
+
+    def questions(self, tech_stack: Dict[str, Sequence[str]], experience: Optional[str] = None,
+                  count: int = QUESTIONS_PER_INTERVIEW) -> List[str]:
+        """Up to `count` questions in the model's "Qn: ..." format, rotating across the candidate's categories"""
+        bucket = experience_bucket(experience)
+        categories = [category for category, techs in tech_stack.items() if techs and (category, bucket) in self._index]
+        # Deeper into each category on later rounds: its next technology and next template
+        questions: List[str] = []
+        for round_ in range(count):
+            for category in categories:
+                if len(questions) == count:
+                    break
+                techs = tech_stack[category]
+                templates = self._index[(category, bucket)]
+                if round_ < len(templates):
+                    questions.append(templates[round_].format(tech=techs[round_ % len(techs)]))
+        for template in self._index[(GENERAL, bucket)]:
+            if len(questions) == count:
+                break
+            questions.append(template)
+        return [f"Q{number}: {question}" for number, question in enumerate(questions, 1)]
+
+
+def fallback_reply(stage: str, candidate_info: Dict, tech_questions: List[str], questions_asked: int) -> str:
+    """A reply that moves the interview on from the state a turn leads to, without the model"""
+    if stage in ("greeting", "info_gathering"):
+        missing = [field for field in DETAIL_LABELS if field not in candidate_info]
+        if missing:
+            return f"Thank you! {NEXT_QUESTIONS[missing[0]]}"
+        return "Thank you for those details! Could you tell me about your technical skills next?"
+    if stage == "tech_stack":
+        return ("Thanks! Which programming languages, frameworks, databases and tools do you work with most? "
+                "Please list the ones you're comfortable with.")
+    if stage == "tech_questions" and questions_asked < len(tech_questions):
+        question = tech_questions[questions_asked].split(":", 1)[-1].strip()
+        opening = "Thank you for that answer." if questions_asked else "Thanks, that's a great stack to work with."
+        return f"{opening} Here is question {questions_asked + 1}: {question}"
+    return ("Thank you for your thoughtful answers! That completes the technical questions. "
+            "Is there anything else you'd like us to know before we wrap up?")
+
+
+# Shared by every session
+QUESTION_TEMPLATES = QuestionTemplates()
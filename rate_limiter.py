@@ -0,0 +1,223 @@
+"""
+Process-wide admission control for TalentScout model calls
+Gemini enforces quotas on requests and tokens per minute across the whole
+API key, so every session in the process draws from the same two token
+buckets. A call that the buckets can't cover right away waits in a queue
+instead of being sent and rejected: in-interview turns are admitted before
+background work such as speculative question generation, and within a
+priority, sessions take turns, so one busy session can't hold everyone
+else's replies behind its own. Background work that has waited longer than
+`promote_after` seconds is treated as interactive, so it is delayed by
+load but never starved by it.
+
+The controller is thread-safe and serves callers on any event loop: each
+waiter sleeps on its own loop until it is granted or the buckets refill.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Hashable, List, Optional
+
+from metrics import METRICS
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = ("interactive", "background")
+
+# Tokens held back for the reply, on top of the prompt's estimate
+OUTPUT_TOKEN_RESERVE = 256
+
+RATE_LIMIT_QUEUE_DEPTH = METRICS.gauge(
+    "talentscout_llm_queue_depth", "Model calls waiting for rate-limit quota", ("priority",)
+)
+RATE_LIMIT_WAIT_SECONDS = METRICS.histogram(
+    "talentscout_llm_queue_wait_seconds", "Time queued model calls waited for rate-limit quota", ("priority",)
+)
+RATE_LIMIT_ADMISSIONS = METRICS.counter(
+    "talentscout_llm_admissions_total",
+    "Model calls by the priority they asked for and outcome: immediate, queued (admitted after waiting), "
+    "promoted (background work admitted as a turn after waiting promote_after) or abandoned while queued",
+    ("priority", "outcome")
+)
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute` and holds at most one minute's worth"""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken; more than the capacity only needs a full bucket"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        # An oversized call may leave the bucket in debt, which later calls wait out
+        self._refill(now)
+        self.level -= amount
+
+
+class _Ticket:
+    __slots__ = ("flow", "priority", "tokens", "enqueued", "granted", "loop", "future")
+
+    def __init__(self, flow: Hashable, priority: int, tokens: int, enqueued: float):
+        self.flow = flow
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = enqueued
+        self.granted = False
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """Token buckets on requests and tokens per minute, with a prioritized, per-session round-robin queue"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 promote_after: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        now = clock()
+        self.requests = TokenBucket(requests_per_minute, now) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, now) if tokens_per_minute else None
+        self.promote_after = promote_after
+        self._lock = threading.Lock()
+        # One queue per priority: flows in round-robin order, each with its tickets in arrival order
+        self._queues: List["OrderedDict[Hashable, Deque[_Ticket]]"] = [OrderedDict() for _ in PRIORITY_NAMES]
+
+    @property
+    def queued(self) -> int:
+        with self._lock:
+            return sum(len(tickets) for queue in self._queues for tickets in queue.values())
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.wait_time(1, now)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def _take(self, tokens: int, now: float) -> None:
+        if self.requests is not None:
+            self.requests.take(1, now)
+        if self.tokens is not None:
+            self.tokens.take(tokens, now)
+
+    def _enqueue(self, ticket: _Ticket) -> None:
+        queue = self._queues[ticket.priority]
+        tickets = queue.get(ticket.flow)
+        if tickets is None:
+            tickets = queue[ticket.flow] = deque()
+        tickets.append(ticket)
+        RATE_LIMIT_QUEUE_DEPTH.inc(PRIORITY_NAMES[ticket.priority])
+
+    def _remove(self, ticket: _Ticket) -> None:
+        queue = self._queues[ticket.priority]
+        tickets = queue[ticket.flow]
+        tickets.remove(ticket)
+        if not tickets:
+            del queue[ticket.flow]
+        RATE_LIMIT_QUEUE_DEPTH.dec(PRIORITY_NAMES[ticket.priority])
+
+    def _promote(self, now: float) -> None:
+        """Move background tickets that have waited past promote_after into the interactive queue"""
+        background = self._queues[BACKGROUND]
+        for flow in list(background):
+            tickets = background[flow]
+            while tickets and now - tickets[0].enqueued >= self.promote_after:
+                ticket = tickets[0]
+                self._remove(ticket)
+                ticket.priority = INTERACTIVE
+                self._enqueue(ticket)
+
+    def _next(self) -> Optional[_Ticket]:
+        for queue in self._queues:
+            if queue:
+                return next(iter(queue.values()))[0]
+        return None
+
+    def _dispatch(self, now: float) -> float:
+        """Grant queued tickets in order while the buckets allow; the seconds until the next one could go"""
+        if self.promote_after is not None:
+            self._promote(now)
+        while True:
+            ticket = self._next()
+            if ticket is None:
+                return 0.0
+            wait = self._wait_time(ticket.tokens, now)
+            if wait > 0:
+                return wait
+            self._take(ticket.tokens, now)
+            self._remove(ticket)
+            # The flow goes to the back of its queue so other sessions are served before its next call
+            queue = self._queues[ticket.priority]
+            if ticket.flow in queue:
+                queue.move_to_end(ticket.flow)
+            ticket.granted = True
+            try:
+                ticket.loop.call_soon_threadsafe(_wake, ticket.future)
+            except RuntimeError:
+                pass  # the waiter's loop is closed; the ticket is spent either way
+
+    async def acquire(self, tokens: int, flow: Optional[Hashable] = None, priority: int = INTERACTIVE) -> None:
+        """Wait until a call of about `tokens` tokens fits the limits; `flow` identifies the session"""
+        label = PRIORITY_NAMES[priority]
+        with self._lock:
+            now = self.clock()
+            if not any(self._queues) and self._wait_time(tokens, now) == 0:
+                self._take(tokens, now)
+                RATE_LIMIT_ADMISSIONS.inc(label, "immediate")
+                return
+            ticket = _Ticket(object() if flow is None else flow, priority, tokens, now)
+            self._enqueue(ticket)
+        started = time.perf_counter()
+        try:
+            while True:
+                with self._lock:
+                    delay = self._dispatch(self.clock())
+                if ticket.granted:
+                    break
+                try:
+                    # Woken early when another waiter's dispatch grants this ticket
+                    await asyncio.wait_for(asyncio.shield(ticket.future), max(delay, 0.001))
+                    break
+                except asyncio.TimeoutError:
+                    continue
+        except BaseException:
+            with self._lock:
+                if not ticket.granted:
+                    self._remove(ticket)
+                    RATE_LIMIT_ADMISSIONS.inc(label, "abandoned")
+            raise
+        # Labelled by the priority asked for, so the wait of promoted background work shows as background
+        RATE_LIMIT_WAIT_SECONDS.observe(time.perf_counter() - started, label)
+        RATE_LIMIT_ADMISSIONS.inc(label, "promoted" if ticket.priority != priority else "queued")
+
+
+def _limit(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+# Shared by every session; set TALENTSCOUT_LLM_RPM and/or TALENTSCOUT_LLM_TPM to the API key's quota
+_RPM = _limit("TALENTSCOUT_LLM_RPM")
+_TPM = _limit("TALENTSCOUT_LLM_TPM")
+LLM_RATE_LIMITER = AdmissionController(_RPM, _TPM) if _RPM or _TPM else None
@@ -0,0 +1,280 @@
+"""
+Candidate-to-role matching for TalentScout
+Each candidate's extracted tech stack and each open role's requirements are
+encoded over the extraction taxonomy: candidates as packed bitsets, roles
+as a weight per technology (1 if required, PREFERRED_WEIGHT if preferred).
+A match scores the weighted share of the role's technologies the candidate
+has, and roles asking for more years of experience than the candidate
+states score 0.
+
+Single lookups go through inverted indexes (technology -> candidates, and
+technology -> roles with their weights), so only rows sharing a technology
+are touched. Whole-population rankings unpack the candidate bitsets and
+score a block of rows at a time as one matrix product, against only the
+columns that pass the experience requirement (columns are sorted by it, so
+those form a prefix).
+
+Usage: python role_matching.py --roles roles.json --candidates candidates.jsonl [--by role] [--top 5]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from question_templates import experience_years
+from tech_taxonomy import TECH_ALIASES, TECHNOLOGIES
+
+# Every canonical technology in taxonomy order; bit i of an encoded stack is TECH_VOCABULARY[i]
+TECH_VOCABULARY: Tuple[str, ...] = tuple(dict.fromkeys(tech for techs in TECHNOLOGIES.values() for tech in techs))
+PREFERRED_WEIGHT = 0.5
+# Score matrices are computed this many cells at a time, to bound memory
+BLOCK_CELLS = 4_000_000
+
+
+class Role(NamedTuple):
+    """An open role: the technologies it requires and prefers, and the minimum years of experience"""
+    role_id: str
+    title: str
+    required: Tuple[str, ...]
+    preferred: Tuple[str, ...] = ()
+    min_years: int = 0
+
+
+class Match(NamedTuple):
+    """A ranked role or candidate id and its score in (0, 1]"""
+    id: str
+    score: float
+
+
+class _Postings:
+    """Inverted index in CSR form: the rows holding each technology, with the row's weight for it"""
+
+    def __init__(self, weights: np.ndarray):
+        rows, terms = np.nonzero(weights)
+        order = np.argsort(terms, kind="stable")
+        self.rows = rows[order].astype(np.int32)
+        self.weights = weights[rows[order], terms[order]].astype(np.float32)
+        self.offsets = np.searchsorted(terms[order], np.arange(weights.shape[1] + 1))
+
+    def gather(self, terms: np.ndarray, term_weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows holding any of `terms` (once per shared term) and the weight of each occurrence"""
+        if len(terms) == 0:
+            return np.zeros(0, np.int32), np.zeros(0, np.float32)
+        rows = np.concatenate([self.rows[self.offsets[t]:self.offsets[t + 1]] for t in terms])
+        if term_weights is None:
+            weights = np.concatenate([self.weights[self.offsets[t]:self.offsets[t + 1]] for t in terms])
+        else:
+            weights = np.repeat(term_weights, self.offsets[terms + 1] - self.offsets[terms])
+        return rows, weights
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and scores of each row's k best scores, best first"""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def _rank(row_matrix: np.ndarray, row_keys: np.ndarray, column_matrix: np.ndarray, column_keys: np.ndarray,
+          k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k columns of row_matrix @ column_matrix for every row, among columns whose key is at most the
+    row's key; -1 (score 0) where a row has fewer than k matches"""
+    k = min(k, column_matrix.shape[1])
+    indices = np.full((row_matrix.shape[0], k), -1, np.int64)
+    scores = np.zeros((row_matrix.shape[0], k), np.float32)
+    # With columns sorted by key, the eligible ones for a row key are a prefix, so nothing is masked
+    column_order = np.argsort(column_keys, kind="stable")
+    sorted_keys = column_keys[column_order]
+    ordered = column_matrix[:, column_order]
+    for key in np.unique(row_keys):
+        eligible = int(np.searchsorted(sorted_keys, key, side="right"))
+        if eligible == 0:
+            continue
+        rows = np.flatnonzero(row_keys == key)
+        block = max(1, BLOCK_CELLS // eligible)
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            top_indices, top_scores = _top_k(row_matrix[chunk] @ ordered[:, :eligible], k)
+            width = top_indices.shape[1]
+            indices[chunk, :width] = np.where(top_scores > 0, column_order[top_indices], -1)
+            scores[chunk, :width] = top_scores
+    return indices, scores
+
+
+class _Compiled:
+    """Arrays for the candidates and roles added so far"""
+
+    def __init__(self, engine: "MatchingEngine"):
+        size = len(engine.vocabulary)
+        width = (size + 7) // 8
+        self.candidate_bits = np.stack(engine._candidate_bits) if engine._candidate_bits \
+            else np.zeros((0, width), np.uint8)
+        self.candidate_years = np.array(engine._candidate_years, np.int32)
+        self.candidate_postings = _Postings(np.unpackbits(self.candidate_bits, axis=1, count=size))
+        self.role_weights = np.zeros((len(engine._roles), size), np.float32)
+        for row, role in enumerate(engine._roles):
+            self.role_weights[row, engine.term_ids(role.preferred)] = engine.preferred_weight
+            self.role_weights[row, engine.term_ids(role.required)] = 1.0
+        self.role_norms = np.maximum(self.role_weights.sum(axis=1), 1e-9)
+        self.role_min_years = np.array([role.min_years for role in engine._roles], np.int32)
+        self.role_postings = _Postings(self.role_weights)
+        # Columns scaled by each role's total weight, so one product gives final scores
+        self.role_matrix = (self.role_weights / self.role_norms[:, None]).T.copy()
+
+
+class MatchingEngine:
+    """Top-k roles per candidate and top-k candidates per role over the tech taxonomy"""
+
+    def __init__(self, vocabulary: Sequence[str] = TECH_VOCABULARY, preferred_weight: float = PREFERRED_WEIGHT):
+        self.vocabulary = tuple(vocabulary)
+        self.preferred_weight = preferred_weight
+        self._term_ids = {term: index for index, term in enumerate(self.vocabulary)}
+        self.candidate_ids: List[str] = []
+        self._candidate_rows: Dict[str, int] = {}
+        self._candidate_bits: List[np.ndarray] = []
+        self._candidate_years: List[int] = []
+        self._roles: List[Role] = []
+        self._role_rows: Dict[str, int] = {}
+        self._compiled: Optional[_Compiled] = None
+
+    @property
+    def role_ids(self) -> List[str]:
+        return [role.role_id for role in self._roles]
+
+    def term_ids(self, techs: Iterable[str], strict: bool = True) -> List[int]:
+        """Bit positions of technologies, accepting aliases; unknown ones raise ValueError unless not strict"""
+        ids = []
+        for tech in techs:
+            term = TECH_ALIASES.get(tech.lower(), tech.lower())
+            if term in self._term_ids:
+                ids.append(self._term_ids[term])
+            elif strict:
+                raise ValueError(f"Unknown technology: {tech!r}")
+        return ids
+
+    def encode(self, tech_stack: Dict[str, Sequence[str]]) -> np.ndarray:
+        """A tech stack as a packed bitset over the vocabulary; technologies outside it are ignored"""
+        dense = np.zeros(len(self.vocabulary), np.uint8)
+        dense[self.term_ids((tech for techs in tech_stack.values() for tech in techs), strict=False)] = 1
+        return np.packbits(dense)
+
+    def add_candidate(self, candidate_id: str, tech_stack: Dict[str, Sequence[str]],
+                      experience: Optional[str] = None) -> None:
+        """Add a candidate, or replace one with the same id"""
+        bits, years = self.encode(tech_stack), experience_years(experience)
+        row = self._candidate_rows.get(candidate_id)
+        if row is None:
+            self._candidate_rows[candidate_id] = len(self.candidate_ids)
+            self.candidate_ids.append(candidate_id)
+            self._candidate_bits.append(bits)
+            self._candidate_years.append(years)
+        else:
+            self._candidate_bits[row] = bits
+            self._candidate_years[row] = years
+        self._compiled = None
+
+    def add_role(self, role: Role) -> None:
+        """Add a role, or replace one with the same id; its technologies must be in the vocabulary"""
+        self.term_ids(role.required)
+        self.term_ids(role.preferred)
+        row = self._role_rows.get(role.role_id)
+        if row is None:
+            self._role_rows[role.role_id] = len(self._roles)
+            self._roles.append(role)
+        else:
+            self._roles[row] = role
+        self._compiled = None
+
+    def compile(self) -> _Compiled:
+        """Build the arrays and indexes; queries do this on first use after a change"""
+        if self._compiled is None:
+            self._compiled = _Compiled(self)
+        return self._compiled
+
+    def top_roles(self, candidate_id: str, k: int = 10) -> List[Match]:
+        """The candidate's k best-matching roles with a score above zero"""
+        compiled = self.compile()
+        row = self._candidate_rows[candidate_id]
+        terms = np.flatnonzero(np.unpackbits(compiled.candidate_bits[row], count=len(self.vocabulary)))
+        rows, weights = compiled.role_postings.gather(terms)
+        scores = np.bincount(rows, weights, minlength=len(self._roles)) / compiled.role_norms
+        scores[compiled.role_min_years > compiled.candidate_years[row]] = 0
+        return self._matches(scores, k, self.role_ids)
+
+    def top_candidates(self, role_id: str, k: int = 10) -> List[Match]:
+        """The role's k best-matching candidates with a score above zero"""
+        compiled = self.compile()
+        row = self._role_rows[role_id]
+        terms = np.flatnonzero(compiled.role_weights[row])
+        rows, weights = compiled.candidate_postings.gather(terms, compiled.role_weights[row, terms])
+        scores = np.bincount(rows, weights, minlength=len(self.candidate_ids)) / compiled.role_norms[row]
+        scores[compiled.candidate_years < compiled.role_min_years[row]] = 0
+        return self._matches(scores, k, self.candidate_ids)
+
+    def top_roles_batch(self, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Role indices (into role_ids) and scores of every candidate's k best roles, one row per candidate"""
+        compiled = self.compile()
+        candidates = np.unpackbits(compiled.candidate_bits, axis=1, count=len(self.vocabulary)).astype(np.float32)
+        return _rank(candidates, compiled.candidate_years, compiled.role_matrix, compiled.role_min_years, k)
+
+    def top_candidates_batch(self, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Candidate indices (into candidate_ids) and scores of every role's k best candidates, one row per role"""
+        compiled = self.compile()
+        candidates = np.unpackbits(compiled.candidate_bits, axis=1, count=len(self.vocabulary)).astype(np.float32)
+        # A role's eligible candidates have at least its minimum years, hence the negated keys
+        return _rank(compiled.role_matrix.T, -compiled.role_min_years, candidates.T, -compiled.candidate_years, k)
+
+    @staticmethod
+    def _matches(scores: np.ndarray, k: int, ids: List[str]) -> List[Match]:
+        indices, top_scores = _top_k(scores[None, :], k)
+        return [Match(ids[index], float(score)) for index, score in zip(indices[0], top_scores[0]) if score > 0]
+
+
+def load_roles(path: str) -> List[Role]:
+    """Roles from a JSON list of {"role_id", "title", "required", "preferred", "min_years"} objects"""
+    with open(path, encoding="utf-8") as file:
+        return [Role(item["role_id"], item["title"], tuple(item["required"]), tuple(item.get("preferred", ())),
+                     int(item.get("min_years", 0))) for item in json.load(file)]
+
+
+def main():
+    from question_bank import read_profiles
+
+    parser = argparse.ArgumentParser(description="Rank open roles for candidates, or candidates for roles")
+    parser.add_argument("--roles", required=True, help="JSON list of roles")
+    parser.add_argument("--candidates", action="append", default=[],
+                        help="JSON lines file of candidate details (repeatable)")
+    parser.add_argument("--session-db", help="SQLiteSessionStore file to read interviewed candidates from")
+    parser.add_argument("--by", choices=("candidate", "role"), default="candidate")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = MatchingEngine()
+    for role in load_roles(args.roles):
+        engine.add_role(role)
+    for index, info in enumerate(read_profiles(args.candidates, args.session_db)):
+        candidate_id = str(info.get("id") or info.get("email") or index)
+        engine.add_candidate(candidate_id, info.get("tech_stack") or {}, info.get("experience"))
+
+    if args.by == "candidate":
+        ids, other_ids = engine.candidate_ids, engine.role_ids
+        indices, scores = engine.top_roles_batch(args.top)
+    else:
+        ids, other_ids = engine.role_ids, engine.candidate_ids
+        indices, scores = engine.top_candidates_batch(args.top)
+    for row, row_id in enumerate(ids):
+        matches = [{"id": other_ids[index], "score": round(float(score), 4)}
+                   for index, score in zip(indices[row], scores[row]) if index >= 0]
+        sys.stdout.write(json.dumps({"id": row_id, "matches": matches}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
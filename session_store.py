@@ -0,0 +1,316 @@
+"""
+Pluggable storage for TalentScout interview sessions
+A session is one candidate's HiringAssistant plus the chat transcript.
+Stores are async so that implementations backed by other processes or
+machines can be swapped in without changing the service that uses them.
+Sessions serialize to compressed JSON, which the SQLite store persists
+behind the live turn so interviews survive a restart.
+"""
+
+import asyncio
+import atexit
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from conversation_memory import ConversationMemory
+from hiring_assistant import HiringAssistant
+from metrics import METRICS, SIZE_BUCKETS
+
+SESSION_FLUSH_ROWS = METRICS.histogram(
+    "talentscout_session_flush_rows", "Sessions written or deleted per write-behind batch", (), SIZE_BUCKETS
+)
+SESSION_FLUSH_SECONDS = METRICS.histogram(
+    "talentscout_session_flush_seconds", "Time to write one write-behind batch to SQLite", ()
+)
+
+
+class InterviewSession:
+    """One interview: its state machine, the messages exchanged so far and the model's view of them"""
+
+    def __init__(self, session_id: str, assistant: HiringAssistant, messages: Optional[List[Dict]] = None,
+                 memory: Optional[ConversationMemory] = None):
+        self.session_id = session_id
+        self.assistant = assistant
+        self.messages = messages if messages is not None else []
+        self.memory = memory or ConversationMemory()
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        # Revision in a shared store, checked on save so concurrent replicas can't overwrite each other
+        self.version = 0
+
+    def to_state(self) -> Dict:
+        """A snapshot of the whole session as plain data, unaffected by later turns"""
+        return {
+            "id": self.session_id,
+            "created": self.created_at,
+            "updated": self.updated_at,
+            "assistant": self.assistant.to_state(),
+            "messages": list(self.messages),
+            "memory": self.memory.to_state()
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict, assistant: HiringAssistant) -> "InterviewSession":
+        """Rebuild a session saved with to_state around a fresh assistant"""
+        assistant.restore_state(state["assistant"])
+        session = cls(state["id"], assistant, state["messages"], ConversationMemory.from_state(state["memory"]))
+        session.created_at = state["created"]
+        session.updated_at = state["updated"]
+        return session
+
+
+def encode_state(state: Dict) -> bytes:
+    """Compact JSON of a session state, zlib-compressed"""
+    return zlib.compress(json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 1)
+
+
+def encode_session(session: InterviewSession) -> bytes:
+    """Snapshot and encode a session in one step"""
+    return encode_state(session.to_state())
+
+
+def decode_session(data: bytes, assistant: HiringAssistant) -> InterviewSession:
+    """Inverse of encode_session"""
+    return InterviewSession.from_state(json.loads(zlib.decompress(data)), assistant)
+
+
+class SessionStore:
+    """Interface for wherever sessions live between turns"""
+
+    async def load(self, session_id: str) -> Optional[InterviewSession]:
+        raise NotImplementedError
+
+    async def save(self, session: InterviewSession) -> None:
+        raise NotImplementedError
+
+    async def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    async def discard(self, session: InterviewSession) -> bool:
+        """Delete a loaded session unless it has been saved or deleted since; True if this call removed it"""
+        await self.delete(session.session_id)
+        return True
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    async def idle_sessions(self, before: float) -> List[str]:
+        """Ids of the sessions last saved before the Unix time `before`"""
+        raise NotImplementedError
+
+
+class InMemorySessionStore(SessionStore):
+    """Keeps live session objects in a dict; sessions are lost when the process exits"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, InterviewSession] = {}
+
+    async def load(self, session_id: str) -> Optional[InterviewSession]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    async def save(self, session: InterviewSession) -> None:
+        session.updated_at = time.time()
+        with self._lock:
+            self._sessions[session.session_id] = session
+
+    async def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    async def count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    async def idle_sessions(self, before: float) -> List[str]:
+        with self._lock:
+            return [session_id for session_id, session in self._sessions.items() if session.updated_at < before]
+
+
+class SQLiteSessionStore(SessionStore):
+    """Live sessions in memory, written to a SQLite file in WAL mode by a background thread in batches
+
+    save() only snapshots the session and queues it, so a turn never waits on encoding or disk; the
+    writer encodes and commits whatever is queued every `flush_interval` seconds, keeping the latest
+    state of each session. A hard crash loses at most that interval. Sessions not in memory (after a restart, or once evicted past
+    `max_cached`) are read back from the file on first use.
+    """
+
+    def __init__(self, path: str, assistant_factory: Callable[[], HiringAssistant] = HiringAssistant,
+                 flush_interval: float = 0.05, max_cached: int = 10000):
+        self.path = path
+        self.assistant_factory = assistant_factory
+        self.flush_interval = flush_interval
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, InterviewSession]" = OrderedDict()
+        # State snapshot per session waiting to be written; None marks a delete
+        self._pending: Dict[str, Optional[Dict]] = {}
+        # The batch the writer has taken from _pending and not yet committed
+        self._writing: Dict[str, Optional[Dict]] = {}
+        # One flush at a time, so batches reach the file in the order they were queued
+        self._flush_lock = threading.Lock()
+        # Held only for statements and transactions, never while encoding
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state BLOB NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.commit()
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_behind, name="session-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _write_behind(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every queued change in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._writing = batch
+            if not batch:
+                return
+            started = time.perf_counter()
+            now = time.time()
+            # Encode before taking the file lock, so a session being read back doesn't wait for the whole batch
+            rows = [(session_id, encode_state(state), now) for session_id, state in batch.items() if state is not None]
+            deleted = [(session_id,) for session_id, state in batch.items() if state is None]
+            try:
+                with self._db_lock:
+                    if self._db is None:
+                        return
+                    with self._db:
+                        self._db.executemany(
+                            "INSERT INTO sessions (id, state, updated) VALUES (?, ?, ?) "
+                            "ON CONFLICT(id) DO UPDATE SET state = excluded.state, updated = excluded.updated",
+                            rows
+                        )
+                        self._db.executemany("DELETE FROM sessions WHERE id = ?", deleted)
+            except sqlite3.Error:
+                # Keep the batch for the next attempt, unless a newer change has been queued since
+                with self._lock:
+                    for session_id, state in batch.items():
+                        self._pending.setdefault(session_id, state)
+                return
+            finally:
+                with self._lock:
+                    self._writing = {}
+        SESSION_FLUSH_ROWS.observe(len(batch))
+        SESSION_FLUSH_SECONDS.observe(time.perf_counter() - started)
+
+    def _queued(self) -> Dict[str, Optional[Dict]]:
+        """The latest uncommitted change per session; callers hold the lock"""
+        return {**self._writing, **self._pending}
+
+    async def load(self, session_id: str) -> Optional[InterviewSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                return session
+            queued = self._queued()
+            if session_id in queued and queued[session_id] is None:
+                return None
+        # A cold read and decode stay off the event loop
+        session = await asyncio.to_thread(self._read, session_id)
+        if session is None:
+            return None
+        with self._lock:
+            # Another caller may have resumed it meanwhile; keep a single live copy
+            session = self._sessions.setdefault(session_id, session)
+            self._evict()
+        return session
+
+    def _read(self, session_id: str) -> Optional[InterviewSession]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT state FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return None if row is None else decode_session(row[0], self.assistant_factory())
+
+    async def save(self, session: InterviewSession) -> None:
+        session.updated_at = time.time()
+        state = session.to_state()
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            self._pending[session.session_id] = state
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop the least recently used sessions that are already on disk; callers hold the lock"""
+        while len(self._sessions) > self.max_cached:
+            victim = next((session_id for session_id in self._sessions
+                           if session_id not in self._pending and session_id not in self._writing), None)
+            if victim is None:
+                return
+            del self._sessions[victim]
+
+    async def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._pending[session_id] = None
+
+    async def count(self) -> int:
+        return await asyncio.to_thread(self._count)
+
+    def _count(self) -> int:
+        """Rows on disk, adjusted for the queued saves and deletes that will add or remove one"""
+        with self._db_lock:
+            if self._db is None:
+                return 0
+            # Whether or not the writer commits meanwhile, each queued change is checked against the rows now
+            with self._lock:
+                pending = {session_id: state is not None for session_id, state in self._queued().items()}
+            count = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            session_ids = list(pending)
+            stored = set()
+            for start in range(0, len(session_ids), 500):
+                chunk = session_ids[start:start + 500]
+                stored.update(row[0] for row in self._db.execute(
+                    f"SELECT id FROM sessions WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        for session_id, saved in pending.items():
+            if saved and session_id not in stored:
+                count += 1
+            elif not saved and session_id in stored:
+                count -= 1
+        return count
+
+    async def idle_sessions(self, before: float) -> List[str]:
+        with self._lock:
+            # A session in memory or queued is judged by its latest save, not by an older row on disk
+            queued = self._queued()
+            known = set(self._sessions) | set(queued)
+            idle = [session_id for session_id, session in self._sessions.items()
+                    if session.updated_at < before and session_id not in queued]
+        stored = await asyncio.to_thread(self._stored_before, before)
+        return idle + [session_id for session_id in stored if session_id not in known]
+
+    def _stored_before(self, before: float) -> List[str]:
+        with self._db_lock:
+            if self._db is None:
+                return []
+            return [row[0] for row in self._db.execute("SELECT id FROM sessions WHERE updated < ?", (before,))]
+
+    def close(self) -> None:
+        """Stop the writer, write anything still queued and close the file"""
+        self._stop.set()
+        if self._writer.is_alive() and self._writer is not threading.current_thread():
+            self._writer.join()
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,265 @@
+"""
+Shared session state for TalentScout replicas
+Sessions are kept in a backend every replica can reach, so any process
+behind the load balancer can serve any turn, and a replica can be drained
+without dropping candidates. Each turn loads the latest state and saves
+it back with a compare-and-set on the session's version. If two replicas
+save the same session concurrently, one of them gets SessionConflict
+instead of silently overwriting the other's turn.
+
+The only thing kept locally is model work a turn left running, which
+can't be serialized: question speculation and questions that missed the
+turn SLO. The replica that started it hands it to the session's next
+turn if that turn loads the version it saved; after a turn on another
+replica it is dropped, and the interview keeps the questions it has.
+
+RedisStateBackend talks to Redis (or anything speaking its protocol) via
+the optional redis package. InMemoryStateBackend has the same semantics
+inside one process, for tests and local runs.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from hiring_assistant import HiringAssistant
+from session_store import InterviewSession, SessionStore, decode_session, encode_session
+from speculation import SPECULATOR
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # optional dependency, only needed for RedisStateBackend
+    redis_asyncio = None
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+class SessionConflict(RuntimeError):
+    """The session was saved by another request since it was loaded"""
+
+
+class StateBackend:
+    """Versioned blobs keyed by session id, with compare-and-set writes"""
+
+    async def get(self, session_id: str) -> Optional[Tuple[int, bytes]]:
+        """The session's version and data, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    async def put(self, session_id: str, data: bytes, expected_version: int) -> bool:
+        """Store data as version expected_version + 1 if the stored version is still expected_version
+        (0 for a session that doesn't exist yet); False if it has moved on"""
+        raise NotImplementedError
+
+    async def delete(self, session_id: str, expected_version: Optional[int] = None) -> bool:
+        """Remove the session, only if its stored version is still expected_version when one is given;
+        False if it wasn't removed"""
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    async def idle(self, before: float) -> List[str]:
+        """Ids of the sessions last written before the Unix time `before`"""
+        raise NotImplementedError
+
+
+class InMemoryStateBackend(StateBackend):
+    """Process-local backend with the same versioning and expiry as Redis; replicas in one process share it"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._records: Dict[str, Tuple[int, bytes, float]] = {}
+
+    def _live(self, session_id: str) -> Optional[Tuple[int, bytes, float]]:
+        record = self._records.get(session_id)
+        if record is not None and record[2] <= time.time():
+            del self._records[session_id]
+            return None
+        return record
+
+    async def get(self, session_id: str) -> Optional[Tuple[int, bytes]]:
+        with self._lock:
+            record = self._live(session_id)
+        return None if record is None else (record[0], record[1])
+
+    async def put(self, session_id: str, data: bytes, expected_version: int) -> bool:
+        with self._lock:
+            record = self._live(session_id)
+            if (record[0] if record is not None else 0) != expected_version:
+                return False
+            self._records[session_id] = (expected_version + 1, data, time.time() + self.ttl_seconds)
+            return True
+
+    async def delete(self, session_id: str, expected_version: Optional[int] = None) -> bool:
+        with self._lock:
+            record = self._live(session_id)
+            if record is None or (expected_version is not None and record[0] != expected_version):
+                return False
+            del self._records[session_id]
+            return True
+
+    async def count(self) -> int:
+        with self._lock:
+            now = time.time()
+            return sum(1 for record in self._records.values() if record[2] > now)
+
+    async def idle(self, before: float) -> List[str]:
+        with self._lock:
+            now = time.time()
+            return [session_id for session_id, (_, _, expires) in self._records.items()
+                    if now < expires < before + self.ttl_seconds]
+
+
+# KEYS: session hash, expiry index. ARGV: expected version, data, ttl seconds, expiry timestamp, session id
+_PUT_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'v')
+if (current or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'v', tonumber(ARGV[1]) + 1, 'state', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[4], ARGV[5])
+return 1
+"""
+
+# KEYS: session hash, expiry index. ARGV: expected version, session id
+_DELETE_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'v') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[2])
+return 1
+"""
+
+
+class RedisStateBackend(StateBackend):
+    """Sessions as Redis hashes {v, state} with a TTL; the compare-and-set runs as one Lua script"""
+
+    def __init__(self, url: str, prefix: str = "talentscout:", ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        if redis_asyncio is None:
+            raise RuntimeError("RedisStateBackend needs the redis package: pip install redis")
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._client = redis_asyncio.from_url(url)
+        self._put = self._client.register_script(_PUT_SCRIPT)
+        self._delete = self._client.register_script(_DELETE_SCRIPT)
+        # Expiry time per session id, so count() doesn't have to scan the keyspace
+        self._index = f"{prefix}sessions"
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}"
+
+    async def get(self, session_id: str) -> Optional[Tuple[int, bytes]]:
+        version, data = await self._client.hmget(self._key(session_id), "v", "state")
+        return None if version is None else (int(version), data)
+
+    async def put(self, session_id: str, data: bytes, expected_version: int) -> bool:
+        expires = time.time() + self.ttl_seconds
+        stored = await self._put(keys=[self._key(session_id), self._index],
+                                 args=[expected_version, data, int(self.ttl_seconds), expires, session_id])
+        return bool(stored)
+
+    async def delete(self, session_id: str, expected_version: Optional[int] = None) -> bool:
+        if expected_version is not None:
+            return bool(await self._delete(keys=[self._key(session_id), self._index],
+                                           args=[expected_version, session_id]))
+        async with self._client.pipeline(transaction=True) as pipe:
+            deleted, _ = await pipe.delete(self._key(session_id)).zrem(self._index, session_id).execute()
+        return bool(deleted)
+
+    async def count(self) -> int:
+        async with self._client.pipeline(transaction=True) as pipe:
+            _, count = await pipe.zremrangebyscore(self._index, "-inf", time.time()).zcard(self._index).execute()
+        return count
+
+    async def idle(self, before: float) -> List[str]:
+        # Each entry's score is its last write plus the TTL; entries already past it are gone from Redis
+        session_ids = await self._client.zrangebyscore(self._index, time.time(), before + self.ttl_seconds)
+        return [session_id.decode() for session_id in session_ids]
+
+
+class SharedSessionStore(SessionStore):
+    """Loads every session from a shared backend and saves it back only if no other replica has meanwhile"""
+
+    def __init__(self, backend: StateBackend, assistant_factory: Callable[[], HiringAssistant] = HiringAssistant,
+                 max_running: int = 10000):
+        self.backend = backend
+        self.assistant_factory = assistant_factory
+        self.max_running = max_running
+        self._lock = threading.Lock()
+        # Session id -> (version saved, question speculation, late questions) left running by this replica
+        self._running: "OrderedDict[str, Tuple[int, object, object]]" = OrderedDict()
+
+    async def load(self, session_id: str) -> Optional[InterviewSession]:
+        record = await self.backend.get(session_id)
+        if record is None:
+            return None
+        version, data = record
+        session = decode_session(data, self.assistant_factory())
+        session.version = version
+        # One queue per interview in the rate limiter, whichever assistant object serves the turn
+        session.assistant.flow = session_id
+        with self._lock:
+            running = self._running.get(session_id)
+            if running is not None and running[0] != version:
+                del self._running[session_id]
+        if running is not None:
+            if running[0] == version:
+                session.assistant.question_speculation, session.assistant.late_questions = running[1:]
+            else:
+                _stop(running)
+        return session
+
+    async def save(self, session: InterviewSession) -> None:
+        session.updated_at = time.time()
+        if not await self.backend.put(session.session_id, encode_session(session), session.version):
+            raise SessionConflict(session.session_id)
+        session.version += 1
+        assistant = session.assistant
+        evicted = []
+        with self._lock:
+            if assistant.question_speculation is None and assistant.late_questions is None:
+                self._running.pop(session.session_id, None)
+            else:
+                self._running[session.session_id] = (session.version, assistant.question_speculation,
+                                                     assistant.late_questions)
+                self._running.move_to_end(session.session_id)
+                while len(self._running) > self.max_running:
+                    evicted.append(self._running.popitem(last=False)[1])
+        for running in evicted:
+            _stop(running)
+
+    async def delete(self, session_id: str) -> None:
+        await self.backend.delete(session_id)
+        self._forget(session_id)
+
+    async def discard(self, session: InterviewSession) -> bool:
+        # Every replica sweeps idle sessions; the version check lets only one of them end each
+        if not await self.backend.delete(session.session_id, session.version):
+            return False
+        self._forget(session.session_id)
+        return True
+
+    def _forget(self, session_id: str) -> None:
+        with self._lock:
+            running = self._running.pop(session_id, None)
+        if running is not None:
+            _stop(running)
+
+    async def count(self) -> int:
+        return await self.backend.count()
+
+    async def idle_sessions(self, before: float) -> List[str]:
+        return await self.backend.idle(before)
+
+
+def _stop(running: Tuple[int, object, object]) -> None:
+    """Cancel the work a turn left running for a session that has moved on without it"""
+    _, speculation, late_questions = running
+    if speculation is not None and not speculation.future.done():
+        SPECULATOR.cancel(speculation)
+    if late_questions is not None:
+        late_questions.cancel()
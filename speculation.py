@@ -0,0 +1,98 @@
+"""
+Speculative background work for TalentScout interviews
+Model calls whose inputs are already known (such as the technical
+questions, once the candidate's tech stack is extracted) are started early
+and joined when the interview needs them. Each job carries the key it was
+computed from, so a caller whose inputs have since changed cancels it
+instead of using a stale result. The number of jobs in flight is bounded so
+speculation cannot crowd out live turns; past the bound, work is simply not
+started early.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional
+
+from llm_backend import BACKGROUND_LOOP
+from metrics import METRICS
+
+SPECULATION_OUTCOMES = METRICS.counter(
+    "talentscout_speculation_total",
+    "Speculative jobs by outcome: started, used, discarded (inputs changed), skipped (pool full) or failed",
+    ("site", "outcome")
+)
+
+
+class SpeculativeJob:
+    """A started job and the key of the inputs it was computed from"""
+
+    def __init__(self, site: str, key: str, future: Future):
+        self.site = site
+        self.key = key
+        self.future = future
+
+
+class Speculator:
+    """Runs speculative coroutines on the caller's event loop, or the background loop, up to a bound"""
+
+    def __init__(self, max_in_flight: int = 8):
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, site: str, key: str, factory: Callable[[], Awaitable[object]]) -> Optional[SpeculativeJob]:
+        """Start factory() in the background, or return None when the pool is full"""
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                SPECULATION_OUTCOMES.inc(site, "skipped")
+                return None
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = BACKGROUND_LOOP.loop
+        future = asyncio.run_coroutine_threadsafe(factory(), loop)
+        future.add_done_callback(self._release)
+        SPECULATION_OUTCOMES.inc(site, "started")
+        return SpeculativeJob(site, key, future)
+
+    async def join(self, job: Optional[SpeculativeJob], key: str):
+        """The job's result if it was computed from `key`; None if it is stale, missing or failed"""
+        if job is None:
+            return None
+        if job.key != key:
+            self.cancel(job)
+            return None
+        try:
+            result = await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            if job.future.cancelled():
+                return None
+            raise
+        except Exception:
+            SPECULATION_OUTCOMES.inc(job.site, "failed")
+            return None
+        SPECULATION_OUTCOMES.inc(job.site, "used")
+        return result
+
+    @staticmethod
+    def cancel(job: Optional[SpeculativeJob]) -> None:
+        """Abandon a job whose inputs have changed"""
+        if job is not None:
+            job.future.cancel()
+            SPECULATION_OUTCOMES.inc(job.site, "discarded")
+
+
+# Shared by every session; TALENTSCOUT_SPECULATION_LIMIT bounds the jobs running ahead of need
+SPECULATOR = Speculator(max_in_flight=int(os.getenv("TALENTSCOUT_SPECULATION_LIMIT", "8")))
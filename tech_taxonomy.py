@@ -0,0 +1,170 @@
+"""
+Technology taxonomy and compiled tech stack matcher for TalentScout
+The taxonomy is compiled once at import into a token trie, so a candidate
+message is scanned in a single pass regardless of how many terms it holds.
+"""
+
+import re
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+# Canonical technologies per category, in display order
+TECHNOLOGIES: Dict[str, Tuple[str, ...]] = {
+    "programming_languages": (
+        "python", "java", "javascript", "typescript", "c++", "c#", "go", "rust",
+        "php", "ruby", "kotlin", "swift", "scala", "r", "matlab", "perl", "dart"
+    ),
+    "web_frameworks": (
+        "react", "angular", "vue", "django", "flask", "spring", "express",
+        "laravel", "rails", "asp.net", "fastapi", "nextjs", "nuxt", "svelte"
+    ),
+    "mobile_frameworks": (
+        "react native", "flutter", "ionic", "xamarin", "cordova", "native android", "native ios"
+    ),
+    "databases": (
+        "mysql", "postgresql", "mongodb", "redis", "sqlite", "oracle",
+        "sql server", "cassandra", "elasticsearch", "firebase", "dynamodb"
+    ),
+    "cloud_platforms": (
+        "aws", "azure", "gcp", "google cloud", "heroku", "digitalocean",
+        "linode", "alibaba cloud", "oracle cloud"
+    ),
+    "devops_tools": (
+        "docker", "kubernetes", "jenkins", "gitlab ci", "github actions",
+        "terraform", "ansible", "chef", "puppet", "vagrant"
+    ),
+    "development_tools": (
+        "git", "svn", "jira", "confluence", "slack", "teams", "vscode",
+        "intellij", "eclipse", "postman", "swagger"
+    )
+}
+
+# Common spellings and abbreviations mapped to their canonical term
+TECH_ALIASES: Dict[str, str] = {
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "js": "javascript",
+    "ts": "typescript",
+    "golang": "go",
+    "cpp": "c++",
+    "csharp": "c#",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "next.js": "nextjs",
+    "nuxt.js": "nuxt",
+    "express.js": "express",
+    "expressjs": "express",
+    "ruby on rails": "rails",
+    "mongo": "mongodb",
+    "mssql": "sql server",
+    "amazon web services": "aws",
+    "google cloud platform": "gcp",
+    "vs code": "vscode",
+    "visual studio code": "vscode",
+    "gitlab-ci": "gitlab ci"
+}
+
+# Tokens are runs of letters/digits plus the symbols used in names like c++
+# and c#. Every other ASCII character, dots included, separates tokens, so
+# "asp.net" and "next.js" are stored as two-token phrases. translate() keeps
+# string positions intact, so match offsets map straight back to the input.
+_TOKEN_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789+#")
+_SEPARATORS = {code: " " for code in range(128) if chr(code) not in _TOKEN_CHARS}
+_TOKEN = re.compile(r"\S+")
+
+_TERMINAL = ""
+
+
+class TechMatch(NamedTuple):
+    """A technology found in the input, with character offsets of the matched text"""
+    category: str
+    term: str
+    start: int
+    end: int
+
+
+def _tokenize(text: str) -> List[str]:
+    return text.lower().translate(_SEPARATORS).split()
+
+
+class TechMatcher:
+    """Longest-match token trie over a technology taxonomy and its aliases"""
+
+    def __init__(self, taxonomy: Mapping[str, Iterable[str]], aliases: Optional[Mapping[str, str]] = None):
+        self.categories = list(taxonomy)
+        self.term_count = 0
+        self._trie: Dict[str, dict] = {}
+        self._max_depth = 0
+
+        term_categories = {}
+        for category, terms in taxonomy.items():
+            for term in terms:
+                term_categories[term] = category
+                self._insert(term, (category, term))
+
+        for alias, canonical in (aliases or {}).items():
+            if canonical not in term_categories:
+                raise ValueError(f"Alias '{alias}' points to unknown technology '{canonical}'")
+            self._insert(alias, (term_categories[canonical], canonical))
+
+    def _insert(self, phrase: str, target: Tuple[str, str]) -> None:
+        tokens = _tokenize(phrase)
+        if not tokens:
+            raise ValueError(f"Technology term '{phrase}' has no matchable tokens")
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _TERMINAL not in node:
+            self.term_count += 1
+        node[_TERMINAL] = target
+        self._max_depth = max(self._max_depth, len(tokens))
+
+    def find_all(self, text: str) -> List[TechMatch]:
+        """Scan the text once and return every technology mention, longest match first"""
+        # Each token keeps its own span, so a match never resolves to an earlier word that contains it
+        spans = list(_TOKEN.finditer(text.lower().translate(_SEPARATORS)))
+        tokens = [span.group() for span in spans]
+        trie = self._trie
+        max_depth = self._max_depth
+        matches = []
+        i = 0
+        n = len(tokens)
+        while i < n:
+            node = trie.get(tokens[i])
+            if node is None:
+                # Most tokens are ordinary words, so bail out on the first lookup
+                i += 1
+                continue
+            best = None
+            j = i + 1
+            if _TERMINAL in node:
+                best = (j, node[_TERMINAL])
+            while j < n and j - i < max_depth:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if _TERMINAL in node:
+                    best = (j, node[_TERMINAL])
+            if best is None:
+                i += 1
+                continue
+            end_index, (category, term) = best
+            matches.append(TechMatch(category, term, spans[i].start(), spans[end_index - 1].end()))
+            i = end_index
+        return matches
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """Group matched technologies by category, in taxonomy order and without duplicates"""
+        found: Dict[str, List[str]] = {}
+        for match in self.find_all(text):
+            terms = found.setdefault(match.category, [])
+            if match.term not in terms:
+                terms.append(match.term)
+        return {category: found[category] for category in self.categories if category in found}
+
+
+# Compiled once at import and shared by every session
+TECH_MATCHER = TechMatcher(TECHNOLOGIES, TECH_ALIASES)
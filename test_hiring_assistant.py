@@ -7,6 +7,7 @@ import unittest
 import sys
 import os
 import re
+import time
 from unittest.mock import Mock, patch, MagicMock
 
 # Add the main app directory to path
@@ -28,7 +29,15 @@ class TestHiringAssistant(unittest.TestCase):
         self.mock_model.generate_content.return_value = MagicMock(text="Mocked response")
         self.mock_model_class.return_value = self.mock_model
 
-        from app import HiringAssistant
+        # Models are shared process-wide, so start each test from an empty registry
+        from gemini_client import MODEL_REGISTRY
+        MODEL_REGISTRY.clear()
+        self.addCleanup(MODEL_REGISTRY.clear)
+        from llm_cache import LLM_CACHE
+        LLM_CACHE.clear()
+        self.addCleanup(LLM_CACHE.clear)
+
+        from hiring_assistant import HiringAssistant
         self.HiringAssistant = HiringAssistant
         self.assistant = HiringAssistant("test_api_key")
 
@@ -40,6 +49,81 @@ class TestHiringAssistant(unittest.TestCase):
         self.assertEqual(self.assistant.questions_asked, 0)
         self.assertIsInstance(self.assistant.tech_questions, list)
 
+    def test_sessions_share_model(self):
+        """Test sessions reuse one configured client and model"""
+        other = self.HiringAssistant("test_api_key")
+        self.assertIs(other.model, self.assistant.model)
+        self.mock_configure.assert_called_once_with(api_key="test_api_key")
+        self.mock_model_class.assert_called_once_with("gemini-2.0-flash")
+        other.candidate_info["name"] = "Jane Smith"
+        self.assertEqual(self.assistant.candidate_info, {})
+
+    def test_system_prompt_sent_as_instruction(self):
+        """Test the system prompt of the stage the turn moves to is bound to the model, not sent each turn"""
+        self.assistant.generate_response("Hello!", "user: Hello!")
+        system_prompt = self.assistant.get_system_prompt()
+        self.assertIn("INFO_GATHERING", system_prompt.split("NEXT STAGE")[0])
+        self.mock_model_class.assert_any_call("gemini-2.0-flash", system_instruction=system_prompt)
+        turn_prompt = self.mock_model.generate_content.call_args.args[0]
+        self.assertNotIn("CORE OBJECTIVES", turn_prompt)
+        self.assertIn('CANDIDATE\'S LATEST RESPONSE: "Hello!"', turn_prompt)
+
+    def test_context_cache_registered_once(self):
+        """Test a large enough system prompt is registered through context caching once per stage"""
+        import gemini_client
+        from gemini_client import MODEL_REGISTRY
+        self.assistant.conversation_stage = "info_gathering"
+        with patch.object(gemini_client, "CONTEXT_CACHE_MIN_TOKENS", 1), \
+                patch("google.generativeai.caching.CachedContent.create") as mock_create:
+            self.assistant.generate_response("My name is Jane Smith, how long will this take?", "")
+            for future in list(MODEL_REGISTRY._refreshing.values()):
+                future.result()
+            self.assistant.generate_response("Can I share my email later?", "")
+        mock_create.assert_called_once()
+        self.mock_model_class.from_cached_content.assert_called_once_with(mock_create.return_value)
+        self.assertIs(self.assistant.get_turn_model(), self.mock_model_class.from_cached_content.return_value)
+
+    def test_context_cache_created_in_background_and_retried(self):
+        """Test a slow or failing cache create never holds up a turn, and a failure is retried later"""
+        import gemini_client
+        from gemini_client import MODEL_REGISTRY
+        system_prompt = self.assistant.get_system_prompt()
+
+        def slow_failure(**kwargs):
+            time.sleep(0.3)
+            raise RuntimeError("caching unavailable")
+        with patch.object(gemini_client, "CONTEXT_CACHE_MIN_TOKENS", 1), \
+                patch("google.generativeai.caching.CachedContent.create", side_effect=slow_failure) as mock_create:
+            started = time.perf_counter()
+            first = MODEL_REGISTRY.get_prompt_model("test_api_key", system_prompt)
+            self.assertLess(time.perf_counter() - started, 0.1)
+            self.assertFalse(first.cached)
+            for future in list(MODEL_REGISTRY._refreshing.values()):
+                future.result()
+            fallback = MODEL_REGISTRY.get_prompt_model("test_api_key", system_prompt)
+            self.assertFalse(fallback.cached)
+            self.assertAlmostEqual(fallback.expires_at - time.time(), gemini_client.CONTEXT_CACHE_RETRY.total_seconds(),
+                                   delta=5)
+            with patch("time.time", return_value=fallback.expires_at + 1):
+                MODEL_REGISTRY.get_prompt_model("test_api_key", system_prompt)
+            for future in list(MODEL_REGISTRY._refreshing.values()):
+                future.result()
+        self.assertEqual(mock_create.call_count, 2)
+
+    def test_token_usage_counters(self):
+        """Test cached and uncached input tokens are counted per turn"""
+        from gemini_client import MODEL_REGISTRY
+        before = MODEL_REGISTRY.token_usage.snapshot()
+        self.mock_model.generate_content.return_value = MagicMock(
+            text="Mocked response",
+            usage_metadata=MagicMock(prompt_token_count=900, cached_content_token_count=700, candidates_token_count=40)
+        )
+        self.assistant.generate_response("Hello!", "user: Hello!")
+        self.assertEqual(self.assistant.last_token_usage, {"cached": 700, "uncached": 200, "output": 40})
+        after = MODEL_REGISTRY.token_usage.snapshot()
+        self.assertEqual(after["cached_tokens"] - before["cached_tokens"], 700)
+        self.assertEqual(after["uncached_tokens"] - before["uncached_tokens"], 200)
+
     def test_extract_candidate_info_email(self):
         """Test email extraction from user input"""
         self.assistant.extract_candidate_info("My email is john.doe@example.com")
@@ -99,6 +183,28 @@ class TestHiringAssistant(unittest.TestCase):
         self.assertFalse(self.assistant.conversation_active)
         self.assertIn("Thank you for completing the initial screening interview", response)
 
+    def test_generate_response_stream(self):
+        """Test streamed chunks are yielded in order and processed once assembled"""
+        self.assistant.conversation_stage = "greeting"
+        self.mock_model.generate_content.return_value = iter([
+            MagicMock(text="Nice to "), MagicMock(text="meet you!")
+        ])
+        chunks = list(self.assistant.generate_response_stream("Hello!", "user: Hello!"))
+        self.assertEqual(chunks, ["Nice to ", "meet you!"])
+        self.assertEqual(self.assistant.conversation_stage, "info_gathering")
+        self.assertEqual(self.mock_model.generate_content.call_args.kwargs["stream"], True)
+        timing = self.assistant.last_turn_timing
+        self.assertLessEqual(timing["time_to_first_token"], timing["total"])
+
+    def test_generate_response_stream_error(self):
+        """Test a failed stream yields the fallback message without advancing the stage"""
+        self.assistant.conversation_stage = "greeting"
+        self.mock_model.generate_content.side_effect = RuntimeError("boom")
+        chunks = list(self.assistant.generate_response_stream("Hello!", "user: Hello!"))
+        self.assertEqual(len(chunks), 1)
+        self.assertIn("technical difficulties", chunks[0])
+        self.assertEqual(self.assistant.conversation_stage, "greeting")
+
     def test_generate_technical_questions(self):
         """Test technical question generation logic"""
         self.assistant.candidate_info["tech_stack"] = {
@@ -113,6 +219,19 @@ class TestHiringAssistant(unittest.TestCase):
         self.assertEqual(len(questions), 4)
         self.assertTrue(all(q.startswith("Q") for q in questions))
 
+    def test_technical_questions_memoized(self):
+        """Test identical question prompts are served from the LLM cache"""
+        from llm_cache import LLM_CACHE
+        self.assistant.candidate_info["tech_stack"] = {"programming_languages": ["python"]}
+        self.mock_model.generate_content.return_value = MagicMock(
+            text="Q1: A?\nQ2: B?\nQ3: C?\nQ4: D?"
+        )
+        first = self.assistant.generate_technical_questions()
+        second = self.assistant.generate_technical_questions()
+        self.assertEqual(first, second)
+        self.assertEqual(self.mock_model.generate_content.call_count, 1)
+        self.assertEqual(LLM_CACHE.stats()["generate_technical_questions"]["hits"], 1)
+
     def test_get_candidate_summary(self):
         """Test candidate summary generation"""
         self.assistant.candidate_info = {
@@ -130,5 +249,1429 @@ class TestHiringAssistant(unittest.TestCase):
         self.assertIn("Lead Engineer", summary)
         self.assertIn("technologies", summary)
 
+class TestTechMatcher(unittest.TestCase):
+    """Test cases for the compiled tech stack matcher"""
+
+    def setUp(self):
+        from tech_taxonomy import TECH_MATCHER
+        self.matcher = TECH_MATCHER
+
+    def test_word_boundaries(self):
+        """Test short terms no longer match inside ordinary words"""
+        found = self.matcher.extract("I'm good at going over code reviews")
+        self.assertEqual(found, {})
+
+    def test_aliases(self):
+        """Test aliases are normalized to their canonical technology"""
+        found = self.matcher.extract("Deployed on k8s with postgres and js tooling")
+        self.assertEqual(found["devops_tools"], ["kubernetes"])
+        self.assertEqual(found["databases"], ["postgresql"])
+        self.assertEqual(found["programming_languages"], ["javascript"])
+
+    def test_multi_word_longest_match(self):
+        """Test multi-word and dotted terms win over their prefixes"""
+        found = self.matcher.extract("Built apps with React Native and ASP.NET")
+        self.assertEqual(found["mobile_frameworks"], ["react native"])
+        self.assertEqual(found["web_frameworks"], ["asp.net"])
+
+    def test_match_offsets(self):
+        """Test matches carry offsets into the original text"""
+        text = "Mostly C++ and Go"
+        matches = self.matcher.find_all(text)
+        self.assertEqual([text[m.start:m.end] for m in matches], ["C++", "Go"])
+
+    def test_match_offsets_skip_earlier_words_containing_the_term(self):
+        """Test a match's offsets point at the matched word, not an earlier word that contains it"""
+        for text, expected in (("pythonic code in python", (17, 23)), ("I love going to Go meetups", (16, 18))):
+            matches = self.matcher.find_all(text)
+            self.assertEqual([(m.start, m.end) for m in matches], [expected])
+
+class TestExtractionEngine(unittest.TestCase):
+    """Test cases for the single-pass candidate extraction engine"""
+
+    def setUp(self):
+        from candidate_extraction import EXTRACTION_ENGINE
+        self.engine = EXTRACTION_ENGINE
+
+    def test_scan_returns_spans_with_offsets(self):
+        """Test every field found in one message carries offsets into it"""
+        text = "My name is Jane Smith, email jane@example.com, 6 years of experience"
+        spans = self.engine.scan(text)
+        self.assertEqual(spans["name"].value, "Jane Smith")
+        self.assertEqual(text[spans["name"].start:spans["name"].end], "Jane Smith")
+        self.assertEqual(text[spans["email"].start:spans["email"].end], "jane@example.com")
+        self.assertEqual(spans["experience"].value, "6 years")
+
+    def test_location_skips_places_with_digits(self):
+        """Test a preposition followed by an address falls through to the next one"""
+        spans = self.engine.scan("I'm located at 221 Baker Street in London")
+        self.assertEqual(spans["location"].value, "London")
+
+    def test_location_requires_cue(self):
+        """Test prepositions alone do not produce a location"""
+        spans = self.engine.scan("I worked in Python at scale")
+        self.assertNotIn("location", spans)
+
+    def test_build_profile_keeps_first_name(self):
+        """Test a batch of messages folds into one profile without overwriting the name"""
+        profile = self.engine.build_profile([
+            "My name is Jane Smith",
+            "I'm based in Berlin, Germany",
+            "Ask Peter Parker for a reference, reach me at jane@example.com",
+        ])
+        self.assertEqual(profile["name"], "Jane Smith")
+        self.assertEqual(profile["location"], "Berlin, Germany")
+        self.assertEqual(profile["email"], "jane@example.com")
+        self.assertEqual(len(self.engine.scan_batch(["a", "b"])), 2)
+
+class TestLLMCache(unittest.TestCase):
+    """Test cases for the memoizing LLM call layer"""
+
+    def setUp(self):
+        import asyncio
+        from llm_backend import FakeBackend
+        from llm_cache import LLMCache
+        self.asyncio = asyncio
+        self.LLMCache = LLMCache
+        self.backend = FakeBackend(mean_latency=0, responder=lambda prompt: f"reply to {prompt.strip()}")
+
+    def generate(self, cache, model_id, prompt, site):
+        """One memoized call through the cache, answered by the fake backend on a miss"""
+        return self.asyncio.run(cache.agenerate(lambda text: self.backend.generate(None, text), model_id, prompt, site))
+
+    def test_whitespace_normalized_key(self):
+        """Test prompts differing only in indentation share one entry"""
+        cache = self.LLMCache()
+        self.generate(cache, "gemini", "Generate   questions\n    for python", "site")
+        result = self.generate(cache, "gemini", "Generate questions for python", "site")
+        self.assertTrue(result.cached)
+        self.assertEqual(self.backend.calls, 1)
+        other_model = self.generate(cache, "gemini-pro", "Generate questions for python", "site")
+        self.assertFalse(other_model.cached)
+
+    def test_lru_eviction_and_stats(self):
+        """Test the least recently used entry is evicted and counted against the site that stored it"""
+        cache = self.LLMCache(max_entries=2)
+        self.generate(cache, "gemini", "a", "questions")
+        self.generate(cache, "gemini", "b", "questions")
+        self.generate(cache, "gemini", "a", "questions")
+        self.generate(cache, "gemini", "c", "turns")
+        self.assertFalse(self.generate(cache, "gemini", "b", "turns").cached)
+        self.assertEqual(cache.stats()["questions"], {"hits": 1, "misses": 2, "evictions": 2})
+        self.assertEqual(cache.stats()["turns"], {"hits": 0, "misses": 2, "evictions": 0})
+
+    def test_ttl_expiry(self):
+        """Test entries older than the TTL are treated as misses"""
+        cache = self.LLMCache(ttl_seconds=60)
+        with patch("llm_cache.time.time", return_value=1000.0):
+            self.generate(cache, "gemini", "a", "site")
+        with patch("llm_cache.time.time", return_value=1061.0):
+            self.assertFalse(self.generate(cache, "gemini", "a", "site").cached)
+
+    def test_disk_tier_survives_restart(self):
+        """Test responses persisted to SQLite are served by a fresh cache"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "llm_cache.sqlite")
+            first = self.LLMCache(disk_path=path)
+            self.generate(first, "gemini", "a", "site")
+            first.close()
+            restarted = self.LLMCache(disk_path=path)
+            result = self.generate(restarted, "gemini", "a", "site")
+            restarted.close()
+            self.assertTrue(result.cached)
+            self.assertEqual(result.text, "reply to a")
+
+    def test_disk_tier_writes_behind_and_expires(self):
+        """Test puts are committed by the writer, served before that, and pruned once past the TTL"""
+        import sqlite3
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "llm_cache.sqlite")
+            cache = self.LLMCache(max_entries=1, ttl_seconds=60, disk_path=path, flush_interval=60)
+            with patch("llm_cache.time.time", return_value=1000.0):
+                self.generate(cache, "gemini", "a", "site")
+                self.generate(cache, "gemini", "b", "site")
+                with sqlite3.connect(path) as db:
+                    self.assertEqual(db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0], 0)
+                # Evicted from memory and not yet on disk, but still served from the write queue
+                self.assertTrue(self.generate(cache, "gemini", "a", "site").cached)
+                cache.flush()
+            with sqlite3.connect(path) as db:
+                self.assertEqual(db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0], 2)
+            with patch("llm_cache.time.time", return_value=1061.0):
+                cache.prune()
+            cache.close()
+            with sqlite3.connect(path) as db:
+                self.assertEqual(db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0], 0)
+
+class TestLLMBackend(unittest.TestCase):
+    """Test cases for the async LLM backend policies, using the offline fake backend"""
+
+    def setUp(self):
+        import asyncio
+        import llm_backend
+        self.asyncio = asyncio
+        self.llm_backend = llm_backend
+        self.fast_retry = llm_backend.RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=0.001)
+
+    def test_retries_retryable_errors(self):
+        """Test transient failures are retried until a call succeeds"""
+        backend = self.llm_backend.FakeBackend(mean_latency=0, seed=7, retry=self.fast_retry)
+        failures = iter([True, True, False])
+        original = backend._maybe_fail
+
+        def flaky():
+            if next(failures):
+                raise self.llm_backend.RetryableLLMError("flaky")
+            original()
+        backend._maybe_fail = flaky
+        response = self.asyncio.run(backend.generate(None, "hello"))
+        self.assertIn("background", response.text)
+        self.assertEqual(backend.calls, 3)
+
+    def test_non_retryable_errors_fail_fast(self):
+        """Test non-retryable failures are raised on the first attempt"""
+        backend = self.llm_backend.FakeBackend(mean_latency=0, fatal_error_rate=1.0, retry=self.fast_retry)
+        with self.assertRaises(self.llm_backend.LLMError):
+            self.asyncio.run(backend.generate(None, "hello"))
+        self.assertEqual(backend.calls, 1)
+
+    def test_deadline(self):
+        """Test a call slower than its deadline raises LLMTimeoutError"""
+        backend = self.llm_backend.FakeBackend(mean_latency=1.0, retry=self.fast_retry)
+        with self.assertRaises(self.llm_backend.LLMTimeoutError):
+            self.asyncio.run(backend.generate(None, "hello", timeout=0.05))
+
+    def test_hedged_request_beats_slow_attempt(self):
+        """Test a hedged copy answers when the first attempt is stuck in the tail"""
+        latencies = iter([2.0, 0.0])
+        backend = self.llm_backend.FakeBackend(hedge_after=0.02, retry=self.fast_retry)
+        backend.sample_latency = lambda: next(latencies)
+        started = time.perf_counter()
+        self.asyncio.run(backend.generate(None, "hello"))
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(backend.calls, 2)
+
+    def test_stream_retries_before_first_chunk(self):
+        """Test a stream that fails before producing output is retried"""
+        backend = self.llm_backend.FakeBackend(mean_latency=0, retry=self.fast_retry)
+        failures = iter([True, False])
+
+        def flaky():
+            if next(failures):
+                raise self.llm_backend.RetryableLLMError("flaky")
+        backend._maybe_fail = flaky
+
+        async def collect():
+            return "".join([chunk.text async for chunk in backend.stream(None, "hello")])
+        self.assertIn("background", self.asyncio.run(collect()))
+        self.assertEqual(backend.calls, 2)
+
+    def test_abandoned_gemini_stream_stops_its_producer(self):
+        """Test a stream the consumer gives up on is closed instead of being read to the end"""
+        import threading
+        pulled, closed = [], threading.Event()
+
+        def chunks():
+            try:
+                for n in range(100):
+                    pulled.append(n)
+                    time.sleep(0.005)
+                    yield MagicMock(text=f"{n} ")
+            finally:
+                closed.set()
+        model = MagicMock()
+        model.generate_content.side_effect = lambda prompt, stream: chunks()
+        backend = self.llm_backend.GeminiBackend(retry=self.fast_retry)
+        self.addCleanup(backend.executor.shutdown)
+
+        async def first_chunk():
+            stream = backend.stream(model, "hello")
+            chunk = await stream.__anext__()
+            await stream.aclose()
+            return chunk.text
+        self.assertEqual(self.asyncio.run(first_chunk()), "0 ")
+        self.assertTrue(closed.wait(1.0))
+        self.assertLess(len(pulled), 10)
+
+    def test_assistant_on_fake_backend(self):
+        """Test a HiringAssistant can run turns entirely on the fake backend"""
+        with patch('google.generativeai.configure'), patch('google.generativeai.GenerativeModel'):
+            from hiring_assistant import HiringAssistant
+            from gemini_client import MODEL_REGISTRY
+            from llm_cache import LLM_CACHE
+            self.addCleanup(MODEL_REGISTRY.clear)
+            self.addCleanup(LLM_CACHE.clear)
+            backend = self.llm_backend.FakeBackend(mean_latency=0, responder=lambda prompt: "Welcome aboard!")
+            assistant = HiringAssistant("test_api_key", backend=backend)
+            chunks = list(assistant.generate_response_stream("Hi there", "user: Hi there"))
+        self.assertEqual("".join(chunks), "Welcome aboard!")
+        self.assertEqual(assistant.conversation_stage, "info_gathering")
+        self.assertEqual(backend.calls, 1)
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the process-wide admission controller"""
+
+    def test_token_bucket_refill(self):
+        """Test buckets refill per second, cap at a minute's worth and let oversized calls through"""
+        from rate_limiter import TokenBucket
+        bucket = TokenBucket(600, now=0.0)
+        self.assertEqual(bucket.wait_time(600, 0.0), 0.0)
+        bucket.take(600, 0.0)
+        self.assertAlmostEqual(bucket.wait_time(10, 0.0), 1.0)
+        self.assertEqual(bucket.wait_time(10, 1.0), 0.0)
+        self.assertEqual(bucket.wait_time(1000, 120.0), 0.0)
+        bucket.take(1000, 120.0)
+        self.assertAlmostEqual(bucket.wait_time(1, 120.0), 40.1)
+
+    def test_interactive_first_and_sessions_take_turns(self):
+        """Test queued turns beat background work and a busy session doesn't hold up another"""
+        import asyncio
+        from rate_limiter import BACKGROUND, AdmissionController
+        limiter = AdmissionController(requests_per_minute=1200)
+        limiter.requests.level = 0
+        order = []
+
+        async def call(name, flow, priority=0):
+            await limiter.acquire(10, flow, priority)
+            order.append(name)
+
+        async def run():
+            await asyncio.gather(call("a-questions", "a", BACKGROUND), call("a1", "a"), call("a2", "a"),
+                                 call("a3", "a"), call("b1", "b"))
+        asyncio.run(run())
+        self.assertEqual(order, ["a1", "b1", "a2", "a3", "a-questions"])
+        self.assertEqual(limiter.queued, 0)
+
+    def test_promoted_background_work_is_counted_as_promoted(self):
+        """Test a background call admitted after promotion is recorded under background with outcome promoted"""
+        import asyncio
+        from metrics import METRICS
+        from rate_limiter import BACKGROUND, RATE_LIMIT_ADMISSIONS, RATE_LIMIT_WAIT_SECONDS, AdmissionController
+        METRICS.enabled = True
+        self.addCleanup(setattr, METRICS, "enabled", False)
+        self.addCleanup(METRICS.clear)
+        limiter = AdmissionController(requests_per_minute=600, promote_after=0.05)
+        limiter.requests.level = 0
+
+        async def run():
+            await asyncio.gather(limiter.acquire(10, "a", BACKGROUND), limiter.acquire(10, "b", BACKGROUND))
+        asyncio.run(run())
+        self.assertEqual(RATE_LIMIT_ADMISSIONS.value("background", "promoted"), 2)
+        self.assertEqual(RATE_LIMIT_ADMISSIONS.value("background", "queued"), 0)
+        self.assertEqual(RATE_LIMIT_ADMISSIONS.value("interactive", "queued"), 0)
+        self.assertIn('talentscout_llm_queue_wait_seconds_count{priority="background"} 2', METRICS.render())
+
+    def test_backend_waits_for_quota(self):
+        """Test a backend call waits for the token budget and abandoned waits leave the queue"""
+        import asyncio
+        from llm_backend import FakeBackend, LLMTimeoutError
+        from metrics import METRICS
+        from rate_limiter import RATE_LIMIT_ADMISSIONS, RATE_LIMIT_QUEUE_DEPTH, AdmissionController
+        METRICS.enabled = True
+        self.addCleanup(setattr, METRICS, "enabled", False)
+        self.addCleanup(METRICS.clear)
+        limiter = AdmissionController(tokens_per_minute=60000)
+        backend = FakeBackend(mean_latency=0, limiter=limiter)
+        limiter.tokens.level = 0
+        with self.assertRaises(LLMTimeoutError):
+            asyncio.run(backend.generate(None, "hello", timeout=0.05))
+        self.assertEqual(limiter.queued, 0)
+        self.assertEqual(RATE_LIMIT_QUEUE_DEPTH.value("interactive"), 0)
+        self.assertEqual(backend.calls, 0)
+
+        started = time.perf_counter()
+        asyncio.run(backend.generate(None, "hello"))
+        self.assertGreater(time.perf_counter() - started, 0.1)
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(RATE_LIMIT_ADMISSIONS.value("interactive", "queued"), 1)
+
+class TestPromptBuilder(unittest.TestCase):
+    """Test cases for stage-specific prompt assembly"""
+
+    def setUp(self):
+        from prompt_builder import PromptBuilder
+        self.builder = PromptBuilder()
+
+    def test_system_prompt_sections_by_stage(self):
+        """Test only the stage's sections are included in its system prompt"""
+        greeting = self.builder.system_prompt("greeting")
+        questions = self.builder.system_prompt("tech_questions")
+        self.assertIn("required_info", greeting.section_tokens)
+        self.assertNotIn("question_guidelines", greeting.section_tokens)
+        self.assertIn("question_guidelines", questions.section_tokens)
+        self.assertNotIn("required_info", questions.section_tokens)
+        self.assertIs(self.builder.system_prompt("greeting"), greeting)
+
+    def test_turn_prompt_compact_with_section_tokens(self):
+        """Test candidate info is compact JSON and every section reports its tokens"""
+        prompt = self.builder.turn_prompt("info_gathering", {"name": "Jane Doe"}, 0, True, [],
+                                          "user: Jane Doe", "Jane Doe")
+        self.assertIn('COLLECTED CANDIDATE INFORMATION: {"name":"Jane Doe"}', prompt.text)
+        self.assertNotIn("        ", prompt.text)
+        self.assertIn("email address", prompt.text)
+        self.assertEqual(set(prompt.section_tokens),
+                         {"context", "candidate_info", "history", "latest_response", "instructions"})
+        self.assertEqual(prompt.tokens, sum(prompt.section_tokens.values()))
+
+    def test_token_cap_trims_oldest_history(self):
+        """Test a capped prompt drops the oldest history lines first"""
+        from prompt_builder import PromptBuilder
+        history = "\n".join(f"user: answer number {i} " + "detail " * 20 for i in range(20))
+        uncapped = self.builder.turn_prompt("tech_stack", {}, 0, True, [], history, "Python")
+        capped = PromptBuilder(token_cap=uncapped.tokens // 2).turn_prompt("tech_stack", {}, 0, True, [], history,
+                                                                          "Python")
+        self.assertLessEqual(capped.tokens, uncapped.tokens // 2 + 60)
+        self.assertNotIn("answer number 0 ", capped.text)
+        self.assertIn("answer number 19 ", capped.text)
+
+class TestFastPath(unittest.TestCase):
+    """Test cases for template replies to formulaic info-gathering turns"""
+
+    def setUp(self):
+        from fast_path import FastPathResponder
+        self.responder = FastPathResponder()
+
+    def test_acknowledges_and_asks_next_detail(self):
+        """Test a plain detail is acknowledged and the next missing one requested"""
+        reply = self.responder.respond("info_gathering", {}, "My name is Jane Smith")
+        self.assertEqual(reply, "Thanks, Jane! What's the best email address to reach you at?")
+        reply = self.responder.respond("info_gathering", {"name": "Jane Smith"}, "jane@example.com")
+        self.assertIn("noted your email address", reply)
+        self.assertIn("phone number", reply)
+
+    def test_ambiguous_turns_go_to_model(self):
+        """Test greetings, questions, corrections and unparsed details are left to the model"""
+        self.assertIsNone(self.responder.respond("greeting", {}, "Hello!"))
+        self.assertIsNone(self.responder.respond("info_gathering", {}, "Hello!"))
+        self.assertIsNone(self.responder.respond("info_gathering", {}, "jane@example.com, is that okay?"))
+        self.assertIsNone(self.responder.respond("info_gathering", {"email": "old@example.com"}, "jane@example.com"))
+        self.assertIsNone(self.responder.respond("info_gathering", {}, "jane@example.com or +44 20 7946 0958"))
+        self.assertIsNone(self.responder.respond("info_gathering", {}, "I'm a Data Engineer"))
+
+    def test_fast_turn_skips_model(self):
+        """Test a fast-path turn makes no model call and is counted as served locally"""
+        from gemini_client import MODEL_REGISTRY
+        from hiring_assistant import HiringAssistant
+        from llm_backend import FakeBackend
+        from metrics import METRICS, TURNS
+        METRICS.enabled = True
+        self.addCleanup(setattr, METRICS, "enabled", False)
+        self.addCleanup(METRICS.clear)
+        self.addCleanup(MODEL_REGISTRY.clear)
+        backend = FakeBackend(mean_latency=0)
+        with patch('google.generativeai.configure'), patch('google.generativeai.GenerativeModel'):
+            assistant = HiringAssistant("test_api_key", backend=backend)
+            assistant.conversation_stage = "info_gathering"
+            reply = "".join(assistant.generate_response_stream("My name is Jane Smith", ""))
+        self.assertTrue(reply.startswith("Thanks, Jane!"))
+        self.assertEqual(backend.calls, 0)
+        self.assertEqual(assistant.candidate_info["name"], "Jane Smith")
+        self.assertEqual(TURNS.value("info_gathering", "fast_path"), 1)
+
+class TestQuestionSpeculation(unittest.TestCase):
+    """Test cases for generating technical questions ahead of the tech_questions stage"""
+
+    def setUp(self):
+        import asyncio
+        from gemini_client import MODEL_REGISTRY
+        from hiring_assistant import HiringAssistant
+        from llm_backend import FakeBackend
+        from llm_cache import LLM_CACHE
+        from speculation import SPECULATOR
+        self.asyncio = asyncio
+        self.speculator = SPECULATOR
+        patcher = patch('google.generativeai.GenerativeModel')
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(MODEL_REGISTRY.clear)
+        self.addCleanup(LLM_CACHE.clear)
+        self.addCleanup(setattr, SPECULATOR, "max_in_flight", SPECULATOR.max_in_flight)
+        self.backend = FakeBackend(mean_latency=0.05)
+        self.assistant = HiringAssistant("test_api_key", backend=self.backend)
+        self.assistant.conversation_stage = "tech_stack"
+        self.assistant.candidate_info = {"name": "Jane Doe", "experience": "3 years"}
+
+    def run_turns(self, *messages):
+        async def run():
+            for message in messages:
+                await self.assistant.agenerate_response(message, "")
+                await self.asyncio.sleep(0.1)  # the candidate reads the reply
+        self.asyncio.run(run())
+
+    def test_questions_generated_alongside_reply(self):
+        """Test the transition turn generates the questions concurrently with its reply"""
+        started = time.perf_counter()
+        self.asyncio.run(self.assistant.agenerate_response("Python and Django", ""))
+        self.assertLess(time.perf_counter() - started, 0.09)  # one model latency, not two
+        self.assertEqual(self.backend.calls, 2)  # the reply plus the speculative questions
+        self.assertEqual(len(self.assistant.tech_questions), 4)
+        self.assertIsNone(self.assistant.question_speculation)
+        self.run_turns("I would use select_related")
+        self.assertEqual(self.backend.calls, 3)
+
+    def test_stale_speculation_discarded(self):
+        """Test questions speculated for an older profile are regenerated"""
+        self.assistant.candidate_info["tech_stack"] = {"programming_languages": ["python"]}
+        self.assistant.speculate_technical_questions()
+        self.assistant.candidate_info["experience"] = "10 years"
+        self.assistant.conversation_stage = "tech_questions"
+        self.run_turns("I would use select_related")
+        self.assertEqual(len(self.assistant.tech_questions), 4)
+        self.assertTrue(any("10 years" in prompt and "Generate exactly 4" in prompt
+                            for prompt in self.backend.prompts))
+
+    def test_full_pool_skips_speculation(self):
+        """Test questions are generated on demand when the speculation pool is full"""
+        self.speculator.max_in_flight = 0
+        self.run_turns("Python and Django")
+        self.assertIsNone(self.assistant.question_speculation)
+        self.assertEqual(self.backend.calls, 2)
+        self.assertEqual(len(self.assistant.tech_questions), 4)
+
+
+class TestTurnPipeline(unittest.TestCase):
+    """Test cases for planning a turn's state changes before its model call"""
+
+    def setUp(self):
+        from gemini_client import MODEL_REGISTRY
+        from hiring_assistant import HiringAssistant
+        from llm_backend import FakeBackend
+        from llm_cache import LLM_CACHE
+        patcher = patch('google.generativeai.GenerativeModel')
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(MODEL_REGISTRY.clear)
+        self.addCleanup(LLM_CACHE.clear)
+        self.backend = FakeBackend(mean_latency=0)
+        self.assistant = HiringAssistant("test_api_key", backend=self.backend)
+        self.assistant.conversation_stage = "info_gathering"
+
+    def test_plan_leaves_state_untouched(self):
+        """Test planning returns both sides of the transition without changing its inputs"""
+        from turn_pipeline import plan_turn
+        info = {"name": "Jane Smith", "experience": "3 years"}
+        plan = plan_turn("info_gathering", info, 0, "jane@example.com, ready for the tech part")
+        self.assertEqual(info, {"name": "Jane Smith", "experience": "3 years"})
+        self.assertEqual(plan.next_candidate_info["email"], "jane@example.com")
+        self.assertEqual((plan.stage, plan.next_stage), ("info_gathering", "tech_stack"))
+        plan = plan_turn("tech_questions", {}, 3, "I would add an index")
+        self.assertEqual((plan.next_questions_asked, plan.next_stage), (4, "conclusion"))
+
+    def test_extracted_details_in_same_prompt(self):
+        """Test details from the answer reach the prompt of the turn that extracted them"""
+        self.assistant.generate_response("My email is jane@example.com, is that okay?", "")
+        self.assertIn('"email":"jane@example.com"', self.backend.prompts[-1])
+        self.assertNotIn("email address,", self.backend.prompts[-1].split("INSTRUCTIONS")[1])
+
+    def test_failed_turn_reverted(self):
+        """Test a failed model call leaves the details and stage as they were before the turn"""
+        self.backend.fatal_error_rate = 1.0
+        self.assistant.candidate_info = {"name": "Jane Smith", "experience": "3 years"}
+        reply = self.assistant.generate_response("jane@example.com, let's talk tech, right?", "")
+        self.assertIn("technical difficulties", reply)
+        self.assertEqual(self.assistant.candidate_info, {"name": "Jane Smith", "experience": "3 years"})
+        self.assertEqual(self.assistant.conversation_stage, "info_gathering")
+
+class TestTurnSLO(unittest.TestCase):
+    """Test cases for answering turns locally when the model misses the turn SLO"""
+
+    def setUp(self):
+        import asyncio
+        from gemini_client import MODEL_REGISTRY
+        from llm_backend import FakeBackend
+        from llm_cache import LLM_CACHE
+        patcher = patch('google.generativeai.GenerativeModel')
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(MODEL_REGISTRY.clear)
+        self.addCleanup(LLM_CACHE.clear)
+
+        class SlowQuestions(FakeBackend):
+            async def _complete(self, model, prompt):
+                if "Generate exactly 4" in prompt:
+                    await asyncio.sleep(0.3)
+                return await super()._complete(model, prompt)
+        self.SlowQuestions = SlowQuestions
+
+    def test_template_questions_by_category_and_experience(self):
+        """Test template questions follow the candidate's categories and experience bucket"""
+        from question_templates import QUESTION_TEMPLATES, experience_bucket
+        self.assertEqual([experience_bucket(e) for e in ("1 year", "4 years", "12 years", None)],
+                         ["junior", "mid", "senior", "junior"])
+        stack = {"databases": ["postgresql"], "programming_languages": ["python", "go"]}
+        questions = QUESTION_TEMPLATES.questions(stack, "12 years")
+        self.assertEqual(len(questions), 4)
+        self.assertTrue(questions[0].startswith("Q1: How would you scale postgresql"))
+        self.assertIn("python", questions[1])
+        self.assertIn("go", questions[3])
+        self.assertEqual(len(QUESTION_TEMPLATES.questions({}, "2 years")), 4)
+
+    def test_slow_reply_answered_from_templates(self):
+        """Test a reply that misses the SLO is served locally and the turn still moves on"""
+        from hiring_assistant import HiringAssistant
+        from llm_backend import FakeBackend
+        assistant = HiringAssistant("test_api_key", backend=FakeBackend(mean_latency=2.0), turn_slo=0.1)
+        assistant.conversation_stage = "info_gathering"
+        assistant.candidate_info = {"name": "Jane Smith"}
+        started = time.perf_counter()
+        reply = "".join(assistant.generate_response_stream("jane@example.com, can we continue?", ""))
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(reply, "Thank you! What's a good phone number for you, including the country code?")
+        self.assertEqual(assistant.candidate_info["email"], "jane@example.com")
+
+    def test_late_questions_used_next_turn(self):
+        """Test questions that miss the SLO are replaced by the model's once they arrive"""
+        from hiring_assistant import HiringAssistant
+        assistant = HiringAssistant("test_api_key", backend=self.SlowQuestions(mean_latency=0), turn_slo=0.15)
+        assistant.conversation_stage = "tech_stack"
+        assistant.candidate_info = {"name": "Jane Smith", "experience": "4 years"}
+        assistant.generate_response("I work with Python and Django", "")
+        self.assertIn("python", assistant.tech_questions[0])
+        self.assertIsNotNone(assistant.late_questions)
+        time.sleep(0.3)
+        assistant.generate_response("I would write unit tests around the fixtures", "")
+        self.assertIn("python", assistant.tech_questions[0])
+        self.assertTrue(assistant.tech_questions[1].startswith("Q2: Describe a real project"))
+        self.assertIsNone(assistant.late_questions)
+
+class TestQuestionBank(unittest.TestCase):
+    """Test cases for the precomputed question bank"""
+
+    def test_build_save_and_nearest_lookup(self):
+        """Test the builder banks frequent stacks and lookups find the closest one at the same level"""
+        import tempfile
+        from question_bank import QuestionBank, build_bank, most_common_profiles
+        django = {"programming_languages": ["python"], "web_frameworks": ["django"], "databases": ["postgresql"]}
+        react = {"programming_languages": ["typescript"], "web_frameworks": ["react"]}
+        profiles = most_common_profiles(
+            [{"tech_stack": django, "experience": "4 years"}] * 3 + [{"tech_stack": react, "experience": "1 year"}] * 2
+            + [{"tech_stack": {"programming_languages": ["rust"]}, "experience": "4 years"}], top=10, min_count=2
+        )
+        self.assertEqual([profile["tech_stack"] for profile in profiles], [django, react])
+        bank = build_bank(profiles, workers=2, fake=True)
+        path = os.path.join(tempfile.mkdtemp(), "bank.bin")
+        bank.save(path)
+        bank = QuestionBank.load(path)
+        self.assertEqual(len(bank), 2)
+
+        near = {"programming_languages": ["python"], "web_frameworks": ["django"], "databases": ["postgresql", "redis"]}
+        questions = bank.lookup(near, "5 years")
+        self.assertEqual(len(questions), 4)
+        self.assertTrue(questions[0].startswith("Q1:"))
+        self.assertIsNone(bank.lookup(near, "10 years"))
+        self.assertIsNone(bank.lookup({"programming_languages": ["python"], "databases": ["mongodb"]}, "4 years"))
+
+    def test_assistant_serves_banked_questions(self):
+        """Test a banked stack gets its questions without a model call"""
+        from hiring_assistant import HiringAssistant
+        from question_bank import QuestionBank
+        from llm_backend import FakeBackend
+        from llm_cache import LLM_CACHE
+        self.addCleanup(LLM_CACHE.clear)
+        bank = QuestionBank()
+        bank.add(["python", "django"], "mid", [f"Q{n}: Banked question {n}" for n in range(1, 5)])
+        backend = FakeBackend(mean_latency=0)
+        with patch("hiring_assistant.QUESTION_BANK", bank), patch('google.generativeai.GenerativeModel'):
+            assistant = HiringAssistant("test_api_key", backend=backend)
+            assistant.candidate_info = {"experience": "3 years",
+                                        "tech_stack": {"programming_languages": ["python"], "web_frameworks": ["django"]}}
+            self.assertEqual(assistant.generate_technical_questions()[3], "Q4: Banked question 4")
+        self.assertEqual(backend.calls, 0)
+
+class TestRoleMatching(unittest.TestCase):
+    """Test cases for the candidate-to-role matching engine"""
+
+    def setUp(self):
+        from role_matching import MatchingEngine, Role
+        self.engine = MatchingEngine()
+        self.engine.add_role(Role("backend", "Backend Engineer", ("python", "django", "postgres"), ("docker",), 3))
+        self.engine.add_role(Role("frontend", "Frontend Engineer", ("typescript", "react")))
+        self.engine.add_role(Role("staff", "Staff Engineer", ("python", "kubernetes"), (), 10))
+        self.engine.add_candidate("jane", {"programming_languages": ["python"], "web_frameworks": ["django"],
+                                           "databases": ["postgresql"]}, "5 years")
+        self.engine.add_candidate("tom", {"programming_languages": ["typescript", "python"],
+                                          "web_frameworks": ["react"]}, "2 years")
+
+    def test_ranking_both_ways(self):
+        """Test roles rank by weighted coverage, respect minimum experience and accept aliases"""
+        from role_matching import Role
+        self.assertEqual([match.id for match in self.engine.top_roles("jane")], ["backend"])
+        self.assertAlmostEqual(self.engine.top_roles("jane")[0].score, 3 / 3.5)
+        self.assertEqual(self.engine.top_roles("tom"), [("frontend", 1.0)])
+        self.assertEqual([match.id for match in self.engine.top_candidates("backend")], ["jane"])
+        self.engine.add_candidate("tom", {"programming_languages": ["python"]}, "12 years")
+        self.assertEqual([match.id for match in self.engine.top_candidates("staff")], ["tom"])
+        with self.assertRaises(ValueError):
+            self.engine.add_role(Role("odd", "Odd Role", ("cobol",)))
+
+    def test_batch_matches_single_lookups(self):
+        """Test the vectorized rankings agree with the inverted-index lookups"""
+        import random
+        from role_matching import Role
+        from tech_taxonomy import TECHNOLOGIES
+        rng = random.Random(4)
+        techs = [tech for category in TECHNOLOGIES.values() for tech in category]
+        for index in range(40):
+            self.engine.add_role(Role(f"role-{index}", "Role", tuple(rng.sample(techs, 3)), tuple(rng.sample(techs, 2)),
+                                      rng.randint(0, 6)))
+        for index in range(200):
+            self.engine.add_candidate(f"c{index}", {"all": rng.sample(techs, rng.randint(2, 8))}, f"{rng.randint(0, 9)} years")
+        indices, scores = self.engine.top_roles_batch(5)
+        for row, candidate_id in enumerate(self.engine.candidate_ids):
+            expected = [score for _, score in self.engine.top_roles(candidate_id, 5)]
+            self.assertTrue(all(abs(a - b) < 1e-5 for a, b in zip(scores[row], expected)))
+            self.assertEqual(int((indices[row] >= 0).sum()), len(expected))
+        indices, scores = self.engine.top_candidates_batch(5)
+        for row, role_id in enumerate(self.engine.role_ids):
+            expected = [score for _, score in self.engine.top_candidates(role_id, 5)]
+            self.assertTrue(all(abs(a - b) < 1e-5 for a, b in zip(scores[row], expected)))
+
+class TestBatchScreening(unittest.TestCase):
+    """Test cases for offline re-screening of archived transcripts"""
+
+    MESSAGES = [
+        {"role": "assistant", "content": "Welcome!"},
+        {"role": "user", "content": "Hi"},
+        {"role": "user", "content": "My name is Jane Smith, jane@example.com, 6 years of experience. Tech next?"},
+        {"role": "user", "content": "Python, Django and PostgreSQL"},
+        {"role": "user", "content": "I would add an index."}
+    ]
+
+    def test_replay_follows_the_interview_stages(self):
+        """Test candidate messages are extracted stage by stage, as in the live interview"""
+        from batch_screening import replay
+        profile = replay(self.MESSAGES)
+        self.assertEqual(profile["stage"], "tech_questions")
+        self.assertEqual(profile["questions_asked"], 1)
+        self.assertEqual(profile["candidate_info"]["email"], "jane@example.com")
+        self.assertEqual(profile["candidate_info"]["tech_stack"]["web_frameworks"], ["django"])
+
+    def test_batch_keeps_input_order_and_reports_bad_lines(self):
+        """Test profiles come back in input order across chunks, with unreadable lines marked"""
+        import io
+        import json
+        from batch_screening import Progress, run_batch
+        state = {"id": "s1", "messages": self.MESSAGES, "assistant": {"info": {"name": "Jane Smith"}}}
+        lines = [json.dumps(state), "{not json", json.dumps({"id": "s3", "messages": self.MESSAGES[:2]})]
+        output = io.StringIO()
+        progress = run_batch(enumerate(lines), output, workers=2, chunk_size=1, questions="templates",
+                             progress=Progress(stream=io.StringIO()))
+        profiles = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([profile["id"] for profile in profiles], ["s1", 1, "s3"])
+        self.assertIn("email", profiles[0]["changed"])
+        self.assertEqual(len(profiles[0]["tech_questions"]), 4)
+        self.assertIn("error", profiles[1])
+        self.assertNotIn("tech_questions", profiles[2])
+        self.assertEqual((progress.done, progress.errors), (3, 1))
+
+
+class TestConversationMemory(unittest.TestCase):
+    """Test cases for the token-budgeted conversation memory"""
+
+    def setUp(self):
+        from conversation_memory import ConversationMemory
+        from token_counting import estimate_tokens
+        self.ConversationMemory = ConversationMemory
+        self.estimate_tokens = estimate_tokens
+
+    def test_short_conversation_verbatim(self):
+        """Test a short conversation renders exactly as role-prefixed lines"""
+        memory = self.ConversationMemory(600)
+        memory.add("assistant", "What's your name?")
+        memory.add("user", "Jane Doe")
+        self.assertEqual(memory.render(), "assistant: What's your name?\nuser: Jane Doe")
+
+    def test_history_stays_within_budget(self):
+        """Test long interviews and oversized answers never exceed the token budget"""
+        memory = self.ConversationMemory(300)
+        for i in range(200):
+            memory.add("user" if i % 2 else "assistant", "I built data pipelines. " * (i % 40))
+            self.assertLessEqual(self.estimate_tokens(memory.render()), 300)
+        self.assertIn("earlier messages omitted", memory.render())
+
+    def test_older_messages_summarized(self):
+        """Test messages leaving the recent window are kept as one-line summaries"""
+        memory = self.ConversationMemory(600, max_recent_messages=2)
+        memory.add("assistant", "**Welcome!** Let's begin. What's your full name?")
+        memory.add("user", "Jane Doe")
+        memory.add("assistant", "Thanks Jane. What's your email?")
+        rendered = memory.render()
+        self.assertIn("Earlier in the interview:\nassistant: Welcome!", rendered)
+        self.assertTrue(rendered.endswith("user: Jane Doe\nassistant: Thanks Jane. What's your email?"))
+
+class TestInterviewService(unittest.TestCase):
+    """Test cases for the headless interview service and its HTTP API"""
+
+    def setUp(self):
+        import asyncio
+        import json
+        from gemini_client import MODEL_REGISTRY
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from llm_backend import FakeBackend
+        from llm_cache import LLM_CACHE
+        self.asyncio = asyncio
+        self.json = json
+        patcher = patch('google.generativeai.GenerativeModel')
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(MODEL_REGISTRY.clear)
+        self.addCleanup(LLM_CACHE.clear)
+        self.backend = FakeBackend(mean_latency=0, responder=lambda prompt: "Thanks, noted.")
+        self.service = InterviewService(assistant_factory=lambda: HiringAssistant(backend=self.backend))
+
+    def test_session_transcript(self):
+        """Test a turn records both messages and advances the interview"""
+        async def run():
+            session = await self.service.start_session()
+            reply = await self.service.post_answer(session.session_id, "My name is Jane Doe")
+            return reply, await self.service.get_session(session.session_id)
+        reply, session = self.asyncio.run(run())
+        self.assertEqual(reply, "Thanks, noted.")
+        self.assertEqual([m["role"] for m in session.messages], ["assistant", "user", "assistant"])
+        self.assertIn("total", session.messages[-1]["timing"])
+        self.assertEqual(session.assistant.conversation_stage, "info_gathering")
+
+    def test_unknown_session(self):
+        """Test answering an unknown session raises SessionNotFound"""
+        from interview_service import SessionNotFound
+        with self.assertRaises(SessionNotFound):
+            self.asyncio.run(self.service.post_answer("missing", "hello"))
+
+    def test_disconnect_mid_reply_undoes_the_turn(self):
+        """Test a reply the caller stops reading leaves the session as it was before the answer"""
+        async def run():
+            session = await self.service.start_session()
+            before = session.to_state()
+            stream = self.service.stream_answer(session.session_id, "My name is Jane Doe")
+            await stream.__anext__()
+            await stream.aclose()
+            return before, await self.service.get_session(session.session_id)
+        before, session = self.asyncio.run(run())
+        after = session.to_state()
+        self.assertEqual(after["messages"], before["messages"])
+        self.assertEqual(after["assistant"], before["assistant"])
+        self.assertEqual(after["memory"], before["memory"])
+        self.assertEqual(len(self.service._locks), 0)
+
+    def test_idle_sessions_expire_as_abandoned(self):
+        """Test interviews with no recent turn are ended as abandoned and leave no lock behind"""
+        from analytics import RecruitingAnalytics
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService, SessionNotFound
+        analytics = RecruitingAnalytics()
+        service = InterviewService(assistant_factory=lambda: HiringAssistant(backend=self.backend),
+                                   analytics=analytics, session_idle=60)
+
+        async def run():
+            idle = await service.start_session()
+            await service.post_answer(idle.session_id, "My name is Jane Doe")
+            live = await service.start_session()
+            idle.updated_at -= 120
+            self.assertEqual(await service.expire_idle_sessions(), 1)
+            await service.get_session(live.session_id)
+            with self.assertRaises(SessionNotFound):
+                await service.get_session(idle.session_id)
+        self.asyncio.run(run())
+        self.assertEqual(len(service._locks), 0)
+        snapshot = analytics.snapshot()
+        self.assertEqual(snapshot["outcomes"]["abandoned"], 1)
+        self.assertEqual(snapshot["stages"]["info_gathering"]["drop_offs"], 1)
+        self.assertEqual(sum(counts["active"] for counts in snapshot["stages"].values()), 1)
+
+    def test_session_state_round_trip(self):
+        """Test a session's interview state, transcript and memory survive encoding"""
+        from hiring_assistant import HiringAssistant
+        from session_store import decode_session, encode_session
+
+        async def run():
+            session = await self.service.start_session()
+            await self.service.post_answer(session.session_id, "Hello!")
+            await self.service.post_answer(session.session_id, "My email is jane@example.com, is that okay?")
+            return session
+        session = self.asyncio.run(run())
+        restored = decode_session(encode_session(session), HiringAssistant(backend=self.backend))
+        self.assertEqual(restored.to_state(), session.to_state())
+        self.assertEqual(restored.memory.render(), session.memory.render())
+        self.assertEqual(restored.memory.tokens, session.memory.tokens)
+
+    def test_sqlite_store_resumes_after_restart(self):
+        """Test sessions are written behind the turn and resumed by a new store on the same file"""
+        import sqlite3
+        import tempfile
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from session_store import SQLiteSessionStore
+        path = os.path.join(tempfile.mkdtemp(), "sessions.db")
+        factory = lambda: HiringAssistant(backend=self.backend)
+        store = SQLiteSessionStore(path, factory, flush_interval=60)
+        service = InterviewService(store, factory)
+
+        async def start():
+            session = await service.start_session()
+            await service.post_answer(session.session_id, "Hello!")
+            return session.session_id
+        session_id = self.asyncio.run(start())
+        with sqlite3.connect(path) as db:
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0], 0)  # still queued
+        store.close()
+
+        service = InterviewService(SQLiteSessionStore(path, factory), factory)
+        self.addCleanup(service.store.close)
+
+        async def resume():
+            await service.post_answer(session_id, "My email is jane@example.com, is that okay?")
+            return await service.get_session(session_id)
+        session = self.asyncio.run(resume())
+        self.assertEqual(len(session.messages), 5)
+        self.assertEqual(session.assistant.conversation_stage, "info_gathering")
+        self.assertEqual(session.assistant.candidate_info["email"], "jane@example.com")
+
+    def test_sqlite_cold_load_does_not_wait_for_encoding(self):
+        """Test reading a session back from disk proceeds while the writer is still encoding a batch"""
+        import tempfile
+        import threading
+        import session_store
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from session_store import SQLiteSessionStore
+        path = os.path.join(tempfile.mkdtemp(), "sessions.db")
+        factory = lambda: HiringAssistant(backend=self.backend)
+        first = SQLiteSessionStore(path, factory, flush_interval=60)
+        session_id = self.asyncio.run(InterviewService(first, factory).start_session()).session_id
+        first.close()
+
+        store = SQLiteSessionStore(path, factory, flush_interval=60)
+        self.addCleanup(store.close)
+        self.asyncio.run(InterviewService(store, factory).start_session())
+        encode_state = session_store.encode_state
+
+        def slow_encode(state):
+            time.sleep(0.5)
+            return encode_state(state)
+        with patch('session_store.encode_state', slow_encode):
+            writer = threading.Thread(target=store.flush)
+            writer.start()
+            time.sleep(0.05)
+            started = time.perf_counter()
+            session = self.asyncio.run(store.load(session_id))
+            elapsed = time.perf_counter() - started
+            writer.join()
+        self.assertEqual(session.session_id, session_id)
+        self.assertLess(elapsed, 0.3)
+
+    def test_sqlite_count_includes_queued_changes_without_writing_them(self):
+        """Test count() adds queued sessions and subtracts queued deletes while leaving them queued"""
+        import sqlite3
+        import tempfile
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from session_store import SQLiteSessionStore
+        path = os.path.join(tempfile.mkdtemp(), "sessions.db")
+        factory = lambda: HiringAssistant(backend=self.backend)
+        store = SQLiteSessionStore(path, factory, flush_interval=60)
+        self.addCleanup(store.close)
+        service = InterviewService(store, factory)
+
+        async def run():
+            first = await service.start_session()
+            await service.start_session()
+            store.flush()
+            await service.end_session(first.session_id)
+            await service.start_session()
+            await service.start_session()
+            return await store.count()
+        self.assertEqual(self.asyncio.run(run()), 3)
+        with sqlite3.connect(path) as db:
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0], 2)
+
+    def test_replicas_share_sessions(self):
+        """Test turns of one interview can alternate between replicas sharing a backend"""
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from shared_session_store import InMemoryStateBackend, SharedSessionStore
+        backend = InMemoryStateBackend()
+        factory = lambda: HiringAssistant(backend=self.backend)
+        first, second = (InterviewService(SharedSessionStore(backend, factory), factory) for _ in range(2))
+
+        async def run():
+            session = await first.start_session()
+            await second.post_answer(session.session_id, "Hello!")
+            await first.post_answer(session.session_id, "My email is jane@example.com, is that okay?")
+            return await second.get_session(session.session_id)
+        session = self.asyncio.run(run())
+        self.assertEqual(len(session.messages), 5)
+        self.assertEqual(session.version, 3)
+        self.assertEqual(session.assistant.candidate_info["email"], "jane@example.com")
+        self.assertEqual(self.asyncio.run(backend.count()), 1)
+
+    def test_shared_store_keeps_late_questions_between_turns(self):
+        """Test questions that missed the SLO reach the next turn through the shared store, on one flow"""
+        import asyncio
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from llm_backend import FakeBackend
+        from shared_session_store import InMemoryStateBackend, SharedSessionStore
+
+        class SlowQuestions(FakeBackend):
+            async def _complete(self, model, prompt):
+                if "Generate exactly 4" in prompt:
+                    await asyncio.sleep(0.3)
+                return await super()._complete(model, prompt)
+        backend = SlowQuestions(mean_latency=0, responder=lambda prompt: "Q1: Why?\nQ2: How?\nQ3: What?\nQ4: When?")
+        factory = lambda: HiringAssistant(backend=backend, turn_slo=0.15)
+        store = SharedSessionStore(InMemoryStateBackend(), factory)
+        service = InterviewService(store, factory)
+
+        async def run():
+            session = await service.start_session()
+            for answer in ("Hi", "Jane Smith, jane@example.com, 4 years of experience. Tech next?",
+                           "I work with Python and Django"):
+                await service.post_answer(session.session_id, answer)
+            waiting = await store.load(session.session_id)
+            self.assertIsNotNone(waiting.assistant.late_questions)
+            self.assertEqual(waiting.assistant.flow, session.session_id)
+            self.assertNotEqual(waiting.assistant.tech_questions[1], "Q2: How?")  # a template for now
+            await self.asyncio.sleep(0.3)
+            await service.post_answer(session.session_id, "I would write unit tests around the fixtures")
+            return await store.load(session.session_id)
+        session = self.asyncio.run(run())
+        self.assertEqual(session.assistant.tech_questions[1], "Q2: How?")
+        self.assertIsNone(session.assistant.late_questions)
+        self.assertEqual(len(store._running), 0)
+
+    def test_replicas_sweeping_one_session_end_it_once(self):
+        """Test two replicas discarding the same loaded session record one abandonment between them"""
+        from analytics import RecruitingAnalytics
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from shared_session_store import InMemoryStateBackend, SharedSessionStore
+        backend = InMemoryStateBackend()
+        factory = lambda: HiringAssistant(backend=self.backend)
+        replicas = [InterviewService(SharedSessionStore(backend, factory), factory, analytics=RecruitingAnalytics())
+                    for _ in range(2)]
+
+        async def run():
+            session = await replicas[0].start_session()
+            loaded = [await replica.store.load(session.session_id) for replica in replicas]
+            return [await replica._discard(copy) for replica, copy in zip(replicas, loaded)]
+        self.assertEqual(self.asyncio.run(run()), [True, False])
+        self.assertEqual(sum(replica.analytics.snapshot()["outcomes"]["abandoned"] for replica in replicas), 1)
+        self.assertEqual(self.asyncio.run(backend.count()), 0)
+
+    def test_concurrent_save_conflicts(self):
+        """Test a replica saving a session that another replica has meanwhile updated or ended is refused"""
+        from hiring_assistant import HiringAssistant
+        from shared_session_store import InMemoryStateBackend, SessionConflict, SharedSessionStore
+        store = SharedSessionStore(InMemoryStateBackend(), lambda: HiringAssistant(backend=self.backend))
+
+        async def run():
+            session = await self.service.start_session()
+            await store.save(session)
+            stale = await store.load(session.session_id)
+            fresh = await store.load(session.session_id)
+            await store.save(fresh)
+            with self.assertRaises(SessionConflict):
+                await store.save(stale)
+            await store.delete(session.session_id)
+            with self.assertRaises(SessionConflict):
+                await store.save(fresh)
+            return await store.load(session.session_id)
+        self.assertIsNone(self.asyncio.run(run()))
+
+    def test_http_api(self):
+        """Test the HTTP server end to end over one keep-alive connection"""
+        from interview_server import serve
+
+        async def request(reader, writer, method, path, payload=None):
+            body = self.json.dumps(payload).encode() if payload is not None else b""
+            writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.lower()] = value.strip()
+            if headers.get("transfer-encoding") == "chunked":
+                data = b""
+                while True:
+                    size = int((await reader.readline()).strip(), 16)
+                    chunk = await reader.readexactly(size + 2)
+                    if not size:
+                        break
+                    data += chunk[:-2]
+                return status, [self.json.loads(line) for line in data.decode().splitlines()]
+            data = await reader.readexactly(int(headers.get("content-length", 0)))
+            return status, self.json.loads(data) if data else None
+
+        async def run():
+            server = await serve(self.service, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await self.asyncio.open_connection("127.0.0.1", port)
+            try:
+                status, started = await request(reader, writer, "POST", "/sessions")
+                self.assertEqual(status, 201)
+                self.assertIn("TalentScout", started["greeting"])
+                session_path = f"/sessions/{started['session_id']}"
+
+                status, answered = await request(reader, writer, "POST", session_path + "/answers",
+                                                 {"message": "I'm John Smith"})
+                self.assertEqual((status, answered["reply"]), (200, "Thanks, noted."))
+                self.assertEqual(answered["stage"], "info_gathering")
+
+                status, lines = await request(reader, writer, "POST", session_path + "/answers/stream",
+                                              {"message": "john@example.com, do you need my phone too?"})
+                self.assertEqual(status, 200)
+                self.assertEqual("".join(line.get("chunk", "") for line in lines), "Thanks, noted.")
+                self.assertTrue(lines[-1]["done"])
+                self.assertEqual(lines[-1]["candidate_info"]["email"], "john@example.com")
+
+                status, summary = await request(reader, writer, "GET", session_path + "/summary")
+                self.assertEqual((status, summary["candidate_info"]["email"]), (200, "john@example.com"))
+
+                self.assertEqual((await request(reader, writer, "DELETE", session_path))[0], 204)
+                self.assertEqual((await request(reader, writer, "GET", session_path + "/summary"))[0], 404)
+                self.assertEqual((await request(reader, writer, "POST", session_path + "/answers", {}))[0], 400)
+            finally:
+                writer.close()
+                server.close()
+                await server.wait_closed()
+        self.asyncio.run(run())
+
+    def test_stream_failure_ends_the_chunked_body(self):
+        """Test an error mid-stream is sent as the last chunk, keeping the connection usable"""
+        from interview_server import serve
+
+        async def failing(session_id, message):
+            yield "Thanks"
+            raise RuntimeError("model exploded")
+        self.service.stream_answer = failing
+
+        async def run():
+            server = await serve(self.service, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await self.asyncio.open_connection("127.0.0.1", port)
+            try:
+                session = await self.service.start_session()
+                body = b'{"message": "Hello"}'
+                writer.write(f"POST /sessions/{session.session_id}/answers/stream HTTP/1.1\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                self.assertIn(b" 200 ", await reader.readline())
+                while (await reader.readline()).strip():
+                    pass
+                lines = []
+                while True:
+                    size = int((await reader.readline()).strip(), 16)
+                    data = await reader.readexactly(size + 2)
+                    if not size:
+                        break
+                    lines.append(self.json.loads(data))
+                writer.write(b"GET /healthz HTTP/1.1\r\nContent-Length: 0\r\n\r\n")
+                return lines, await reader.readline()
+            finally:
+                writer.close()
+                server.close()
+                await server.wait_closed()
+        lines, status = self.asyncio.run(run())
+        self.assertEqual(lines, [{"chunk": "Thanks"}, {"error": "Internal server error", "done": True}])
+        self.assertIn(b" 200 ", status)
+
+
+class TestInterviewExport(unittest.TestCase):
+    """Test cases for exporting finished interviews"""
+
+    def setUp(self):
+        import tempfile
+        self.directory = tempfile.mkdtemp()
+
+    def record(self, number):
+        return {"id": f"s{number}", "created": 1.0, "completed": float(number), "stage": "conclusion",
+                "questions_asked": 4, "candidate_info": {"name": "Jane Smith", "tech_stack": {"databases": ["redis"]}},
+                "tech_questions": ["Q1: Why?"], "messages": [{"role": "user", "content": "bye"}]}
+
+    def test_completed_interviews_are_exported_once(self):
+        """Test the completion hook fires when the candidate says goodbye, and only then"""
+        import asyncio
+        from gemini_client import MODEL_REGISTRY
+        from hiring_assistant import HiringAssistant
+        from interview_export import InterviewExporter, read_exports
+        from interview_service import InterviewService
+        from llm_backend import FakeBackend
+        patcher = patch('google.generativeai.GenerativeModel')
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(MODEL_REGISTRY.clear)
+        backend = FakeBackend(mean_latency=0, responder=lambda prompt: "Thanks, noted.")
+        exporter = InterviewExporter(self.directory, flush_interval=60)
+        service = InterviewService(assistant_factory=lambda: HiringAssistant(backend=backend),
+                                   completion_hooks=[exporter.export])
+
+        async def run():
+            session = await service.start_session()
+            await service.post_answer(session.session_id, "Hi")
+            await service.post_answer(session.session_id, "My name is Jane Smith")
+            await service.post_answer(session.session_id, "goodbye")
+            await service.post_answer(session.session_id, "bye again")
+            return session.session_id
+        session_id = asyncio.run(run())
+        exporter.close()
+        records = list(read_exports(self.directory))
+        self.assertEqual([record["id"] for record in records], [session_id])
+        self.assertEqual(records[0]["candidate_info"]["name"], "Jane Smith")
+        self.assertEqual(records[0]["messages"][-1]["role"], "assistant")
+
+    def test_rotation_and_formats(self):
+        """Test shards rotate by size, Parquet round-trips and a torn JSON line is skipped"""
+        from interview_export import InterviewExporter, export_shards, read_exports
+        exporter = InterviewExporter(self.directory, max_bytes=1, flush_interval=60)
+        for number in range(3):
+            exporter.submit(self.record(number))
+            exporter.flush()
+        exporter.close()
+        shards = export_shards(self.directory)
+        self.assertEqual(len(shards), 3)
+        with open(shards[-1], "a") as file:
+            file.write('{"id": "torn')
+        self.assertEqual([record["id"] for record in read_exports(self.directory, since=0.5)], ["s1", "s2"])
+
+        import tempfile
+        directory = tempfile.mkdtemp()
+        exporter = InterviewExporter(directory, format="parquet", flush_interval=60)
+        exporter.submit(self.record(7))
+        exporter.flush()
+        self.assertEqual(export_shards(directory), [])
+        exporter.close()
+        self.assertEqual(list(read_exports(directory)), [self.record(7)])
+
+
+class TestAnalytics(unittest.TestCase):
+    """Test cases for the incrementally maintained recruiting analytics"""
+
+    def test_service_turns_update_the_aggregates(self):
+        """Test stage transitions, extracted details, endings and abandonment are counted once each"""
+        import asyncio
+        from analytics import RecruitingAnalytics
+        from gemini_client import MODEL_REGISTRY
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from llm_backend import FakeBackend
+        patcher = patch('google.generativeai.GenerativeModel')
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(MODEL_REGISTRY.clear)
+        backend = FakeBackend(mean_latency=0, responder=lambda prompt: "Q1: Why?\nQ2: How?\nQ3: What?\nQ4: When?")
+        analytics = RecruitingAnalytics()
+        service = InterviewService(assistant_factory=lambda: HiringAssistant(backend=backend), analytics=analytics)
+
+        async def run():
+            first = await service.start_session()
+            for answer in ("Hi", "Jane Smith, jane@example.com, 3 years of experience. Tech next?",
+                           "Python and PostgreSQL", "goodbye", "still there?"):
+                await service.post_answer(first.session_id, answer)
+            second = await service.start_session()
+            await service.post_answer(second.session_id, "Hello")
+            await service.end_session(second.session_id)
+        asyncio.run(run())
+
+        snapshot = analytics.snapshot()
+        self.assertEqual(snapshot["started"], 2)
+        self.assertEqual(snapshot["outcomes"], {"completed": 0, "ended_early": 1, "abandoned": 1})
+        self.assertEqual(snapshot["stages"]["tech_questions"], {"reached": 1, "active": 0, "drop_offs": 1})
+        self.assertEqual(snapshot["stages"]["info_gathering"], {"reached": 2, "active": 0, "drop_offs": 1})
+        self.assertEqual(sum(counts["active"] for counts in snapshot["stages"].values()), 0)
+        self.assertEqual(snapshot["technologies"], {"programming_languages": {"python": 1},
+                                                    "databases": {"postgresql": 1}})
+        self.assertEqual(snapshot["experience"]["2-3 years"], 1)
+
+    def test_finished_interview_left_without_goodbye_counts_as_completed(self):
+        """Test an interview idling out at the conclusion is completed and exported, not abandoned"""
+        import asyncio
+        from analytics import RecruitingAnalytics
+        from gemini_client import MODEL_REGISTRY
+        from hiring_assistant import HiringAssistant
+        from interview_service import InterviewService
+        from llm_backend import FakeBackend
+        patcher = patch('google.generativeai.GenerativeModel')
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(MODEL_REGISTRY.clear)
+        backend = FakeBackend(mean_latency=0, responder=lambda prompt: "Q1: Why?\nQ2: How?\nQ3: What?\nQ4: When?")
+        analytics = RecruitingAnalytics()
+        exported = []
+        service = InterviewService(assistant_factory=lambda: HiringAssistant(backend=backend), analytics=analytics,
+                                   completion_hooks=[exported.append], session_idle=60)
+
+        async def run():
+            session = await service.start_session()
+            for answer in ("Hi", "Jane Smith, jane@example.com, 3 years of experience. Tech next?",
+                           "Python and PostgreSQL", "An index", "A queue", "A cache", "A replica"):
+                await service.post_answer(session.session_id, answer)
+            self.assertEqual(session.assistant.conversation_stage, "conclusion")
+            session.updated_at -= 120
+            await service.expire_idle_sessions()
+            return session
+        session = asyncio.run(run())
+        snapshot = analytics.snapshot()
+        self.assertEqual(snapshot["outcomes"], {"completed": 1, "ended_early": 0, "abandoned": 0})
+        self.assertEqual(snapshot["stages"]["conclusion"], {"reached": 1, "active": 0, "drop_offs": 0})
+        self.assertEqual(exported, [session])
+
+    def test_changed_details_replace_their_counts_and_snapshots_resume(self):
+        """Test a re-extracted stack or experience moves counts instead of adding, and survives a restart"""
+        import tempfile
+        from analytics import RecruitingAnalytics
+        path = os.path.join(tempfile.mkdtemp(), "analytics.json")
+        analytics = RecruitingAnalytics(path, snapshot_interval=60)
+        analytics.record_start()
+        analytics.record_turn("greeting", {}, "info_gathering", {"experience": "1 year"})
+        before = {"experience": "1 year", "tech_stack": {"databases": ["redis"]}}
+        analytics.record_turn("info_gathering", {"experience": "1 year"}, "tech_stack", before)
+        analytics.record_turn("tech_stack", before, "tech_stack",
+                              {"experience": "12 years", "tech_stack": {"databases": ["mysql"]}})
+        analytics.close()
+
+        restarted = RecruitingAnalytics(path)
+        resumed = restarted.snapshot()
+        self.assertEqual(resumed["technologies"], {"databases": {"mysql": 1}})
+        self.assertEqual(resumed["experience"]["0-1 years"], 0)
+        self.assertEqual(resumed["experience"]["10+ years"], 1)
+        self.assertEqual(resumed["stages"]["tech_stack"]["active"], 1)
+
+        # Without durable sessions, the interview running before the restart is gone
+        self.assertEqual(restarted.abandon_active(), 1)
+        restarted.close()
+        abandoned = restarted.snapshot()
+        self.assertEqual(abandoned["stages"]["tech_stack"], {"reached": 1, "active": 0, "drop_offs": 1})
+        self.assertEqual(abandoned["outcomes"]["abandoned"], 1)
+
+
+    def test_replica_snapshots_add_up(self):
+        """Test turns of one interview counted on two replicas sum to the counts of a single process"""
+        from analytics import RecruitingAnalytics, merge_snapshots
+        first, second = RecruitingAnalytics(), RecruitingAnalytics()
+        info = {"experience": "3 years"}
+        first.record_start()
+        first.record_turn("greeting", {}, "info_gathering", info)
+        first.record_turn("info_gathering", info, "tech_stack", info)
+        python = {**info, "tech_stack": {"programming_languages": ["python"]}}
+        first.record_turn("tech_stack", info, "tech_questions", python)
+        go = {**info, "tech_stack": {"programming_languages": ["go"]}}
+        second.record_turn("tech_questions", python, "tech_questions", go)
+        second.record_end("tech_questions", "abandoned")
+
+        alone = second.snapshot()
+        self.assertEqual(alone["stages"]["tech_questions"]["active"], -1)
+        merged = merge_snapshots([first.snapshot(), alone])
+        self.assertEqual(merged["started"], 1)
+        self.assertEqual(merged["technologies"], {"programming_languages": {"python": 0, "go": 1}})
+        self.assertEqual(merged["stages"]["tech_questions"], {"reached": 1, "active": 0, "drop_offs": 1})
+        self.assertEqual(sum(counts["active"] for counts in merged["stages"].values()), 0)
+        self.assertEqual(merged["outcomes"]["abandoned"], 1)
+
+
+class TestChatRendering(unittest.TestCase):
+    """Test cases for the Streamlit transcript and sidebar rendering"""
+
+    def test_candidate_info_single_block(self):
+        """Test the sidebar's details and tech badges are built as one escaped markdown block"""
+        from app import candidate_info_markdown
+        text = candidate_info_markdown({
+            "name": "<b>Jane</b>",
+            "tech_stack": {"programming_languages": ["python", "go"], "databases": []},
+            "tech_stack_raw": "python and go"
+        })
+        self.assertIn("**Name:** &lt;b&gt;Jane&lt;/b&gt;", text)
+        self.assertEqual(text.count('class="tech-badge"'), 2)
+        self.assertNotIn("Databases", text)
+        self.assertNotIn("python and go", text)
+
+    def test_each_message_drawn_once(self):
+        """Test answers rerun only the chat fragment without duplicating the transcript"""
+        from streamlit.testing.v1 import AppTest
+        import interview_service
+        from gemini_client import MODEL_REGISTRY
+        from hiring_assistant import HiringAssistant
+        from llm_backend import FakeBackend
+        self.addCleanup(MODEL_REGISTRY.clear)
+        original_init = interview_service.InterviewService.__init__
+
+        def fake_service(service, *args, **kwargs):
+            original_init(service, assistant_factory=lambda: HiringAssistant(
+                "test_api_key", backend=FakeBackend(mean_latency=0)))
+        with patch.dict(os.environ, {"GEMINI_API_KEY": "test_api_key"}), \
+                patch('google.generativeai.configure'), patch('google.generativeai.GenerativeModel'), \
+                patch.object(interview_service.InterviewService, "__init__", fake_service):
+            app_test = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"),
+                                         default_timeout=30)
+            app_test.run()
+            app_test.chat_input[0].set_value("Hello there").run()
+            app_test.chat_input[0].set_value("My name is Jane Smith").run()
+        self.assertFalse(app_test.exception)
+        contents = [message.markdown[0].value for message in app_test.chat_message]
+        self.assertEqual(len(contents), 5)
+        self.assertEqual(contents[3], "My name is Jane Smith")
+        self.assertIn("**Name:** Jane Smith", [block.value for block in app_test.sidebar.markdown])
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the metrics registry and per-turn instrumentation"""
+
+    def setUp(self):
+        from metrics import MetricsRegistry
+        self.registry = MetricsRegistry(enabled=True)
+
+    def test_disabled_registry_records_nothing(self):
+        """Test updates are dropped and timers are no-ops while disabled"""
+        self.registry.enabled = False
+        histogram = self.registry.histogram("latency_seconds", "Latency", ("stage",))
+        counter = self.registry.counter("turns_total", "Turns", ("stage",))
+        with histogram.time("greeting"):
+            pass
+        counter.inc("greeting")
+        self.assertEqual(histogram.count("greeting"), 0)
+        self.assertEqual(counter.value("greeting"), 0)
+
+    def test_prometheus_rendering(self):
+        """Test histograms render cumulative buckets, sum and count per label set"""
+        histogram = self.registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+        counter = self.registry.counter("turns_total", "Turns", ("stage",))
+        histogram.observe(0.05, "greeting")
+        histogram.observe(0.5, "greeting")
+        histogram.observe(5.0, "greeting")
+        counter.inc("greeting", amount=2)
+        text = self.registry.render()
+        self.assertIn("# TYPE latency_seconds histogram", text)
+        self.assertIn('latency_seconds_bucket{stage="greeting",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{stage="greeting",le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{stage="greeting",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{stage="greeting"} 3', text)
+        self.assertIn('turns_total{stage="greeting"} 2', text)
+
+    def test_turn_phases_recorded(self):
+        """Test a turn records its phases, sizes and tokens under the stage it started in"""
+        from hiring_assistant import HiringAssistant
+        from llm_backend import FakeBackend
+        from metrics import METRICS, MODEL_TOKENS, PHASE_SECONDS, PROMPT_CHARS, TURNS
+        from gemini_client import MODEL_REGISTRY
+        from llm_cache import LLM_CACHE
+        METRICS.enabled = True
+        self.addCleanup(setattr, METRICS, "enabled", False)
+        self.addCleanup(METRICS.clear)
+        self.addCleanup(MODEL_REGISTRY.clear)
+        self.addCleanup(LLM_CACHE.clear)
+        with patch('google.generativeai.configure'), patch('google.generativeai.GenerativeModel'):
+            assistant = HiringAssistant("test_api_key", backend=FakeBackend(mean_latency=0))
+            assistant.conversation_stage = "info_gathering"
+            list(assistant.generate_response_stream("My email is jane@example.com, is that okay?", ""))
+        for phase in ("turn_plan", "extraction", "prompt_assembly", "model_call"):
+            self.assertEqual(PHASE_SECONDS.count(phase, "info_gathering"), 1, phase)
+        self.assertEqual(PROMPT_CHARS.count("info_gathering"), 1)
+        self.assertEqual(TURNS.value("info_gathering", "model"), 1)
+        self.assertGreater(MODEL_TOKENS.value("output"), 0)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
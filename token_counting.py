@@ -0,0 +1,15 @@
+"""
+Local token estimates for TalentScout prompts
+Gemini reports exact counts after a call; these estimates are for deciding
+things before one, such as whether a prompt is worth context-caching.
+"""
+
+# Gemini tokenizers average roughly four characters of English per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of tokens Gemini will count for the text"""
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
@@ -0,0 +1,69 @@
+"""
+Turn planning for TalentScout interviews
+Everything a turn changes locally (the fields extracted from the answer,
+the questions counted and the stage the interview moves to) depends only on
+the candidate's input and the state the turn starts from. It is therefore
+planned before the model is called: the reply is generated with the fresh
+details and the new stage already in the prompt, and model work the new
+stage needs, such as the technical questions, runs alongside the reply
+instead of after it. A plan is a plain value that records both sides of the
+transition, so a turn whose model call fails is reverted exactly.
+"""
+
+from typing import Dict, NamedTuple
+
+from candidate_extraction import EXTRACTION_ENGINE, apply_spans
+from metrics import PHASE_SECONDS
+from tech_taxonomy import TECH_MATCHER
+
+# Basic details of which two must be known before the interview moves on to the tech stack
+REQUIRED_BASIC_FIELDS = ("name", "email", "experience")
+QUESTIONS_PER_INTERVIEW = 4
+
+
+class TurnPlan(NamedTuple):
+    """The state a turn starts from and the state it leads to"""
+    stage: str
+    next_stage: str
+    candidate_info: Dict
+    next_candidate_info: Dict
+    questions_asked: int
+    next_questions_asked: int
+
+    @property
+    def found_tech_stack(self) -> bool:
+        return self.next_candidate_info.get("tech_stack") != self.candidate_info.get("tech_stack")
+
+
+def plan_turn(stage: str, candidate_info: Dict, questions_asked: int, user_input: str) -> TurnPlan:
+    """Extract the answer's details and decide the stage transition, without touching the given state"""
+    info = dict(candidate_info)
+    next_stage = stage
+    next_questions_asked = questions_asked
+
+    if stage == "greeting":
+        next_stage = "info_gathering"
+
+    elif stage == "info_gathering":
+        with PHASE_SECONDS.time("extraction", stage):
+            apply_spans(info, EXTRACTION_ENGINE.scan(user_input))
+        collected_fields = len([f for f in REQUIRED_BASIC_FIELDS if f in info])
+        if collected_fields >= 2 and "tech" in user_input.lower():
+            next_stage = "tech_stack"
+
+    elif stage == "tech_stack":
+        with PHASE_SECONDS.time("extraction", stage):
+            found_tech = TECH_MATCHER.extract(user_input)
+        if found_tech:
+            info["tech_stack"] = found_tech
+            next_stage = "tech_questions"
+        else:
+            # Store raw input for manual processing
+            info["tech_stack_raw"] = user_input
+
+    elif stage == "tech_questions":
+        next_questions_asked += 1
+        if next_questions_asked >= QUESTIONS_PER_INTERVIEW:
+            next_stage = "conclusion"
+
+    return TurnPlan(stage, next_stage, candidate_info, info, questions_asked, next_questions_asked)